@@ -0,0 +1,96 @@
+"""
+Benchmark: memory per transaction, columnar Ledger vs. the legacy dict-of-dicts layout
+Loads --rows synthetic transactions (default 10M) into an AccountStore and measures
+the legacy layout on a smaller sample, reporting bytes per transaction for both
+"""
+
+import sys
+import os
+import time
+import random
+import argparse
+import tracemalloc
+from datetime import date
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from account_store import AccountStore
+
+
+TYPES = ["deposit", "withdrawal", "transfer"]
+DESCRIPTIONS = ["Salary", "ATM", "Groceries", "Rent", "Utilities", "Card payment", "Online shopping", "Refund"]
+START_ORDINAL = date(2020, 1, 1).toordinal()
+
+
+def synthetic_rows(n: int, accounts: int, seed: int = 7):
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield (
+            rng.randrange(accounts),
+            START_ORDINAL + rng.randrange(5 * 365),
+            rng.choice(TYPES),
+            rng.randrange(100, 500_000),
+            rng.choice(DESCRIPTIONS),
+        )
+
+
+def measure_ledger(rows: int, accounts: int) -> float:
+    store = AccountStore()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for i in range(accounts):
+        store.add_account(f"ACC{i:06d}", f"Holder {i}", "Checking", 1000.0)
+    after_accounts = tracemalloc.get_traced_memory()[0]
+
+    start = time.perf_counter()
+    by_index = [store.get_account(f"ACC{i:06d}") for i in range(accounts)]
+    for account_index, ordinal, txn_type, cents, description in synthetic_rows(rows, accounts):
+        store._record(by_index[account_index], ordinal, txn_type, cents, description)
+    elapsed = time.perf_counter() - start
+
+    used = tracemalloc.get_traced_memory()[0] - after_accounts
+    tracemalloc.stop()
+    del by_index
+    print(f"Ledger:        {rows:>11,} rows in {elapsed:6.1f} s   "
+          f"{used / rows:6.1f} B/txn  (columns {store.ledger.nbytes() / rows:.1f} B/txn, "
+          f"accounts {(after_accounts - baseline) / accounts:.0f} B/account)")
+    return used / rows
+
+
+def measure_legacy(rows: int, accounts: int) -> float:
+    tracemalloc.start()
+    user_accounts = {
+        f"ACC{i:06d}": {"account_holder": f"Holder {i}", "balance": 1000.0, "account_type": "Checking", "transactions": []}
+        for i in range(accounts)
+    }
+    after_accounts = tracemalloc.get_traced_memory()[0]
+    ids = list(user_accounts)
+    for account_index, ordinal, txn_type, cents, description in synthetic_rows(rows, accounts):
+        user_accounts[ids[account_index]]["transactions"].append({
+            "date": date.fromordinal(ordinal).isoformat(),
+            "type": txn_type,
+            "amount": cents / 100,
+            "description": description,
+        })
+    used = tracemalloc.get_traced_memory()[0] - after_accounts
+    tracemalloc.stop()
+    print(f"Dict-of-dicts: {rows:>11,} rows                 {used / rows:6.1f} B/txn")
+    return used / rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per transaction benchmark")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="transactions for the Ledger run")
+    parser.add_argument("--legacy-rows", type=int, default=500_000, help="transactions for the dict-of-dicts sample")
+    parser.add_argument("--accounts", type=int, default=100_000)
+    args = parser.parse_args()
+
+    legacy = measure_legacy(args.legacy_rows, args.accounts)
+    ledger = measure_ledger(args.rows, args.accounts)
+    print(f"\nLedger uses {legacy / ledger:.1f}x less memory per transaction "
+          f"(~{legacy * args.rows / 2**30:.1f} GiB vs ~{ledger * args.rows / 2**30:.2f} GiB at {args.rows:,} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: NumPy account analytics vs. Python loops over transaction dicts
+Builds --rows synthetic transactions (default 2M) and times monthly flows, spend by
+category, average balance and top counterparties for all accounts and for one account
+"""
+
+import sys
+import os
+import time
+import random
+import argparse
+from collections import defaultdict
+from datetime import date
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from account_store import AccountStore
+from analytics import AccountAnalytics, default_category
+
+
+TYPES = ["deposit", "withdrawal", "transfer"]
+DESCRIPTIONS = ["Salary", "ATM", "Groceries", "Rent", "Utilities", "Card payment", "Online shopping", "Refund"]
+START_ORDINAL = date(2021, 1, 1).toordinal()
+
+
+def build_store(rows: int, accounts: int) -> AccountStore:
+    rng = random.Random(5)
+    store = AccountStore()
+    by_index = [store.add_account(f"ACC{i:05d}", f"Holder {i}", "Checking", 1_000_000.00) for i in range(accounts)]
+    for _ in range(rows):
+        account = by_index[rng.randrange(accounts)]
+        txn_type = rng.choice(TYPES)
+        description = (f"Transfer to ACC{rng.randrange(accounts):05d}" if txn_type == "transfer"
+                       else rng.choice(DESCRIPTIONS))
+        store._record(account, START_ORDINAL + rng.randrange(3 * 365), txn_type, rng.randrange(100, 200_000), description)
+    return store
+
+
+def python_aggregates(store: AccountStore, account_ids: list) -> dict:
+    """The same aggregates computed the pre-analytics way, from transaction dicts."""
+    months = defaultdict(lambda: [0.0, 0.0])
+    categories = defaultdict(float)
+    counterparties = defaultdict(float)
+    for acc_id in account_ids:
+        for txn in store.get_account_info(acc_id)["transactions"]:
+            month = txn["date"][:7]
+            if txn["type"] == "deposit":
+                months[month][0] += txn["amount"]
+            else:
+                months[month][1] += txn["amount"]
+                categories[default_category(txn["description"])] += txn["amount"]
+            if txn["description"].startswith("Transfer "):
+                counterparties[txn["description"].split()[-1]] += txn["amount"]
+    top = sorted(counterparties.items(), key=lambda item: -item[1])[:5]
+    return {"months": len(months), "categories": len(categories), "top": top}
+
+
+def timed(label: str, fn, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<44} {elapsed * 1000:10.2f} ms")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Account analytics benchmark")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--accounts", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"Building {args.rows:,} transactions over {args.accounts:,} accounts...")
+    store = build_store(args.rows, args.accounts)
+    one = "ACC00042"
+
+    print("NumPy analytics:")
+    analytics = None
+
+    def snapshot():
+        nonlocal analytics
+        analytics = AccountAnalytics(store)
+
+    timed("snapshot (copy ledger columns)", snapshot)
+    total = timed("all accounts: full summary", lambda: analytics.summary())
+    timed("all accounts: per-account inflow/outflow", analytics.account_flows)
+    single = timed(f"{one}: full summary", lambda: analytics.summary(one), repeat=20)
+    timed(f"{one}: snapshot + summary (as set_account_context)",
+          lambda: AccountAnalytics(store, account_ids=[one]).summary(one), repeat=20)
+
+    print("Python loops over transaction dicts:")
+    loop_total = timed("all accounts: flows, categories, counterparties",
+                       lambda: python_aggregates(store, list(store)))
+    loop_single = timed(f"{one}: flows, categories, counterparties",
+                        lambda: python_aggregates(store, [one]), repeat=20)
+
+    print(f"\nAll accounts: {loop_total / total:.0f}x faster;  one account: {loop_single / single:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
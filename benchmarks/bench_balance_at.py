@@ -0,0 +1,76 @@
+"""
+Benchmark: balance-as-of-date queries with running-balance checkpoints
+Compares get_balance_at (bisect + one checkpoint + a short scan) with replaying an
+account's history backwards from its current balance
+"""
+
+import sys
+import os
+import time
+import random
+import argparse
+from datetime import date
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from account_store import AccountStore, INFLOW_TYPES
+
+
+TYPES = ["deposit", "withdrawal", "transfer"]
+START_ORDINAL = date(2020, 1, 1).toordinal()
+
+
+def build_store(accounts: int, rows_per_account: int) -> AccountStore:
+    rng = random.Random(4)
+    store = AccountStore()
+    for i in range(accounts):
+        account = store.add_account(f"ACC{i:04d}", f"Holder {i}", "Checking", 5_000.00)
+        for ordinal in sorted(START_ORDINAL + rng.randrange(5 * 365) for _ in range(rows_per_account)):
+            store._record(account, ordinal, rng.choice(TYPES), rng.randrange(100, 50_000), "Card payment")
+    return store
+
+
+def replay_balance(store: AccountStore, account_id: str, as_of: str) -> float:
+    """The pre-checkpoint way: walk the history backwards, undoing later transactions."""
+    info = store.get_account_info(account_id)
+    balance = info["balance"]
+    for txn in reversed(info["transactions"]):
+        if txn["date"] <= as_of:
+            break
+        balance += -txn["amount"] if txn["type"] in INFLOW_TYPES else txn["amount"]
+    return round(balance, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Balance-as-of-date benchmark")
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--rows-per-account", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    args = parser.parse_args()
+
+    print(f"Building {args.accounts} accounts x {args.rows_per_account:,} transactions...")
+    store = build_store(args.accounts, args.rows_per_account)
+    rng = random.Random(8)
+    queries = [(f"ACC{rng.randrange(args.accounts):04d}",
+                date.fromordinal(START_ORDINAL + rng.randrange(5 * 365)).isoformat())
+               for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    fast = [store.get_balance_at(acc_id, as_of)["balance"] for acc_id, as_of in queries]
+    fast_elapsed = time.perf_counter() - start
+
+    replay_queries = queries[:max(1, args.queries // 20)]
+    start = time.perf_counter()
+    slow = [replay_balance(store, acc_id, as_of) for acc_id, as_of in replay_queries]
+    slow_elapsed = time.perf_counter() - start
+    assert fast[:len(slow)] == slow, "checkpointed and replayed balances disagree"
+
+    fast_us = fast_elapsed / len(queries) * 1e6
+    slow_us = slow_elapsed / len(replay_queries) * 1e6
+    print(f"get_balance_at   {fast_us:10.1f} us/query")
+    print(f"backward replay  {slow_us:10.1f} us/query   ({slow_us / fast_us:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
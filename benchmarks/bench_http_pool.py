@@ -0,0 +1,100 @@
+"""
+Benchmark: pooled vs unpooled HTTP calls on the Mistral REST path
+Runs BankingBot._call_mistral_api_rest against a local stub server
+
+The stub can delay every *new* connection (--handshake-ms) to stand in for the
+TCP+TLS setup cost of talking to api.mistral.ai, which a loopback socket lacks.
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import statistics
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from banking_bot import BankingBot
+from http_pool import build_session
+
+
+COMPLETION = json.dumps({
+    "id": "stub",
+    "object": "chat.completion",
+    "model": "mistral-small",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "OK"}, "finish_reason": "stop"}],
+}).encode()
+
+
+def make_handler(handshake_delay: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            # Runs once per TCP connection, not once per request
+            if handshake_delay:
+                time.sleep(handshake_delay)
+            super().setup()
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(COMPLETION)))
+            self.end_headers()
+            self.wfile.write(COMPLETION)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def time_calls(bot: BankingBot, n: int) -> list:
+    """Time n REST calls and return per-call latencies in milliseconds."""
+    messages = [{"role": "user", "content": "What are your services?"}]
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        bot._call_mistral_api_rest(messages)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(label: str, latencies: list):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:10} mean {statistics.mean(latencies):7.2f} ms   "
+          f"p50 {statistics.median(latencies):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="calls per mode")
+    parser.add_argument("--handshake-ms", type=float, default=20.0,
+                        help="simulated connection setup cost per new connection")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.handshake_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        print(f"{args.requests} calls per mode, {args.handshake_ms:.0f} ms simulated handshake\n")
+
+        pooled = BankingBot(api_key="bench", session=build_session(), base_url=base_url)
+        report("pooled", time_calls(pooled, args.requests))
+
+        unpooled = BankingBot(api_key="bench", session=build_session(keep_alive=False), base_url=base_url)
+        report("unpooled", time_calls(unpooled, args.requests))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: HTTP service throughput and latency
+Starts src/http_server.py as a subprocess against the local mock Mistral server and drives
+N concurrent sessions through /v1/chat, /v1/command and the account endpoints
+"""
+
+import sys
+import os
+import time
+import signal
+import asyncio
+import argparse
+import subprocess
+
+import aiohttp
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from mock_mistral_server import MockMistralServer
+
+
+SRC = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+# (method, path, JSON body): a conversation mixing LLM turns and local account work
+CONVERSATION = [
+    ("POST", "/v1/chat", {"message": "What are your services?"}),
+    ("POST", "/v1/command", {"command": "balance ACC001"}),
+    ("GET", "/v1/accounts/ACC002/transactions?limit=5", None),
+    ("POST", "/v1/command", {"command": "How can I protect my account from fraud?"}),
+    ("GET", "/v1/accounts/ACC001", None),
+]
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+async def wait_healthy(http: aiohttp.ClientSession, url: str, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with http.get(f"{url}/health") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientConnectionError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"{url} did not become healthy")
+        await asyncio.sleep(0.1)
+
+
+async def conversation(http: aiohttp.ClientSession, url: str, index: int, turns: int, latencies: list, errors: list):
+    headers = {"X-Session-Id": f"bench-{index}"}
+    for turn in range(turns):
+        method, path, body = CONVERSATION[turn % len(CONVERSATION)]
+        start = time.perf_counter()
+        async with http.request(method, url + path, json=body, headers=headers) as response:
+            await response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        latencies.append(time.perf_counter() - start)
+
+
+async def drive(url: str, sessions: int, turns: int):
+    connector = aiohttp.TCPConnector(limit=sessions)
+    async with aiohttp.ClientSession(connector=connector) as http:
+        await wait_healthy(http, url)
+        latencies, errors = [], []
+        start = time.perf_counter()
+        await asyncio.gather(*(conversation(http, url, i, turns, latencies, errors) for i in range(sessions)))
+        elapsed = time.perf_counter() - start
+        async with http.get(f"{url}/health") as response:
+            health = await response.json()
+
+    latencies.sort()
+    print(f"  {len(latencies):,} requests in {elapsed:.2f}s = {len(latencies) / elapsed:,.0f} req/s, "
+          f"{len(errors)} errors")
+    print(f"  latency p50 {percentile(latencies, 50) * 1000:.1f} ms   p95 {percentile(latencies, 95) * 1000:.1f} ms   "
+          f"p99 {percentile(latencies, 99) * 1000:.1f} ms")
+    print(f"  server: {health['sessions']} sessions, {health['timeouts']} timeouts")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP service throughput benchmark")
+    parser.add_argument("--sessions", type=int, default=200, help="concurrent sessions")
+    parser.add_argument("--turns", type=int, default=10, help="requests per session")
+    parser.add_argument("--latency", default="fixed:0.05", help="mock LLM latency distribution")
+    parser.add_argument("--workers", type=int, default=8, help="server worker threads")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--server-url", help="benchmark an already running service instead")
+    args = parser.parse_args()
+
+    if args.server_url:
+        asyncio.run(drive(args.server_url.rstrip("/"), args.sessions, args.turns))
+        return
+
+    mock = MockMistralServer(latency=args.latency, token_delay=0).start()
+    env = dict(os.environ, MISTRAL_API_KEY="benchmark", MISTRAL_API_BASE=mock.base_url)
+    server = subprocess.Popen([sys.executable, os.path.join(SRC, "http_server.py"), "--port", str(args.port),
+                               "--workers", str(args.workers)], env=env)
+    url = f"http://127.0.0.1:{args.port}"
+    print(f"{args.sessions} sessions x {args.turns} requests, mock LLM latency {args.latency}")
+    try:
+        asyncio.run(drive(url, args.sessions, args.turns))
+    finally:
+        # Graceful shutdown: SIGTERM drains in-flight requests before exiting
+        start = time.perf_counter()
+        server.send_signal(signal.SIGTERM)
+        code = server.wait(timeout=60)
+        print(f"  server exited with {code} after {(time.perf_counter() - start) * 1000:.0f} ms of shutdown")
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
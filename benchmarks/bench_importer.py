@@ -0,0 +1,127 @@
+"""
+Benchmark: streaming transaction import (rows/sec and peak memory)
+Generates a synthetic core-banking CSV or JSONL export of --size-mb (use --size-mb 4096
+for a multi-GB run), with a small share of malformed rows, and imports it serially and
+with a parser process pool
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import resource
+import tempfile
+from datetime import date
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from account_store import AccountStore
+from sqlite_store import SQLiteAccountStore
+from importer import import_file
+
+
+TYPES = ["deposit", "withdrawal", "transfer"]
+DESCRIPTIONS = ["Salary", "ATM withdrawal", "Groceries", "Rent", "Utilities", "Card payment", "Online shopping"]
+START_ORDINAL = date(2015, 1, 1).toordinal()
+
+
+class CountingStore:
+    """Accepts every row and keeps nothing, to measure the pipeline on its own."""
+
+    def __init__(self):
+        self.accounts = set()
+
+    def __contains__(self, account_id: str) -> bool:
+        return account_id in self.accounts
+
+    def add_account(self, account_id, account_holder, account_type, balance, transactions=()):
+        self.accounts.add(account_id)
+
+    def import_transactions(self, rows, update_balances=False):
+        return {"success": True, "applied": len(rows), "failures": []}
+
+    def close(self):
+        pass
+
+
+def generate(path: str, fmt: str, size_bytes: int, accounts: int, bad_ratio: float = 0.001) -> int:
+    rng = random.Random(12)
+    rows = 0
+    with open(path, "w", encoding="utf-8") as f:
+        if fmt == "csv":
+            f.write("account_id,date,type,amount,description,account_holder,account_type\n")
+        while f.tell() < size_bytes:
+            lines = []
+            for _ in range(10_000):
+                acc = rng.randrange(accounts)
+                record = {
+                    "account_id": f"ACC{acc:06d}",
+                    "date": date.fromordinal(START_ORDINAL + rng.randrange(3650)).isoformat(),
+                    "type": rng.choice(TYPES),
+                    "amount": f"{rng.randrange(100, 500_000) / 100:.2f}",
+                    "description": rng.choice(DESCRIPTIONS),
+                    "account_holder": f"Holder {acc}",
+                    "account_type": "Checking",
+                }
+                if rng.random() < bad_ratio:
+                    record["date"] = "2024-13-45"
+                lines.append(",".join(record.values()) if fmt == "csv" else json.dumps(record))
+            f.write("\n".join(lines) + "\n")
+            rows += len(lines)
+    return rows
+
+
+def peak_rss_mib() -> float:
+    scale = 1024 if sys.platform != "darwin" else 1024 * 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+
+def run(label: str, store, path: str, tmp: str, **options):
+    last_report = [0.0]
+
+    def progress(stats):
+        now = time.perf_counter()
+        if now - last_report[0] > 2:
+            last_report[0] = now
+            print(f"\r  {label:<26} {100 * stats['bytes'] / stats['total_bytes']:5.1f}%  "
+                  f"{stats['rows_per_sec']:>10,.0f} rows/s", end="", flush=True)
+
+    stats = import_file(store, path, dead_letter_path=os.path.join(tmp, "dead.jsonl"), progress=progress, **options)
+    print(f"\r  {label:<26} {stats['rows']:>12,} rows {stats['rows_per_sec']:>10,.0f} rows/s   "
+          f"{stats['rejected']:,} rejected   peak RSS {peak_rss_mib():,.0f} MiB")
+    if hasattr(store, "close"):
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming importer benchmark")
+    parser.add_argument("--size-mb", type=int, default=256, help="synthetic input size")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--accounts", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--sinks", default="none,memory",
+                        help="comma-separated: none (pipeline only), memory, sqlite")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"export.{args.format}")
+        print(f"Generating {args.size_mb:,} MiB of {args.format.upper()}...")
+        rows = generate(path, args.format, args.size_mb * 2**20, args.accounts)
+        print(f"{rows:,} rows, {os.path.getsize(path) / 2**20:,.0f} MiB\n")
+
+        sinks = {
+            "none": CountingStore,
+            "memory": AccountStore,
+            "sqlite": lambda: SQLiteAccountStore(os.path.join(tmp, f"import-{time.monotonic_ns()}.db")),
+        }
+        # Pipeline-only runs first, so peak RSS reflects the pipeline before any store grows
+        for sink in args.sinks.split(","):
+            run(f"{sink}, serial", sinks[sink](), path, tmp)
+            run(f"{sink}, {args.workers} workers", sinks[sink](), path, tmp, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
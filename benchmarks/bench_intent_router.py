@@ -0,0 +1,74 @@
+"""
+Benchmark: how much of a sample workload the local intent router answers without the LLM
+Also reports the classification cost per message
+"""
+
+import sys
+import os
+import time
+from collections import Counter
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from intent_router import IntentRouter
+
+
+SAMPLE_WORKLOAD = [
+    # Account requests the router should answer locally
+    "what's the balance on ACC001?",
+    "How much money is in ACC002",
+    "balance for acc002 please",
+    "show my last 5 transactions for ACC002",
+    "List recent activity on ACC001",
+    "transaction history ACC001",
+    "can I see the statement for ACC002",
+    "How much is available in ACC001?",
+    "show last 3 deposits on ACC002",
+    # Transfers move money, so free text always goes to the LLM
+    "send $200 from ACC002 to ACC001",
+    "please transfer 50 from ACC001 to ACC002",
+    "move 20 into ACC001 from ACC002",
+    "Don't transfer 100 from ACC001 to ACC002",
+    "cancel the transfer of 100 from ACC001 to ACC002",
+    "transfer -50 from ACC001 to ACC002",
+    # Ambiguous, advisory, negated or incomplete: must go to the LLM
+    "Should I transfer 100 from ACC001 to ACC002?",
+    "don't show the history for ACC001",
+    "what is my balance",
+    "transfer history for ACC001",
+    "How do I transfer money?",
+    # General banking questions: LLM
+    "What are your services?",
+    "How can I protect my account from fraud?",
+    "What's the process for transferring money between accounts?",
+    "I want to open a new account",
+    "What documents do I need?",
+    "What are the fees?",
+    "Tell me about overdraft protection",
+    "How can I improve my credit score?",
+]
+
+
+def main():
+    router = IntentRouter()
+    decisions = [router.classify(message) for message in SAMPLE_WORKLOAD]
+
+    for message, decision in zip(SAMPLE_WORKLOAD, decisions):
+        print(f"  {decision['route']:5} {str(decision['intent']):8} {decision['confidence']:5.2f}  {message}")
+
+    local = [d for d in decisions if d["route"] == "local"]
+    print(f"\nAnswered locally: {len(local)}/{len(decisions)} ({len(local) / len(decisions):.0%}) of the sample workload")
+    print(f"By intent: {dict(Counter(d['intent'] for d in local))}")
+
+    rounds = 2000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in SAMPLE_WORKLOAD:
+            router.classify(message)
+    per_message = (time.perf_counter() - start) / (rounds * len(SAMPLE_WORKLOAD))
+    print(f"Classification cost: {per_message * 1e6:.1f} us/message (vs. seconds for an LLM round trip)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: transfer throughput under each journal durability mode
+Runs the same random transfers with no journal and with fsync / batch / async journaling,
+single-threaded and from several threads, then checks that recovery reproduces the balances
+"""
+
+import sys
+import os
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from account_store import AccountStore
+from journal import Journal, recover, checkpoint
+
+
+def build_transfers(accounts: int, transfers: int, seed: int = 3) -> list:
+    rng = random.Random(seed)
+    ids = [f"ACC{i:05d}" for i in range(accounts)]
+    return [(*rng.sample(ids, 2), rng.randrange(1, 5_000) / 100) for _ in range(transfers)]
+
+
+def populate(store, accounts: int):
+    for i in range(accounts):
+        store.add_account(f"ACC{i:05d}", f"Holder {i}", "Checking", 10_000.00)
+
+
+def run(store, transfers: list, threads: int) -> float:
+    chunks = [transfers[i::threads] for i in range(threads)]
+
+    def worker(chunk):
+        for source, destination, amount in chunk:
+            store.transfer_funds(source, destination, amount)
+
+    workers = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write-ahead journal benchmark")
+    parser.add_argument("--accounts", type=int, default=1_000)
+    parser.add_argument("--transfers", type=int, default=20_000)
+    parser.add_argument("--fsync-transfers", type=int, default=2_000,
+                        help="transfers for the fsync mode (one fsync each)")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--flush-interval", type=float, default=0.002, help="batch/async fsync interval (s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in (None, "async", "batch", "fsync"):
+            count = args.fsync_transfers if mode == "fsync" else args.transfers
+            transfers = build_transfers(args.accounts, count)
+            line = f"{mode or 'none':<6}"
+            for threads in (1, args.threads):
+                if mode == "batch" and threads == 1:
+                    # Each call waits for the next flush, so one thread is bounded by the interval
+                    transfers_run = transfers[:max(1, int(0.5 / args.flush_interval))]
+                else:
+                    transfers_run = transfers
+                path = os.path.join(tmp, f"{mode}-{threads}.wal")
+                journal = Journal(path, mode, args.flush_interval) if mode else None
+                store = AccountStore(journal=journal)
+                populate(store, args.accounts)
+                elapsed = run(store, transfers_run, threads)
+                syncs = ""
+                if journal is not None:
+                    journal.close()
+                    syncs = f" ({journal.syncs:,} fsyncs)"
+                    recovered = recover(path, durability="async")
+                    recovered.journal.close()
+                    assert recovered.get_balances() == store.get_balances(), f"{mode}: recovery mismatch"
+                line += f"   {threads:>2} thread(s) {len(transfers_run) / elapsed:>10,.0f} transfers/s{syncs:<18}"
+            print(line)
+
+        # Checkpoint, then recover from the snapshot plus the remaining journal
+        journal_path, snapshot_path = os.path.join(tmp, "live.wal"), os.path.join(tmp, "live.snap")
+        store = recover(journal_path, snapshot_path, durability="async")
+        populate(store, args.accounts)
+        transfers = build_transfers(args.accounts, args.transfers)
+        run(store, transfers[:len(transfers) // 2], 1)
+        checkpoint(store, snapshot_path)
+        run(store, transfers[len(transfers) // 2:], 1)
+        store.journal.close()
+        start = time.perf_counter()
+        recovered = recover(journal_path, snapshot_path, durability="async")
+        elapsed = time.perf_counter() - start
+        assert recovered.get_balances() == store.get_balances(), "checkpoint recovery mismatch"
+        recovered.journal.close()
+        print(f"\nRecovered snapshot + {len(transfers) - len(transfers) // 2:,} journaled transfers "
+              f"in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
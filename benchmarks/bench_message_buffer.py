@@ -0,0 +1,84 @@
+"""
+Benchmark: per-turn request assembly overhead at 10, 100 and 1000 turns of history
+Compares rebuilding the system prompt, message list and JSON body every turn with the
+incremental MessageBuffer path (no network calls; only the CPU work before sending)
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from banking_bot import BankingBot, ChatMessage, _chat_message
+from context_window import ContextWindow
+
+
+USER = "Can you explain the difference between your savings and money market accounts for turn {}?"
+ASSISTANT = ("Savings accounts offer a modest variable rate with easy access, while money market accounts "
+             "usually pay more in exchange for a higher minimum balance and limited monthly withdrawals. ") * 3
+
+
+def make_bot(turns: int, max_tokens) -> BankingBot:
+    bot = BankingBot(api_key="benchmark", context_window=ContextWindow(max_tokens))
+    bot.account_context = "Balance $5,000.00; last 3 months: in $3,000.00, out $2,000.00"
+    for i in range(turns):
+        bot.conversation_history.append({"role": "user", "content": USER.format(i)})
+        bot.conversation_history.append({"role": "assistant", "content": ASSISTANT})
+    return bot
+
+
+def rebuild_turn(bot: BankingBot, i: int, sdk: bool):
+    """The pre-buffer path: everything derived from the full history again."""
+    bot.conversation_history.append({"role": "user", "content": USER.format(i)})
+    messages = bot.context_window.build_messages(bot._build_system_prompt(), bot.conversation_history)
+    if sdk:
+        [ChatMessage(role=msg["role"], content=msg["content"]) for msg in messages]
+    else:
+        json.dumps({"model": bot.model, "messages": messages, "temperature": 0.7, "max_tokens": 500}).encode()
+    bot.conversation_history.append({"role": "assistant", "content": ASSISTANT})
+
+
+def buffered_turn(bot: BankingBot, i: int, sdk: bool):
+    messages = bot._prepare_messages(USER.format(i))
+    if sdk:
+        bot._buffer.sdk_messages(messages, _chat_message)
+    else:
+        bot._build_rest_request(messages)
+    bot._record_response(ASSISTANT)
+
+
+def per_turn_us(turn, turns: int, max_tokens, sdk: bool, repeat: int) -> float:
+    bot = make_bot(turns, max_tokens)
+    turn(bot, 0, sdk)  # warm up (the buffer mirrors the existing history here)
+    start = time.perf_counter()
+    for i in range(repeat):
+        turn(bot, i, sdk)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-turn request assembly benchmark")
+    parser.add_argument("--repeat", type=int, default=200, help="turns timed per configuration")
+    args = parser.parse_args()
+
+    paths = ["rest"] + (["sdk"] if ChatMessage is not None else [])
+    if ChatMessage is None:
+        print("mistralai is not installed: SDK message objects are not measured\n")
+
+    for label, max_tokens in (("whole history sent (no token budget)", None), ("default 4000-token window", 4000)):
+        print(label)
+        for path in paths:
+            for turns in (10, 100, 1000):
+                old = per_turn_us(rebuild_turn, turns, max_tokens, path == "sdk", args.repeat)
+                new = per_turn_us(buffered_turn, turns, max_tokens, path == "sdk", args.repeat)
+                print(f"  {path:<4} {turns:>5} turns   rebuild {old:9.1f} us/turn   "
+                      f"buffered {new:8.1f} us/turn   ({old / new:.1f}x)")
+        print()
+
+
+if __name__ == "__main__":
+    main()
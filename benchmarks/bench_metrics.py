@@ -0,0 +1,90 @@
+"""
+Benchmark: cost of the latency instrumentation
+Times span()/inc() with metrics disabled and enabled, then runs local banking commands and
+chat turns against the mock Mistral server both ways and prints the recorded stage latencies
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from banking_bot import BankingBot
+from metrics import Metrics
+from mock_mistral_server import MockMistralServer
+
+
+COMMANDS = ["balance ACC001", "history ACC002 3", "what is the balance of ACC003?"]
+
+
+def per_call_ns(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def primitives(iterations: int):
+    # Loop and call overhead, subtracted so the numbers are the instrumentation alone
+    baseline = per_call_ns(lambda: None, iterations)
+    print(f"Primitives ({iterations:,} calls each, net of {baseline:.0f} ns loop overhead)")
+    for label, metrics in (("disabled", Metrics(enabled=False)), ("enabled", Metrics())):
+        def span():
+            with metrics.span("stage"):
+                pass
+        span_ns = per_call_ns(span, iterations) - baseline
+        inc_ns = per_call_ns(lambda: metrics.inc("requests_total", route="local"), iterations) - baseline
+        print(f"  {label:<9} span {span_ns:7.0f} ns   inc {inc_ns:7.0f} ns")
+
+
+def run_commands(metrics: Metrics, rounds: int) -> float:
+    bot = BankingBot(api_key="benchmark", metrics=metrics)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for command in COMMANDS:
+            bot.process_banking_command(command)
+    return (time.perf_counter() - start) / (rounds * len(COMMANDS))
+
+
+def run_chat(metrics: Metrics, base_url: str, turns: int) -> float:
+    bot = BankingBot(api_key="benchmark", base_url=base_url, metrics=metrics)
+    start = time.perf_counter()
+    for turn in range(turns):
+        bot.chat(f"Question {turn}: how do I order a new card?")
+    return (time.perf_counter() - start) / turns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics instrumentation overhead benchmark")
+    parser.add_argument("--iterations", type=int, default=200_000, help="calls per primitive timing")
+    parser.add_argument("--rounds", type=int, default=3000, help="passes over the local command set")
+    parser.add_argument("--turns", type=int, default=300, help="chat turns against the mock LLM")
+    args = parser.parse_args()
+
+    primitives(args.iterations)
+
+    enabled = Metrics()
+    print(f"\nLocal banking commands ({args.rounds * len(COMMANDS):,})")
+    for label, metrics in (("disabled", Metrics(enabled=False)), ("enabled", enabled)):
+        print(f"  {label:<9} {run_commands(metrics, args.rounds) * 1e6:7.1f} us/command")
+
+    server = MockMistralServer(latency="fixed:0", token_delay=0).start()
+    try:
+        print(f"\nChat turns against the mock LLM ({args.turns})")
+        for label, metrics in (("disabled", Metrics(enabled=False)), ("enabled", enabled)):
+            print(f"  {label:<9} {run_chat(metrics, server.base_url, args.turns) * 1000:7.3f} ms/turn")
+    finally:
+        server.stop()
+
+    print("\nRecorded stage latencies (bucket upper bounds)")
+    for h in json.loads(enabled.to_json())["histograms"]:
+        print(f"  {h['labels']['stage']:<16} n={h['count']:<6} mean {h['mean'] * 1000:8.3f} ms   "
+              f"p50 <= {h['p50'] * 1000:g} ms   p99 <= {h['p99'] * 1000:g} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: single-flight coalescing of identical LLM requests
+Simulates a campaign burst (many sessions sending the same opening question at once) against
+the mock Mistral server, with and without coalescing, and reports upstream calls and latency
+"""
+
+import sys
+import os
+import time
+import argparse
+import threading
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from banking_bot import BankingBot
+from http_pool import configure_pool
+from mock_mistral_server import MockMistralServer
+from session_manager import SessionManager
+from single_flight import SingleFlight
+
+
+QUESTIONS = [
+    "I got your email about the new savings rate. How do I sign up?",
+    "i got your email about the new savings rate. how do i sign up",
+    "What is the new savings rate?",
+]
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def burst(server: MockMistralServer, customers: int, coalesce: bool):
+    bot = BankingBot(api_key="benchmark", base_url=server.base_url, single_flight=SingleFlight() if coalesce else None)
+    sessions = SessionManager(bot=bot)
+    latencies = []
+    lock = threading.Lock()
+    go = threading.Barrier(customers)
+
+    def customer(index: int):
+        go.wait()
+        start = time.perf_counter()
+        sessions.chat(f"customer-{index}", QUESTIONS[index % len(QUESTIONS)])
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    server.request_count = 0
+    threads = [threading.Thread(target=customer, args=(i,)) for i in range(customers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    label = "coalesced" if coalesce else "uncoalesced"
+    print(f"  {label:<12} {server.request_count:>5} upstream calls   {elapsed:6.2f}s   "
+          f"p50 {percentile(latencies, 50) * 1000:7.1f} ms   p99 {percentile(latencies, 99) * 1000:7.1f} ms")
+    if coalesce:
+        stats = bot.single_flight.stats()
+        print(f"  {stats['coalesced']} of {stats['requests']} requests joined a call in flight "
+              f"({stats['saved_ratio']:.0%} of upstream calls saved)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-flight coalescing benchmark")
+    parser.add_argument("--customers", type=int, default=300, help="simultaneous customers in the burst")
+    parser.add_argument("--latency", default="lognormal:0.5,0.3", help="mock LLM latency distribution")
+    args = parser.parse_args()
+
+    configure_pool(pool_maxsize=args.customers)
+    server = MockMistralServer(latency=args.latency, token_delay=0).start()
+    print(f"{args.customers} customers, {len(QUESTIONS)} distinct questions (two differ only in case and "
+          f"trailing punctuation), LLM latency {args.latency}")
+    try:
+        burst(server, args.customers, coalesce=False)
+        burst(server, args.customers, coalesce=True)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
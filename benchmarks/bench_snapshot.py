@@ -0,0 +1,96 @@
+"""
+Benchmark: startup from a memory-mapped binary snapshot vs. a JSON account file
+Saves the same account book both ways, then times loading it and serving the first
+request (one balance and one history lookup)
+"""
+
+import sys
+import os
+import gc
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from datetime import date
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from account_store import AccountStore
+from snapshot import save_snapshot, load_snapshot
+
+
+TYPES = ["deposit", "withdrawal", "transfer"]
+DESCRIPTIONS = ["Salary", "ATM", "Groceries", "Rent", "Utilities", "Card payment", "Online shopping", "Refund"]
+START_ORDINAL = date(2022, 1, 1).toordinal()
+
+
+def build_store(accounts: int, rows: int) -> AccountStore:
+    rng = random.Random(9)
+    store = AccountStore()
+    by_index = [store.add_account(f"ACC{i:06d}", f"Holder {i}", "Checking", 1000.00) for i in range(accounts)]
+    for _ in range(rows):
+        store._record(by_index[rng.randrange(accounts)], START_ORDINAL + rng.randrange(1000),
+                      rng.choice(TYPES), rng.randrange(100, 500_000), rng.choice(DESCRIPTIONS))
+    return store
+
+
+def first_request(store, account_id: str):
+    store.get_account_balance(account_id)
+    store.get_transaction_history(account_id, limit=10)
+
+
+def measure(label: str, load, account_id: str, track_memory: bool):
+    gc.collect()
+    if track_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    store = load()
+    loaded = time.perf_counter() - start
+    first_request(store, account_id)
+    ready = time.perf_counter() - start
+    line = f"{label:<10} load {loaded * 1000:9.1f} ms   first request served at {ready * 1000:9.1f} ms"
+    if track_memory:
+        line += f"   Python heap {tracemalloc.get_traced_memory()[0] / 2**20:8.1f} MiB (timings inflated by tracing)"
+        tracemalloc.stop()
+    print(line)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot startup benchmark")
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--memory", action="store_true", help="also report Python heap use (slows loading)")
+    args = parser.parse_args()
+
+    print(f"Building {args.accounts:,} accounts with {args.rows:,} transactions...")
+    store = build_store(args.accounts, args.rows)
+    account_id = f"ACC{args.accounts // 2:06d}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "accounts.json")
+        snapshot_path = os.path.join(tmp, "accounts.snap")
+        with open(json_path, "w") as f:
+            json.dump({acc_id: store.get_account_info(acc_id) for acc_id in store}, f)
+        save_snapshot(store, snapshot_path)
+        expected = store.get_transaction_history(account_id, limit=10)
+        del store
+        print(f"JSON file {os.path.getsize(json_path) / 2**20:.1f} MiB, "
+              f"snapshot {os.path.getsize(snapshot_path) / 2**20:.1f} MiB\n")
+
+        def load_json():
+            with open(json_path) as f:
+                return AccountStore.from_dict(json.load(f))
+
+        from_json = measure("JSON", load_json, account_id, args.memory)
+        del from_json
+        from_snapshot = measure("snapshot", lambda: load_snapshot(snapshot_path), account_id, args.memory)
+        assert from_snapshot.get_transaction_history(account_id, limit=10) == expected
+        del from_snapshot
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: SQLite (WAL, group commit) account store vs. the in-memory AccountStore
+Reports transfers/sec from concurrent threads and latency of history queries on
+accounts with long transaction histories
+"""
+
+import sys
+import os
+import time
+import random
+import argparse
+import tempfile
+import threading
+import statistics
+from datetime import date
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from account_store import AccountStore
+from sqlite_store import SQLiteAccountStore
+
+
+START_ORDINAL = date(2020, 1, 1).toordinal()
+
+
+def seed_history(rows: int, rng: random.Random) -> list:
+    return [
+        {
+            "date": date.fromordinal(START_ORDINAL + rng.randrange(5 * 365)).isoformat(),
+            "type": rng.choice(("deposit", "withdrawal")),
+            "amount": rng.randrange(100, 500_000) / 100,
+            "description": "Seeded",
+        }
+        for _ in range(rows)
+    ]
+
+
+def populate(store, accounts: int, history_rows: int):
+    rng = random.Random(3)
+    for i in range(accounts):
+        history = seed_history(history_rows, rng) if i < 10 else ()
+        store.add_account(f"ACC{i:05d}", f"Holder {i}", "Checking", 1000.00, history)
+
+
+def transfer_throughput(store, threads: int, transfers: int) -> float:
+    ids = list(store)
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        for _ in range(transfers):
+            source, destination = rng.sample(ids, 2)
+            store.transfer_funds(source, destination, rng.randrange(1, 5_000) / 100)
+
+    pool = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return threads * transfers / (time.perf_counter() - start)
+
+
+def history_latency(store, queries: int, limit: int) -> tuple:
+    timings = []
+    for i in range(queries):
+        start = time.perf_counter()
+        store.get_transaction_history(f"ACC{i % 10:05d}", limit)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return statistics.median(timings) * 1e6, timings[int(len(timings) * 0.99)] * 1e6
+
+
+def report(name: str, store, args):
+    rate = transfer_throughput(store, args.threads, args.transfers)
+    p50, p99 = history_latency(store, args.queries, args.limit)
+    extra = ""
+    if isinstance(store, SQLiteAccountStore):
+        extra = f"  ({store.committed_writes / max(store.commits, 1):.1f} writes/commit)"
+    print(f"{name:<26} {rate:>10,.0f} transfers/s   history p50 {p50:7.1f} us  p99 {p99:7.1f} us{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite account store benchmark")
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--history-rows", type=int, default=100_000, help="seeded rows on each of 10 hot accounts")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--transfers", type=int, default=500, help="transfers per thread")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--synchronous", default="FULL", help="SQLite synchronous level")
+    args = parser.parse_args()
+
+    memory = AccountStore()
+    populate(memory, args.accounts, args.history_rows)
+    report("in-memory AccountStore", memory, args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, batch_size in (("SQLite, commit per write", 1), ("SQLite, group commit", 256)):
+            path = os.path.join(tmp, f"bench-{batch_size}.db")
+            store = SQLiteAccountStore(path, batch_size=batch_size, synchronous=args.synchronous)
+            populate(store, args.accounts, args.history_rows)
+            store.commits = store.committed_writes = 0
+            report(name, store, args)
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: LLM tool calling against the account APIs
+Runs questions that mention 0-3 accounts through the tool loop against the mock Mistral server
+and compares sequential with parallel tool execution, with a simulated account-API latency
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from banking_bot import BankingBot
+from account_store import AccountStore
+from tool_calling import ToolRunner
+from mock_mistral_server import MockMistralServer
+
+
+QUESTIONS = [
+    "What documents do I need to open a savings account?",
+    "How much did I spend last week on ACC001?",
+    "Compare the activity on ACC001 and ACC002 this month.",
+    "Which of ACC001, ACC002 and ACC003 has the most money left?",
+]
+
+
+class SlowAccountStore(AccountStore):
+    """AccountStore whose reads take as long as a call to a remote core-banking API."""
+
+    def __init__(self, delay: float, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+
+    def get_account_balance(self, account_id):
+        time.sleep(self.delay)
+        return super().get_account_balance(account_id)
+
+    def get_transaction_history(self, account_id, limit=5):
+        time.sleep(self.delay)
+        return super().get_transaction_history(account_id, limit=limit)
+
+
+def make_store(delay: float) -> SlowAccountStore:
+    store = SlowAccountStore(delay)
+    for i in range(1, 4):
+        store.add_account(f"ACC00{i}", f"Holder {i}", "Checking", 1000.0 * i)
+    return store
+
+
+def run(label: str, base_url: str, store: AccountStore, workers: int, rounds: int):
+    runner = ToolRunner(max_workers=workers)
+    bot = BankingBot(api_key="benchmark", base_url=base_url, account_store=store, tool_runner=runner)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for question in QUESTIONS:
+            bot.reset_conversation()
+            bot.chat(question)
+    elapsed = time.perf_counter() - start
+    stats = runner.stats.snapshot()
+    runner.close()
+    print(f"  {label:<22} {elapsed / stats['questions'] * 1000:7.1f} ms/question   "
+          f"{stats['tool_calls'] / stats['questions']:.1f} tool calls/question")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tool-calling loop benchmark")
+    parser.add_argument("--llm-ms", type=float, default=50, help="mock LLM latency per round trip")
+    parser.add_argument("--tool-ms", type=float, default=20, help="simulated latency per account API call")
+    parser.add_argument("--rounds", type=int, default=5, help="passes over the question set")
+    args = parser.parse_args()
+
+    server = MockMistralServer(latency=f"fixed:{args.llm_ms / 1000}", token_delay=0, tool_calls=True).start()
+    try:
+        store = make_store(args.tool_ms / 1000)
+        print(f"{len(QUESTIONS) * args.rounds} questions, LLM {args.llm_ms:g} ms, account API {args.tool_ms:g} ms")
+        run("sequential tools", server.base_url, store, 1, args.rounds)
+        stats = run("parallel tools", server.base_url, store, 8, args.rounds)
+    finally:
+        server.stop()
+
+    print(f"\nRound trips per resolved question: mean {stats['mean_round_trips']:.2f}")
+    for round_trips, count in stats["round_trip_histogram"].items():
+        print(f"  {round_trips} round trip(s): {count} questions")
+    print(f"Capped by max_iterations: {stats['capped']}")
+
+
+if __name__ == "__main__":
+    main()
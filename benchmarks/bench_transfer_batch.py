@@ -0,0 +1,76 @@
+"""
+Benchmark: transfer_batch vs. a loop of transfer_funds
+Runs a payroll-style batch (one employer paying many employees, plus random
+settlement transfers) through both APIs and reports transfers/sec
+"""
+
+import sys
+import os
+import time
+import random
+import argparse
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from account_store import AccountStore
+from sqlite_store import SQLiteAccountStore
+
+
+def build_transfers(accounts: int, transfers: int, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    ids = [f"ACC{i:06d}" for i in range(accounts)]
+    payroll = [("ACC000000", ids[1 + i % (accounts - 1)], rng.randrange(100_000, 500_000) / 100)
+               for i in range(transfers // 2)]
+    settlement = [(*rng.sample(ids[1:], 2), rng.randrange(100, 10_000) / 100)
+                  for _ in range(transfers - len(payroll))]
+    return payroll + settlement
+
+
+def populate(store, accounts: int):
+    store.add_account("ACC000000", "Employer", "Business", 10_000_000_000.00)
+    for i in range(1, accounts):
+        store.add_account(f"ACC{i:06d}", f"Holder {i}", "Checking", 1000.00)
+
+
+def run(name: str, make_store, transfers: list, accounts: int):
+    loop_store, batch_store = make_store("loop"), make_store("batch")
+    populate(loop_store, accounts)
+    populate(batch_store, accounts)
+
+    start = time.perf_counter()
+    for source, destination, amount in transfers:
+        loop_store.transfer_funds(source, destination, amount)
+    loop_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = batch_store.transfer_batch(transfers)
+    batch_elapsed = time.perf_counter() - start
+    assert result["success"], result.get("error")
+    assert loop_store.get_balances() == batch_store.get_balances(), "loop and batch disagree"
+
+    print(f"{name:<10} loop {len(transfers) / loop_elapsed:>11,.0f} transfers/s   "
+          f"batch {len(transfers) / batch_elapsed:>11,.0f} transfers/s   ({loop_elapsed / batch_elapsed:.1f}x)")
+    for store in (loop_store, batch_store):
+        if hasattr(store, "close"):
+            store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch transfer benchmark")
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--transfers", type=int, default=50_000)
+    parser.add_argument("--sqlite-transfers", type=int, default=5_000,
+                        help="transfers for the SQLite run (the loop commits each one)")
+    args = parser.parse_args()
+
+    run("in-memory", lambda _: AccountStore(), build_transfers(args.accounts, args.transfers), args.accounts)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run("SQLite", lambda name: SQLiteAccountStore(os.path.join(tmp, f"{name}.db")),
+            build_transfers(args.accounts, args.sqlite_transfers), args.accounts)
+
+
+if __name__ == "__main__":
+    main()
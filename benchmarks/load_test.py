@@ -0,0 +1,115 @@
+"""
+Concurrent load test for the Banking Bot
+Drives N simultaneous conversations through process_banking_command against the
+local mock Mistral server (or any --base-url) and reports throughput and latency percentiles
+"""
+
+import sys
+import os
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from banking_bot import BankingBot, API_ERROR_PREFIX
+from http_pool import configure_pool
+from mock_mistral_server import MockMistralServer
+from session_manager import SessionManager
+
+
+CONVERSATION = [
+    "What are your services?",
+    "balance ACC001",
+    "How can I protect my account from fraud?",
+    "history ACC002",
+    "What's the process for transferring money between accounts?",
+]
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def run_conversation(sessions: SessionManager, session_id: str, turns: int, results: list, lock: threading.Lock):
+    local = []
+    try:
+        for turn in range(turns):
+            message = CONVERSATION[turn % len(CONVERSATION)]
+            start = time.perf_counter()
+            response = sessions.process_banking_command(session_id, message)
+            local.append((time.perf_counter() - start, response.startswith(API_ERROR_PREFIX)))
+    finally:
+        # Turns completed before an exception still count
+        with lock:
+            results.extend(local)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test for BankingBot")
+    parser.add_argument("--conversations", type=int, default=50, help="concurrent conversations")
+    parser.add_argument("--turns", type=int, default=10, help="turns per conversation")
+    parser.add_argument("--base-url", help="existing server to target (default: start the local mock)")
+    parser.add_argument("--latency", default="lognormal:0.2,0.5", help="mock latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="mock HTTP 500 fraction")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="mock HTTP 429 fraction")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = MockMistralServer(
+            latency=args.latency,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+        ).start()
+        base_url = server.base_url
+
+    # One keep-alive connection per concurrent conversation
+    configure_pool(pool_maxsize=args.conversations)
+    sessions = SessionManager(bot=BankingBot(api_key=os.getenv("MISTRAL_API_KEY", "load-test"), base_url=base_url))
+
+    results = []
+    lock = threading.Lock()
+    print(f"{args.conversations} conversations x {args.turns} turns against {base_url}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.conversations) as pool:
+        futures = [pool.submit(run_conversation, sessions, f"load-{i}", args.turns, results, lock)
+                   for i in range(args.conversations)]
+    elapsed = time.perf_counter() - start
+
+    crashed = []
+    for i, future in enumerate(futures):
+        try:
+            future.result()
+        except Exception as e:
+            crashed.append((f"load-{i}", e))
+
+    if server is not None:
+        server.stop()
+
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    errors = sum(1 for _, failed in results if failed)
+    print(f"\nturns:       {len(results)}  ({errors} errors)")
+    print(f"elapsed:     {elapsed:.2f} s")
+    print(f"throughput:  {len(results) / elapsed:.1f} turns/s")
+    print(f"latency p50: {percentile(latencies, 50):8.2f} ms")
+    print(f"latency p95: {percentile(latencies, 95):8.2f} ms")
+    print(f"latency p99: {percentile(latencies, 99):8.2f} ms")
+
+    if crashed:
+        print(f"\n{len(crashed)} of {args.conversations} conversations crashed:")
+        for session_id, error in crashed[:5]:
+            print(f"  {session_id}: {type(error).__name__}: {error}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
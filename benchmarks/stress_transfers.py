@@ -0,0 +1,83 @@
+"""
+Multi-threaded transfer stress test and benchmark
+Hammers AccountStore.transfer_funds from many threads, checks that no account goes
+negative and the total money supply is conserved, and compares lock striping with
+a single global lock (lock_stripes=1)
+
+Note: on a GIL build of CPython pure-Python transfers cannot run in parallel, so
+throughput here mostly reflects lock overhead and contention; the striped store is
+what lets it scale on free-threaded builds or when transfers wait on I/O (journal, DB).
+"""
+
+import sys
+import os
+import time
+import random
+import argparse
+import threading
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from account_store import AccountStore
+
+
+def build_store(accounts: int, stripes: int) -> AccountStore:
+    store = AccountStore(lock_stripes=stripes)
+    for i in range(accounts):
+        store.add_account(f"ACC{i:05d}", f"Holder {i}", "Checking", 1000.00)
+    return store
+
+
+def worker(store: AccountStore, ids: list, transfers: int, seed: int, counts: list):
+    rng = random.Random(seed)
+    ok = 0
+    for _ in range(transfers):
+        source, destination = rng.sample(ids, 2)
+        if store.transfer_funds(source, destination, rng.randrange(1, 50_000) / 100)["success"]:
+            ok += 1
+    counts.append(ok)
+
+
+def run(accounts: int, threads: int, transfers: int, stripes: int) -> float:
+    store = build_store(accounts, stripes)
+    ids = list(store)
+    expected_total = sum(store.get_balances().values())
+
+    counts = []
+    pool = [threading.Thread(target=worker, args=(store, ids, transfers, seed, counts)) for seed in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    balances = store.get_balances()
+    total = sum(balances.values())
+    assert abs(total - expected_total) < 0.005, f"money supply changed: {expected_total} -> {total}"
+    assert min(balances.values()) >= 0, "an account went negative"
+    successful = sum(counts)
+    assert len(store.ledger) == 2 * successful, "ledger rows do not match successful transfers"
+
+    rate = threads * transfers / elapsed
+    print(f"  stripes={stripes:<4} threads={threads:<3} {rate:>10,.0f} transfers/s   "
+          f"{successful:>8,} applied   total conserved ({total:,.2f})")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent transfer stress test")
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--transfers", type=int, default=20_000, help="transfers per thread")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    for stripes in (1, 256):
+        print(f"\n{'global lock' if stripes == 1 else 'striped locks'}:")
+        for threads in args.threads:
+            run(args.accounts, threads, args.transfers, stripes)
+
+
+if __name__ == "__main__":
+    main()
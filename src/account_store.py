@@ -0,0 +1,866 @@
+"""
+Compact account store and transaction ledger
+Slotted account records over a columnar, array-backed transaction log
+"""
+
+import math
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Optional, Dict, Any, List, Iterator, Iterable, Tuple, Union
+
+
+# Transaction types that add money to an account; every other type is an outflow
+INFLOW_TYPES = ("deposit",)
+
+# Ledger positions between running-balance checkpoints (bounds the scan in get_balance_at)
+CHECKPOINT_INTERVAL = 64
+
+# Largest amount in cents that fits the ledger's int64 amount column
+MAX_CENTS = 2 ** 63 - 1
+
+
+def to_cents(amount: float) -> int:
+    """Convert a dollar amount to integer cents."""
+    return int(round(amount * 100))
+
+
+def from_cents(cents: int) -> float:
+    """Convert integer cents to a dollar amount."""
+    return cents / 100
+
+
+def date_to_ordinal(value: str) -> int:
+    """Convert a YYYY-MM-DD string to a proleptic Gregorian ordinal."""
+    return date.fromisoformat(value).toordinal()
+
+
+def make_cursor(date_value: str, row: int) -> str:
+    """Encode a pagination cursor pointing at one transaction (its date and row id)."""
+    return f"{date_value}:{row}"
+
+
+def parse_cursor(cursor: str) -> Tuple[str, int]:
+    """Decode a cursor from make_cursor; raises ValueError if it is malformed."""
+    date_value, _, row = cursor.rpartition(":")
+    try:
+        date.fromisoformat(date_value)
+        return date_value, int(row)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+def normalize_types(types: Union[str, Iterable[str], None]) -> Optional[Tuple[str, ...]]:
+    """Accept one type, a comma-separated string, or an iterable of types."""
+    if types is None:
+        return None
+    if isinstance(types, str):
+        types = types.split(",")
+    return tuple(t.strip().lower() for t in types if t.strip())
+
+
+def plan_transfer_batch(
+    transfers: List[Tuple[str, str, int]],
+    balances: Dict[str, int],
+    atomic: bool = True,
+    failures: Optional[List[Dict[str, Any]]] = None,
+) -> Tuple[List[int], List[Dict[str, Any]]]:
+    """
+    Decide which transfers of a batch can be applied.
+
+    Validation runs over the whole batch before anything is applied: unknown
+    accounts and non-positive amounts first, then balances. In atomic mode each
+    account's net debit across the batch is checked against its balance and any
+    failure rejects the batch; otherwise transfers are taken in order and those
+    that would overdraw their source are skipped.
+
+    Args:
+        transfers: (from_account, to_account, amount_cents) rows; None for a row that
+            failed normalization
+        balances: Current balance in cents of every existing account the batch touches
+        atomic: All-or-nothing if True, per-row failures if False
+        failures: Failures already found for the None rows (see normalize_transfers)
+
+    Returns:
+        (indexes of transfers to apply, failures as {"index", "error"} dicts)
+    """
+    failures = list(failures or ())
+    for i, row in enumerate(transfers):
+        if row is None:
+            continue
+        source, destination, cents = row
+        if source not in balances:
+            failures.append({"index": i, "error": f"Source account {source} not found"})
+        elif destination not in balances:
+            failures.append({"index": i, "error": f"Destination account {destination} not found"})
+        elif cents <= 0:
+            failures.append({"index": i, "error": "Transfer amount must be positive"})
+
+    if atomic:
+        if failures:
+            failures.sort(key=lambda failure: failure["index"])
+            return [], failures
+        net = dict.fromkeys(balances, 0)
+        for source, destination, cents in transfers:
+            net[source] -= cents
+            net[destination] += cents
+        overdrawn = {acc for acc, change in net.items() if balances[acc] + change < 0}
+        if overdrawn:
+            return [], [{"index": i, "error": "Insufficient funds"}
+                        for i, (source, _, _) in enumerate(transfers) if source in overdrawn]
+        return list(range(len(transfers))), []
+
+    invalid = {failure["index"] for failure in failures}
+    running = dict(balances)
+    accepted = []
+    for i, row in enumerate(transfers):
+        if i in invalid:
+            continue
+        source, destination, cents = row
+        if running[source] < cents:
+            failures.append({"index": i, "error": "Insufficient funds"})
+            continue
+        running[source] -= cents
+        running[destination] += cents
+        accepted.append(i)
+    failures.sort(key=lambda failure: failure["index"])
+    return accepted, failures
+
+
+def normalize_transfer(transfer: Any) -> Tuple[str, str, int]:
+    """
+    Accept a (from, to, amount) tuple or a dict with from_account/to_account/amount.
+
+    Raises:
+        ValueError: If the transfer is malformed or its amount is not a finite number
+            that fits the ledger
+    """
+    try:
+        if isinstance(transfer, dict):
+            source, destination, amount = transfer["from_account"], transfer["to_account"], transfer["amount"]
+        else:
+            source, destination, amount = transfer
+    except KeyError as e:
+        raise ValueError(f"Missing field {e.args[0]!r}")
+    except (TypeError, ValueError):
+        raise ValueError("Expected (from_account, to_account, amount)")
+    try:
+        amount = float(amount)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid transfer amount {amount!r}")
+    if not math.isfinite(amount) or abs(amount) * 100 > MAX_CENTS:
+        raise ValueError(f"Invalid transfer amount {amount!r}")
+    return source, destination, to_cents(amount)
+
+
+def transfer_cents(amount: Any) -> int:
+    """
+    Validate one transfer amount and convert it to cents.
+
+    Raises:
+        ValueError: If it is not a finite, positive number of cents that fits the ledger
+    """
+    _, _, cents = normalize_transfer((None, None, amount))
+    if cents <= 0:
+        raise ValueError("Transfer amount must be positive")
+    return cents
+
+
+def normalize_transfers(transfers: Iterable[Any]) -> Tuple[List[Optional[Tuple[str, str, int]]], List[Dict[str, Any]]]:
+    """
+    Normalize a batch, reporting malformed rows instead of raising.
+
+    Returns:
+        (one row per transfer, None where it is malformed; failures as {"index", "error"})
+    """
+    rows, failures = [], []
+    for i, transfer in enumerate(transfers):
+        try:
+            rows.append(normalize_transfer(transfer))
+        except ValueError as e:
+            rows.append(None)
+            failures.append({"index": i, "error": str(e)})
+    return rows, failures
+
+
+def batch_result(applied: int, failures: List[Dict[str, Any]], atomic: bool) -> Dict[str, Any]:
+    """Build the transfer_batch result dict."""
+    result = {"success": not failures, "applied": applied, "failures": failures}
+    if atomic and failures:
+        result["error"] = f"Batch rejected: {len(failures)} invalid transfer(s)"
+    return result
+
+
+class Account:
+    """
+    One account record. Transactions live in the Ledger; `rows` indexes them.
+
+    `rows` is kept sorted by (date, row number) with `dates` as its parallel date
+    column, so date ranges and cursors resolve with bisect.
+
+    `checkpoints[j]` is the signed sum of the first j * CHECKPOINT_INTERVAL rows and
+    `net_cents` the sum of all of them. Both are maintained as rows are appended; a
+    back-dated insert drops the checkpoints after it and sets `net_cents` to None
+    until the next balance-as-of query rebuilds them.
+    """
+
+    __slots__ = ("account_id", "index", "account_holder", "account_type", "balance_cents", "rows", "dates",
+                 "checkpoints", "net_cents")
+
+    def __init__(self, account_id: str, index: int, account_holder: str, account_type: str, balance_cents: int):
+        self.account_id = account_id
+        self.index = index
+        self.account_holder = account_holder
+        self.account_type = account_type
+        self.balance_cents = balance_cents
+        # Ledger row numbers for this account, ordered by date then insertion
+        self.rows = array("q")
+        self.dates = array("i")
+        self.checkpoints = array("q", [0])
+        self.net_cents: Optional[int] = 0
+
+
+class _InternTable:
+    """Maps repeated strings to small integer codes."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+class StripedLocks:
+    """
+    A fixed pool of locks shared by many keys.
+
+    Keys hash onto stripes; multi-key acquisitions take their stripes in ascending
+    order, so two transfers touching the same accounts can never deadlock.
+    """
+
+    def __init__(self, stripes: int = 256):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def stripe(self, key: str) -> int:
+        return hash(key) % len(self._locks)
+
+    @contextmanager
+    def hold(self, *keys: str):
+        """Hold the stripes for all keys for the duration of the block."""
+        locks = [self._locks[i] for i in sorted({self.stripe(key) for key in keys})]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    @contextmanager
+    def hold_all(self):
+        """Hold every stripe, for store-wide consistent reads."""
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
+
+
+class Ledger:
+    """
+    Columnar transaction log.
+
+    Each transaction is one row across parallel arrays: account index (int32),
+    date ordinal (int32), type code (int8), amount in cents (int64) and
+    description code (int32). Types and descriptions are interned.
+    """
+
+    def __init__(self):
+        self.account = array("i")
+        self.date = array("i")
+        self.type = array("b")
+        self.amount = array("q")
+        self.description = array("i")
+        self.types = _InternTable()
+        self.descriptions = _InternTable()
+        self._date_strings: Dict[int, str] = {}
+        # Row numbers and intern codes must be assigned atomically across threads
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    def extend(self, account_indexes: List[int], date_ordinal: int, txn_type: str,
+               amounts: List[int], descriptions: List[str]) -> int:
+        """Append many same-day, same-type transactions at once and return the first row number."""
+        count = len(amounts)
+        # Every column is built first, so a bad value (e.g. an amount beyond int64) raises
+        # before any column grows and the columns stay aligned
+        new_account = array("i", account_indexes)
+        new_date = array("i", [date_ordinal]) * count
+        new_amount = array("q", amounts)
+        with self._lock:
+            first = len(self.amount)
+            new_type = array("b", [self.types.code(txn_type)]) * count
+            code = self.descriptions.code
+            new_description = array("i", [code(text) for text in descriptions])
+            self.account.extend(new_account)
+            self.date.extend(new_date)
+            self.type.extend(new_type)
+            self.amount.extend(new_amount)
+            self.description.extend(new_description)
+            return first
+
+    def extend_rows(self, account_indexes: List[int], date_ordinals: List[int], txn_types: List[str],
+                    amounts: List[int], descriptions: List[str]) -> int:
+        """Append many arbitrary transactions at once and return the first row number."""
+        # As in extend(): build every column before growing any of them
+        new_account = array("i", account_indexes)
+        new_date = array("i", date_ordinals)
+        new_amount = array("q", amounts)
+        with self._lock:
+            first = len(self.amount)
+            type_code = self.types.code
+            new_type = array("b", [type_code(txn_type) for txn_type in txn_types])
+            code = self.descriptions.code
+            new_description = array("i", [code(text) for text in descriptions])
+            self.account.extend(new_account)
+            self.date.extend(new_date)
+            self.type.extend(new_type)
+            self.amount.extend(new_amount)
+            self.description.extend(new_description)
+            return first
+
+    def append(self, account_index: int, date_ordinal: int, txn_type: str, amount_cents: int, description: str) -> int:
+        """Append one transaction and return its row number."""
+        with self._lock:
+            self.account.append(account_index)
+            self.date.append(date_ordinal)
+            self.type.append(self.types.code(txn_type))
+            self.amount.append(amount_cents)
+            self.description.append(self.descriptions.code(description))
+            return len(self.amount) - 1
+
+    def date_string(self, ordinal: int) -> str:
+        text = self._date_strings.get(ordinal)
+        if text is None:
+            text = date.fromordinal(ordinal).isoformat()
+            self._date_strings[ordinal] = text
+        return text
+
+    def row(self, row: int) -> Dict[str, Any]:
+        """Materialize one row in the public transaction dict format."""
+        return {
+            "date": self.date_string(self.date[row]),
+            "type": self.types.values[self.type[row]],
+            "amount": from_cents(self.amount[row]),
+            "description": self.descriptions.values[self.description[row]],
+        }
+
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers."""
+        return sum(col.itemsize * len(col) for col in (self.account, self.date, self.type, self.amount, self.description))
+
+
+class AccountStore:
+    """
+    In-memory account store backed by a Ledger.
+
+    Methods return the same dict shapes the BankingBot API has always returned.
+    Every read or write of an account's balance and rows holds that account's
+    lock stripe, so concurrent transfers cannot double-spend.
+    """
+
+    def __init__(self, lock_stripes: int = 256, journal=None):
+        """
+        Initialize an empty store.
+
+        Args:
+            lock_stripes: Number of account lock stripes (1 gives a single global lock)
+            journal: Write-ahead journal that records every balance change (see journal.Journal)
+        """
+        self.ledger = Ledger()
+        self.locks = StripedLocks(lock_stripes)
+        self._accounts: Dict[str, Account] = {}
+        # None marks an account still only in the snapshot (see snapshot.load_snapshot)
+        self._by_index: List[Optional[Account]] = []
+        self._snapshot = None
+        self._create_lock = threading.Lock()
+        self.journal = journal
+
+    @classmethod
+    def from_dict(cls, accounts: Dict[str, Dict[str, Any]]) -> "AccountStore":
+        """Build a store from the legacy dict-of-dicts account format."""
+        store = cls()
+        for account_id, info in accounts.items():
+            store.add_account(
+                account_id,
+                info["account_holder"],
+                info["account_type"],
+                info["balance"],
+                info.get("transactions", ()),
+            )
+        return store
+
+    def add_account(
+        self,
+        account_id: str,
+        account_holder: str,
+        account_type: str,
+        balance: float,
+        transactions: Iterable[Dict[str, Any]] = (),
+    ) -> Account:
+        """Create an account, optionally with existing transactions (dicts in the public format)."""
+        rows = [(date_to_ordinal(txn["date"]), txn["type"], to_cents(txn["amount"]), txn["description"])
+                for txn in transactions]
+        with self._create_lock:
+            if account_id in self:
+                raise ValueError(f"Account {account_id} already exists")
+            seq = self._log("add_account", account_id=account_id, holder=account_holder,
+                            type=account_type, cents=to_cents(balance), transactions=rows)
+            account = self._create_account(account_id, account_holder, account_type, to_cents(balance), rows)
+        self._wait_durable(seq)
+        return account
+
+    def _create_account(self, account_id: str, account_holder: str, account_type: str,
+                        balance_cents: int, rows: Iterable[Tuple[int, str, int, str]]) -> Account:
+        """Build and publish an account; the caller holds _create_lock."""
+        account = Account(account_id, len(self._by_index), account_holder, account_type, balance_cents)
+        self._by_index.append(account)
+        for date_ordinal, txn_type, amount_cents, description in rows:
+            self._record(account, date_ordinal, txn_type, amount_cents, description)
+        # Publish only once fully built
+        self._accounts[account_id] = account
+        return account
+
+    def _log(self, op: str, **fields: Any) -> Optional[int]:
+        """Journal a change before it is applied; call with the affected accounts' locks held."""
+        return self.journal.append(op, fields) if self.journal is not None else None
+
+    def _wait_durable(self, seq: Optional[int]):
+        """Block until a journaled change is durable (a no-op without a journal or in async mode)."""
+        if seq is not None:
+            self.journal.wait(seq)
+
+    def _record(self, account: Account, date_ordinal: int, txn_type: str, amount_cents: int, description: str) -> int:
+        row = self.ledger.append(account.index, date_ordinal, txn_type, amount_cents, description)
+        self._index_row(account, date_ordinal, row, amount_cents if txn_type in INFLOW_TYPES else -amount_cents)
+        return row
+
+    @staticmethod
+    def _index_row(account: Account, date_ordinal: int, row: int, signed_cents: int):
+        if not account.dates or account.dates[-1] <= date_ordinal:
+            account.dates.append(date_ordinal)
+            account.rows.append(row)
+            if account.net_cents is not None:
+                account.net_cents += signed_cents
+                if len(account.rows) % CHECKPOINT_INTERVAL == 0:
+                    account.checkpoints.append(account.net_cents)
+        else:
+            # Back-dated entry: insert after any rows with the same date
+            position = bisect_right(account.dates, date_ordinal)
+            account.dates.insert(position, date_ordinal)
+            account.rows.insert(position, row)
+            # Checkpoints covering later positions have shifted; rebuild them on demand
+            del account.checkpoints[position // CHECKPOINT_INTERVAL + 1:]
+            account.net_cents = None
+
+    def _signed_cents(self, row: int) -> int:
+        amount = self.ledger.amount[row]
+        return amount if self.ledger.types.values[self.ledger.type[row]] in INFLOW_TYPES else -amount
+
+    def _ensure_checkpoints(self, account: Account):
+        """Extend an account's checkpoints to its last row; the caller holds its lock."""
+        if account.net_cents is not None:
+            return
+        checkpoints, rows = account.checkpoints, account.rows
+        running = checkpoints[-1]
+        for position in range((len(checkpoints) - 1) * CHECKPOINT_INTERVAL, len(rows)):
+            running += self._signed_cents(rows[position])
+            if (position + 1) % CHECKPOINT_INTERVAL == 0:
+                checkpoints.append(running)
+        account.net_cents = running
+
+    def _prefix_cents(self, account: Account, position: int) -> int:
+        """Signed sum of an account's first `position` rows: one checkpoint plus a short scan."""
+        block = position // CHECKPOINT_INTERVAL
+        total = account.checkpoints[block]
+        for i in range(block * CHECKPOINT_INTERVAL, position):
+            total += self._signed_cents(account.rows[i])
+        return total
+
+    # Mapping-style access, so `account_id in store` keeps working
+    def __contains__(self, account_id: str) -> bool:
+        if account_id in self._accounts:
+            return True
+        return self._snapshot is not None and self._snapshot.find(account_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        if self._snapshot is None:
+            return iter(self._accounts)
+        return (acc.account_id if acc is not None else self._snapshot.account_id(i)
+                for i, acc in enumerate(self._by_index))
+
+    def __len__(self) -> int:
+        return len(self._by_index)
+
+    def __getitem__(self, account_id: str) -> Dict[str, Any]:
+        if account_id not in self:
+            raise KeyError(account_id)
+        return self.get_account_info(account_id)
+
+    def get_account(self, account_id: str) -> Optional[Account]:
+        account = self._accounts.get(account_id)
+        if account is None and self._snapshot is not None:
+            index = self._snapshot.find(account_id)
+            if index is not None:
+                account = self._materialize(index)
+        return account
+
+    def _materialize(self, index: int) -> Account:
+        """Create the record for a snapshot-backed account on first use."""
+        with self._create_lock:
+            account = self._by_index[index]
+            if account is None:
+                account = self._snapshot.load_account(index)
+                self._by_index[index] = account
+                self._accounts[account.account_id] = account
+            return account
+
+    def accounts(self) -> List[Account]:
+        """Every account record in index order, materializing any still backed by a snapshot."""
+        return [acc if acc is not None else self._materialize(i) for i, acc in enumerate(list(self._by_index))]
+
+    def get_account_info(self, account_id: str) -> Dict[str, Any]:
+        """Get account information, including all transactions."""
+        account = self.get_account(account_id)
+        if account is None:
+            return {"error": f"Account {account_id} not found"}
+        with self.locks.hold(account_id):
+            balance_cents = account.balance_cents
+            rows = array("q", account.rows)
+        return {
+            "account_holder": account.account_holder,
+            "balance": from_cents(balance_cents),
+            "account_type": account.account_type,
+            "transactions": [self.ledger.row(row) for row in rows],
+        }
+
+    def get_account_balance(self, account_id: str) -> Optional[float]:
+        """Get the balance of an account, or None if it does not exist."""
+        account = self.get_account(account_id)
+        if account is None:
+            return None
+        with self.locks.hold(account_id):
+            return from_cents(account.balance_cents)
+
+    def get_balances(self, account_ids: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """
+        Read several balances as one consistent snapshot.
+
+        No transfer between the given accounts can be half-applied in the result.
+
+        Args:
+            account_ids: Accounts to read (all accounts if omitted)
+
+        Returns:
+            Mapping of account id to balance; unknown ids are omitted
+        """
+        if account_ids is None:
+            with self.locks.hold_all():
+                if self._snapshot is None:
+                    return {acc_id: from_cents(acc.balance_cents) for acc_id, acc in self._accounts.items()}
+                # Untouched snapshot accounts are read straight from the mapped file
+                snapshot = self._snapshot
+                return {
+                    acc.account_id if acc is not None else snapshot.account_id(i):
+                        from_cents(acc.balance_cents if acc is not None else snapshot.balance_cents(i))
+                    for i, acc in enumerate(self._by_index)
+                }
+
+        accounts = [acc for acc in map(self.get_account, account_ids) if acc is not None]
+        with self.locks.hold(*(acc.account_id for acc in accounts)):
+            return {acc.account_id: from_cents(acc.balance_cents) for acc in accounts}
+
+    def transfer_funds(self, from_account: str, to_account: str, amount: float) -> Dict[str, Any]:
+        """Transfer funds between accounts."""
+        try:
+            amount_cents = transfer_cents(amount)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+
+        source = self.get_account(from_account)
+        if source is None:
+            return {"success": False, "error": f"Source account {from_account} not found"}
+
+        destination = self.get_account(to_account)
+        if destination is None:
+            return {"success": False, "error": f"Destination account {to_account} not found"}
+
+        today = datetime.now().date().toordinal()
+
+        # Check and apply the debit/credit pair atomically under both accounts' stripes
+        with self.locks.hold(from_account, to_account):
+            if source.balance_cents < amount_cents:
+                return {"success": False, "error": "Insufficient funds"}
+
+            seq = self._log("transfer", src=from_account, dst=to_account, cents=amount_cents, date=today)
+            self._apply_transfer(source, destination, amount_cents, today)
+            new_balance_cents = source.balance_cents
+
+        self._wait_durable(seq)
+        return {
+            "success": True,
+            "message": f"Transferred ${from_cents(amount_cents):.2f} from {from_account} to {to_account}",
+            "new_balance": from_cents(new_balance_cents),
+        }
+
+    def _apply_transfer(self, source: Account, destination: Account, amount_cents: int, date_ordinal: int):
+        source.balance_cents -= amount_cents
+        destination.balance_cents += amount_cents
+        self._record(source, date_ordinal, "transfer", amount_cents, f"Transfer to {destination.account_id}")
+        self._record(destination, date_ordinal, "deposit", amount_cents, f"Transfer from {source.account_id}")
+
+    def transfer_batch(self, transfers: Iterable[Any], atomic: bool = True) -> Dict[str, Any]:
+        """
+        Apply many transfers with one up-front validation pass and bulk ledger writes.
+
+        Args:
+            transfers: (from_account, to_account, amount) tuples or dicts with those keys
+            atomic: Apply all transfers or none; if False, apply the valid ones in order
+                and report the rest
+
+        Returns:
+            {"success", "applied", "failures"}; each failure is {"index", "error"}
+        """
+        rows, invalid = normalize_transfers(transfers)
+        involved = {acc_id for row in rows if row is not None for acc_id in row[:2]}
+        accounts = {acc.account_id: acc for acc in map(self.get_account, involved) if acc is not None}
+        today = datetime.now().date().toordinal()
+
+        seq = None
+        with self.locks.hold(*accounts):
+            balances = {acc_id: account.balance_cents for acc_id, account in accounts.items()}
+            accepted, failures = plan_transfer_batch(rows, balances, atomic, invalid)
+            if accepted:
+                applied = [rows[i] for i in accepted]
+                seq = self._log("batch", transfers=applied, date=today)
+                self._apply_batch(accounts, applied, today)
+
+        self._wait_durable(seq)
+        return batch_result(len(accepted), failures, atomic)
+
+    def _apply_batch(self, accounts: Dict[str, Account], transfers: List[Tuple[str, str, int]], date_ordinal: int):
+        sources = [accounts[source] for source, _, _ in transfers]
+        destinations = [accounts[destination] for _, destination, _ in transfers]
+        amounts = [cents for _, _, cents in transfers]
+        for source, destination, cents in zip(sources, destinations, amounts):
+            source.balance_cents -= cents
+            destination.balance_cents += cents
+
+        debit_start = self.ledger.extend(
+            [acc.index for acc in sources], date_ordinal, "transfer", amounts,
+            [f"Transfer to {acc.account_id}" for acc in destinations],
+        )
+        credit_start = self.ledger.extend(
+            [acc.index for acc in destinations], date_ordinal, "deposit", amounts,
+            [f"Transfer from {acc.account_id}" for acc in sources],
+        )
+        # Index in row order so same-day rows stay ascending for cursors
+        for offset, (source, cents) in enumerate(zip(sources, amounts)):
+            self._index_row(source, date_ordinal, debit_start + offset, -cents)
+        for offset, (destination, cents) in enumerate(zip(destinations, amounts)):
+            self._index_row(destination, date_ordinal, credit_start + offset, cents)
+
+    def import_transactions(self, rows: List[Tuple[str, int, str, int, str]],
+                            update_balances: bool = False) -> Dict[str, Any]:
+        """
+        Bulk-insert transactions for existing accounts (see importer.import_file).
+
+        Args:
+            rows: (account_id, date_ordinal, type, amount_cents, description) tuples
+            update_balances: Also apply each transaction to its account's balance; by
+                default rows are history only, like the transactions given to add_account
+
+        Returns:
+            {"success", "applied", "failures"}; rows for unknown accounts are reported by index
+        """
+        accounts = {}
+        for acc_id in {row[0] for row in rows}:
+            account = self.get_account(acc_id)
+            if account is not None:
+                accounts[acc_id] = account
+        failures = [{"index": i, "error": f"Account {row[0]} not found"}
+                    for i, row in enumerate(rows) if row[0] not in accounts]
+        accepted = [row for row in rows if row[0] in accounts] if failures else rows
+
+        seq = None
+        if accepted:
+            with self.locks.hold(*accounts):
+                seq = self._log("import", rows=accepted, update_balances=update_balances)
+                self._apply_import(accounts, accepted, update_balances)
+        self._wait_durable(seq)
+        return batch_result(len(accepted), failures, atomic=False)
+
+    def _apply_import(self, accounts: Dict[str, Account], rows: List[Tuple[str, int, str, int, str]],
+                      update_balances: bool):
+        first = self.ledger.extend_rows(
+            [accounts[row[0]].index for row in rows], [row[1] for row in rows], [row[2] for row in rows],
+            [row[3] for row in rows], [row[4] for row in rows],
+        )
+        for offset, (acc_id, date_ordinal, txn_type, cents, _) in enumerate(rows):
+            account = accounts[acc_id]
+            signed_cents = cents if txn_type in INFLOW_TYPES else -cents
+            self._index_row(account, date_ordinal, first + offset, signed_cents)
+            if update_balances:
+                account.balance_cents += signed_cents
+
+    def get_balance_at(self, account_id: str, as_of: str) -> Dict[str, Any]:
+        """
+        Get an account's balance at the end of a given day.
+
+        The current balance minus everything recorded after that day, found with a
+        bisect over the date index and one running-balance checkpoint.
+
+        Args:
+            account_id: Account to query
+            as_of: Date (YYYY-MM-DD); transactions on that day are included
+
+        Returns:
+            {"account_id", "date", "balance"}
+        """
+        ordinal = date_to_ordinal(as_of)
+        account = self.get_account(account_id)
+        if account is None:
+            return {"error": f"Account {account_id} not found"}
+
+        with self.locks.hold(account_id):
+            self._ensure_checkpoints(account)
+            position = bisect_right(account.dates, ordinal)
+            later_cents = account.net_cents - self._prefix_cents(account, position)
+            balance_cents = account.balance_cents - later_cents
+        return {"account_id": account_id, "date": as_of, "balance": from_cents(balance_cents)}
+
+    def get_transaction_history(self, account_id: str, limit: int = 5) -> Dict[str, Any]:
+        """Get the most recent transactions for an account, by date."""
+        account = self.get_account(account_id)
+        if account is None:
+            return {"error": f"Account {account_id} not found"}
+
+        with self.locks.hold(account_id):
+            rows = account.rows[-limit:]
+        return {
+            "account_id": account_id,
+            "transactions": [self.ledger.row(row) for row in rows],
+        }
+
+    def query_transactions(
+        self,
+        account_id: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        types: Union[str, Iterable[str], None] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        description: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        newest_first: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Query an account's transactions with filters and cursor pagination.
+
+        The date range is resolved by bisecting the account's date index, so the
+        cost depends on the rows inside the range, not on the whole history.
+
+        Args:
+            account_id: Account to query
+            start_date: First date included (YYYY-MM-DD)
+            end_date: Last date included (YYYY-MM-DD)
+            types: Transaction type(s) to keep, e.g. "withdrawal" or ["deposit", "transfer"]
+            min_amount: Smallest amount included
+            max_amount: Largest amount included
+            description: Case-insensitive substring the description must contain
+            cursor: `next_cursor` from the previous page
+            limit: Maximum transactions per page
+            newest_first: Return the newest transactions first
+
+        Returns:
+            {"account_id", "transactions", "next_cursor"}; next_cursor is None on the last page
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        account = self.get_account(account_id)
+        if account is None:
+            return {"error": f"Account {account_id} not found"}
+
+        ledger = self.ledger
+        wanted_types = normalize_types(types)
+        type_codes = None
+        if wanted_types is not None:
+            type_codes = {ledger.types.codes[t] for t in wanted_types if t in ledger.types.codes}
+        min_cents = to_cents(min_amount) if min_amount is not None else None
+        max_cents = to_cents(max_amount) if max_amount is not None else None
+        needle = description.lower() if description else None
+        description_matches: Dict[int, bool] = {}
+
+        with self.locks.hold(account_id):
+            dates, rows = account.dates, account.rows
+            lo = bisect_left(dates, date_to_ordinal(start_date)) if start_date else 0
+            hi = bisect_right(dates, date_to_ordinal(end_date)) if end_date else len(dates)
+            if cursor:
+                cursor_date, cursor_row = parse_cursor(cursor)
+                ordinal = date_to_ordinal(cursor_date)
+                first, last = bisect_left(dates, ordinal), bisect_right(dates, ordinal)
+                # Rows sharing a date are in ascending row order
+                if newest_first:
+                    hi = min(hi, bisect_left(rows, cursor_row, first, last))
+                else:
+                    lo = max(lo, bisect_right(rows, cursor_row, first, last))
+
+            positions = range(hi - 1, lo - 1, -1) if newest_first else range(lo, hi)
+            matches = []
+            for position in positions:
+                row = rows[position]
+                if type_codes is not None and ledger.type[row] not in type_codes:
+                    continue
+                amount = ledger.amount[row]
+                if (min_cents is not None and amount < min_cents) or (max_cents is not None and amount > max_cents):
+                    continue
+                if needle is not None:
+                    code = ledger.description[row]
+                    found = description_matches.get(code)
+                    if found is None:
+                        found = description_matches[code] = needle in ledger.descriptions.values[code].lower()
+                    if not found:
+                        continue
+                matches.append(row)
+                # One extra match tells us whether another page exists
+                if len(matches) > limit:
+                    break
+
+        page = matches[:limit]
+        next_cursor = None
+        if len(matches) > limit:
+            last_row = page[-1]
+            next_cursor = make_cursor(ledger.date_string(ledger.date[last_row]), last_row)
+        return {
+            "account_id": account_id,
+            "transactions": [ledger.row(row) for row in page],
+            "next_cursor": next_cursor,
+        }
@@ -0,0 +1,329 @@
+"""
+Account analytics over the transaction ledger
+Monthly flows, spend by category, average balance and top counterparties, computed with NumPy
+"""
+
+import re
+from datetime import date
+from typing import Optional, Dict, Any, List, Callable, Iterable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from .account_store import AccountStore, INFLOW_TYPES, from_cents, to_cents, date_to_ordinal
+except ImportError:
+    from account_store import AccountStore, INFLOW_TYPES, from_cents, to_cents, date_to_ordinal
+
+_COUNTERPARTY = re.compile(r"^Transfer (?:to|from) (\S+)$")
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def counterparty_of(description: str) -> Optional[str]:
+    """Return the other account of a transfer description, or None."""
+    match = _COUNTERPARTY.match(description)
+    return match.group(1) if match else None
+
+
+def default_category(description: str) -> str:
+    """Group transfers together; otherwise the description is the category."""
+    return "Transfers" if counterparty_of(description) else description
+
+
+def _column(column, dtype):
+    """A ledger column as a NumPy array; snapshot-backed columns come in two segments."""
+    segments = column.segments() if hasattr(column, "segments") else (column,)
+    if len(segments) == 1:
+        return np.frombuffer(segments[0], dtype=dtype)
+    return np.concatenate([np.frombuffer(segment, dtype=dtype) for segment in segments])
+
+
+class AccountAnalytics:
+    """
+    Vectorized aggregates over a point-in-time snapshot of an account store.
+
+    The ledger columns are copied into NumPy arrays once (under the store's locks,
+    so balances and rows agree), grouped by account so one account's rows are a
+    contiguous slice. Every aggregate is then a handful of array operations, for
+    one account or for all accounts together. Call refresh() to pick up newer
+    transactions.
+    """
+
+    def __init__(
+        self,
+        store,
+        account_ids: Optional[Iterable[str]] = None,
+        categorize: Callable[[str], str] = default_category,
+    ):
+        """
+        Snapshot a store.
+
+        Args:
+            store: AccountStore (columns copied directly) or any store with the same API
+            account_ids: Only snapshot these accounts (all accounts if omitted)
+            categorize: Maps a transaction description to a spending category
+        """
+        if np is None:
+            raise ImportError("Account analytics require NumPy. Install it with: pip install numpy")
+        self.store = store
+        self.selected = list(account_ids) if account_ids is not None else None
+        self.categorize = categorize
+        self.refresh()
+
+    def refresh(self):
+        """Re-read the store."""
+        if isinstance(self.store, AccountStore):
+            lengths = self._snapshot_ledger(self.store)
+        else:
+            lengths = self._snapshot_generic(self.store)
+        self._index = {acc_id: i for i, acc_id in enumerate(self.account_ids)}
+        self._offsets = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+        self.account = np.repeat(np.arange(len(lengths), dtype=np.int32), lengths)
+
+        # Amounts with inflows positive and outflows negative
+        self.signed = np.where(np.isin(self.type_code, self._inflow_codes()), self.amount, -self.amount)
+        # Per-description lookup tables, so categories and counterparties are array gathers;
+        # only descriptions that occur in the snapshot are classified
+        used = np.flatnonzero(np.bincount(self.description, minlength=len(self.descriptions)))
+        texts = [self.descriptions[code] for code in used]
+        self.category_names, category_codes = np.unique(
+            np.array([self.categorize(text) for text in texts] + [""], dtype=object), return_inverse=True)
+        self._category_of = np.zeros(max(len(self.descriptions), 1), dtype=np.int32)
+        self._category_of[used] = category_codes[:-1]
+        counterparties = [counterparty_of(text) for text in texts]
+        self.counterparty_names = sorted({name for name in counterparties if name})
+        positions = {name: i for i, name in enumerate(self.counterparty_names)}
+        self._counterparty_of = np.full(max(len(self.descriptions), 1), -1, dtype=np.int32)
+        self._counterparty_of[used] = [positions.get(name, -1) for name in counterparties]
+
+    def _snapshot_ledger(self, store: AccountStore) -> List[int]:
+        ledger = store.ledger
+        ids = self.selected
+        # Resolve records before taking the ledger lock (account creation takes them in the other order)
+        if ids is None:
+            accounts = store.accounts()
+        else:
+            accounts = [acc for acc in map(store.get_account, ids) if acc is not None]
+        locks = store.locks.hold_all() if ids is None else store.locks.hold(*ids)
+        with locks, ledger._lock:
+            # Gather each account's rows together; indexing copies, so no buffer view outlives the lock
+            rows = np.concatenate([np.frombuffer(acc.rows, dtype=np.int64) for acc in accounts] + [np.zeros(0, np.int64)])
+            self.date = _column(ledger.date, np.int32)[rows]
+            self.type_code = _column(ledger.type, np.int8)[rows]
+            self.amount = _column(ledger.amount, np.int64)[rows]
+            self.description = _column(ledger.description, np.int32)[rows]
+            self.type_names = list(ledger.types.values)
+            # Strings are only appended, so the live table is a valid view of this snapshot
+            self.descriptions = ledger.descriptions.values
+            self.account_ids = [acc.account_id for acc in accounts]
+            self.balance = np.array([acc.balance_cents for acc in accounts], dtype=np.int64)
+            return [len(acc.rows) for acc in accounts]
+
+    def _snapshot_generic(self, store) -> List[int]:
+        types, descriptions = {}, {}
+        dates, type_code, amount, description, balance, lengths = [], [], [], [], [], []
+        ids = list(store) if self.selected is None else [acc_id for acc_id in self.selected if acc_id in store]
+        self.account_ids = ids
+        for acc_id in ids:
+            info = store.get_account_info(acc_id)
+            balance.append(to_cents(info["balance"]))
+            lengths.append(len(info["transactions"]))
+            for txn in info["transactions"]:
+                dates.append(date_to_ordinal(txn["date"]))
+                type_code.append(types.setdefault(txn["type"], len(types)))
+                amount.append(to_cents(txn["amount"]))
+                description.append(descriptions.setdefault(txn["description"], len(descriptions)))
+        self.date = np.array(dates, dtype=np.int32)
+        self.type_code = np.array(type_code, dtype=np.int8)
+        self.amount = np.array(amount, dtype=np.int64)
+        self.description = np.array(description, dtype=np.int32)
+        self.type_names = list(types)
+        self.descriptions = list(descriptions)
+        self.balance = np.array(balance, dtype=np.int64)
+        return lengths
+
+    def _inflow_codes(self) -> list:
+        return [code for code, name in enumerate(self.type_names) if name in INFLOW_TYPES]
+
+    def _rows(self, account_id: Optional[str]):
+        """Row selector for one account (or all rows), and the accounts' current balance."""
+        if account_id is None:
+            return slice(None), int(self.balance.sum())
+        index = self._index.get(account_id)
+        if index is None:
+            raise KeyError(account_id)
+        return slice(self._offsets[index], self._offsets[index + 1]), int(self.balance[index])
+
+    def _daily(self, rows):
+        """Inflow, outflow and count per day, as dense arrays starting at the first day with activity."""
+        dates, signed = self.date[rows], self.signed[rows]
+        if len(dates) == 0:
+            empty = np.zeros(0)
+            return 0, empty, empty, empty
+        first = int(dates.min())
+        day = dates - first
+        inflow = np.bincount(day, weights=np.where(signed > 0, signed, 0))
+        outflow = np.bincount(day, weights=np.where(signed < 0, -signed, 0))
+        return first, inflow, outflow, np.bincount(day)
+
+    def monthly_flows(self, account_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Inflow, outflow and net per calendar month.
+
+        Args:
+            account_id: One account, or None for all accounts together
+
+        Returns:
+            [{"month": "YYYY-MM", "inflow", "outflow", "net", "count"}] in month order
+        """
+        rows, _ = self._rows(account_id)
+        first, inflow, outflow, counts = self._daily(rows)
+        # Bucket days into months: the day range is small, unlike the row count
+        days = np.arange(first - _EPOCH_ORDINAL, first - _EPOCH_ORDINAL + len(counts)).astype("datetime64[D]")
+        keys, inverse = np.unique(days.astype("datetime64[M]"), return_inverse=True)
+        inflow = np.bincount(inverse, weights=inflow, minlength=len(keys))
+        outflow = np.bincount(inverse, weights=outflow, minlength=len(keys))
+        counts = np.bincount(inverse, weights=counts, minlength=len(keys))
+        return [
+            {
+                "month": str(month),
+                "inflow": from_cents(int(inflow[i])),
+                "outflow": from_cents(int(outflow[i])),
+                "net": from_cents(int(inflow[i] - outflow[i])),
+                "count": int(counts[i]),
+            }
+            for i, month in enumerate(keys) if counts[i]
+        ]
+
+    def spend_by_category(self, account_id: Optional[str] = None, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Total outflow per category, largest first.
+
+        Args:
+            account_id: One account, or None for all accounts together
+            top: Keep only the largest categories
+        """
+        rows, _ = self._rows(account_id)
+        signed = self.signed[rows]
+        spend = signed < 0
+        categories = self._category_of[self.description[rows][spend]]
+        totals = np.bincount(categories, weights=-signed[spend], minlength=len(self.category_names))
+        counts = np.bincount(categories, minlength=len(self.category_names))
+        order = np.argsort(-totals, kind="stable")
+        order = order[counts[order] > 0][:top]
+        return [
+            {"category": str(self.category_names[i]), "amount": from_cents(int(totals[i])), "count": int(counts[i])}
+            for i in order
+        ]
+
+    def average_balance(
+        self,
+        account_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> float:
+        """
+        Average end-of-day balance over a date range.
+
+        Balances are reconstructed backwards from the current balance, so the
+        result is exact for the ledger as recorded.
+
+        Args:
+            account_id: One account, or None for the sum of all accounts
+            start_date: First day (defaults to the first transaction)
+            end_date: Last day (defaults to today)
+        """
+        rows, current = self._rows(account_id)
+        first, inflow, outflow, counts = self._daily(rows)
+        if len(counts) == 0:
+            return from_cents(current)
+
+        net = inflow - outflow
+        opening = current - net.sum()
+        end_of_day = opening + np.cumsum(net)
+        last = first + len(counts) - 1
+
+        start = date_to_ordinal(start_date) if start_date else first
+        end = date_to_ordinal(end_date) if end_date else max(date.today().toordinal(), last)
+        if end < start:
+            raise ValueError("end_date is before start_date")
+        offsets = np.arange(start - first, end - first + 1)
+        # Before the first day the opening balance applies; after the last, the final one
+        balances = np.where(offsets < 0, opening, end_of_day[np.clip(offsets, 0, len(counts) - 1)])
+        return round(from_cents(float(balances.mean())), 2)
+
+    def top_counterparties(self, account_id: Optional[str] = None, n: int = 5) -> List[Dict[str, Any]]:
+        """
+        Accounts most transferred with, by total volume.
+
+        Args:
+            account_id: One account, or None for transfers across all accounts
+            n: Number of counterparties
+        """
+        rows, _ = self._rows(account_id)
+        counterparty = self._counterparty_of[self.description[rows]]
+        known = counterparty >= 0
+        counterparty, signed = counterparty[known], self.signed[rows][known]
+        size = len(self.counterparty_names)
+        received = np.bincount(counterparty, weights=np.where(signed > 0, signed, 0), minlength=size)
+        sent = np.bincount(counterparty, weights=np.where(signed < 0, -signed, 0), minlength=size)
+        counts = np.bincount(counterparty, minlength=size)
+        order = np.argsort(-(sent + received), kind="stable")
+        order = order[counts[order] > 0][:n]
+        return [
+            {
+                "account_id": self.counterparty_names[i],
+                "sent": from_cents(int(sent[i])),
+                "received": from_cents(int(received[i])),
+                "count": int(counts[i]),
+            }
+            for i in order
+        ]
+
+    def account_flows(self) -> Dict[str, Dict[str, float]]:
+        """Total inflow and outflow for every account, in one pass."""
+        size = len(self.account_ids)
+        inflow = np.bincount(self.account, weights=np.where(self.signed > 0, self.signed, 0), minlength=size)
+        outflow = np.bincount(self.account, weights=np.where(self.signed < 0, -self.signed, 0), minlength=size)
+        return {
+            acc_id: {"inflow": from_cents(int(inflow[i])), "outflow": from_cents(int(outflow[i]))}
+            for i, acc_id in enumerate(self.account_ids)
+        }
+
+    def summary(self, account_id: Optional[str] = None, months: int = 3, top: int = 5) -> Dict[str, Any]:
+        """
+        All aggregates for one account (or all accounts) in one dict.
+
+        Args:
+            account_id: One account, or None for all accounts together
+            months: Most recent months of flows to include
+            top: Categories and counterparties to include
+        """
+        _, current = self._rows(account_id)
+        return {
+            "account_id": account_id,
+            "balance": from_cents(current),
+            "monthly_flows": self.monthly_flows(account_id)[-months:],
+            "spend_by_category": self.spend_by_category(account_id, top=top),
+            "average_balance": self.average_balance(account_id),
+            "top_counterparties": self.top_counterparties(account_id, n=top),
+        }
+
+    def summary_text(self, account_id: Optional[str] = None, months: int = 3, top: int = 5) -> str:
+        """Compact plain-text summary, suitable for the LLM system prompt."""
+        data = self.summary(account_id, months=months, top=top)
+        scope = f"Account {account_id}" if account_id else "All accounts"
+        lines = [f"{scope}: balance ${data['balance']:.2f}, average daily balance ${data['average_balance']:.2f}"]
+        for month in data["monthly_flows"]:
+            lines.append(f"{month['month']}: in ${month['inflow']:.2f}, out ${month['outflow']:.2f}, "
+                         f"net ${month['net']:.2f} ({month['count']} transactions)")
+        if data["spend_by_category"]:
+            lines.append("Top spending: " + ", ".join(
+                f"{c['category']} ${c['amount']:.2f}" for c in data["spend_by_category"]))
+        if data["top_counterparties"]:
+            lines.append("Top counterparties: " + ", ".join(
+                f"{c['account_id']} (sent ${c['sent']:.2f}, received ${c['received']:.2f})"
+                for c in data["top_counterparties"]))
+        return "\n".join(lines)
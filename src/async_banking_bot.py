@@ -0,0 +1,408 @@
+"""
+Asyncio Banking Bot
+Non-blocking variant of BankingBot so one event loop can serve many conversations
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Optional, Dict, Any, Tuple, AsyncIterator
+
+# Try importing the async HTTP client and Mistral async SDK, with fallback handling
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    from mistralai.async_client import MistralAsyncClient
+except ImportError:
+    MistralAsyncClient = None
+
+try:
+    from .banking_bot import BankingBot, API_ERROR_PREFIX, CHAT_ERROR_PREFIX, _chat_message, _assistant_message
+    from .resilience import Deadline, DeadlineExceeded, parse_retry_after
+    from .message_buffer import MessageBuffer
+except ImportError:
+    from banking_bot import BankingBot, API_ERROR_PREFIX, CHAT_ERROR_PREFIX, _chat_message, _assistant_message
+    from resilience import Deadline, DeadlineExceeded, parse_retry_after
+    from message_buffer import MessageBuffer
+
+
+def build_async_session(
+    limit: int = 100,
+    limit_per_host: int = 0,
+    keepalive_timeout: float = 30.0,
+) -> "aiohttp.ClientSession":
+    """
+    Build a pooled aiohttp session. Must be called from inside a running event loop.
+
+    Args:
+        limit: Total simultaneous connections
+        limit_per_host: Simultaneous connections per host (0 means no per-host cap)
+        keepalive_timeout: Seconds an idle connection is kept open for reuse
+
+    Returns:
+        A new aiohttp.ClientSession
+    """
+    if aiohttp is None:
+        raise ImportError("aiohttp is required for AsyncBankingBot: pip install aiohttp")
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+class AsyncBankingBot(BankingBot):
+    """
+    Asyncio version of BankingBot.
+    Account operations are shared with BankingBot; only the LLM round trip is awaited.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        http_session: Optional["aiohttp.ClientSession"] = None,
+        timeout: float = 30.0,
+        executor: Optional[Executor] = None,
+        **bot_kwargs,
+    ):
+        """
+        Initialize the async Banking Bot.
+
+        Args:
+            api_key: Mistral AI API key (defaults to MISTRAL_API_KEY env var)
+            http_session: aiohttp session to share between bots (created lazily if omitted)
+            timeout: Deadline in seconds for each LLM request, including retries
+            executor: Runs banking commands (account store calls, which may block on disk)
+                off the event loop; they run inline if omitted
+            **bot_kwargs: Other BankingBot options (context_window, response_cache, base_url, retry_policy, metrics)
+        """
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for AsyncBankingBot: pip install aiohttp")
+
+        super().__init__(api_key=api_key, request_timeout=timeout, **bot_kwargs)
+
+        try:
+            self.async_client = MistralAsyncClient(api_key=self.api_key, endpoint=self.base_url) if MistralAsyncClient else None
+        except Exception as e:
+            print(f"Warning: Could not initialize Mistral async SDK client: {e}")
+            self.async_client = None
+
+        self.http_session = http_session
+        self._owns_http_session = http_session is None
+        self.executor = executor
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the HTTP session if this bot created it."""
+        if self._owns_http_session and self.http_session is not None:
+            await self.http_session.close()
+            self.http_session = None
+
+    def _get_http_session(self) -> "aiohttp.ClientSession":
+        if self.http_session is None:
+            self.http_session = build_async_session()
+            self._owns_http_session = True
+        return self.http_session
+
+    def _with_history(self, conversation_history: list, buffer: Optional[MessageBuffer] = None) -> "AsyncBankingBot":
+        """
+        Return a view sharing this bot's aiohttp session, created here on the engine.
+
+        Without this each view would lazily open (and never close) its own session.
+        Views never close the shared session; aclose() on the engine does.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass  # aiohttp sessions need a running loop; sync callers never use it
+        else:
+            self._get_http_session()
+        view = super()._with_history(conversation_history, buffer)
+        view._owns_http_session = False
+        return view
+
+    async def _asend_rest_request(self, messages: list, deadline: Deadline, stream: bool = False,
+                                  tool_choice: Optional[str] = None) -> "aiohttp.ClientResponse":
+        """
+        POST a chat completion, retrying transient failures with backoff until the deadline.
+
+        Args:
+            messages: Messages to send
+            deadline: Time budget shared by all attempts
+            stream: Request an SSE stream
+            tool_choice: "auto" or "none" to offer the tool runner's tools
+
+        Returns:
+            A successful response (the caller must release it)
+        """
+        url, headers, body = self._build_rest_request(messages, stream=stream, tool_choice=tool_choice)
+        session = self._get_http_session()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            if deadline.expired():
+                raise DeadlineExceeded(f"Deadline exceeded after {attempt - 1} attempts")
+            timeout = aiohttp.ClientTimeout(total=None if stream else deadline.remaining(), sock_read=deadline.remaining())
+            try:
+                response = await session.post(url, data=body, headers=headers, timeout=timeout)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= self.retry_policy.max_attempts:
+                    raise
+                delay = self.retry_policy.backoff(attempt)
+            else:
+                if response.ok:
+                    return response
+                response.release()
+                if attempt >= self.retry_policy.max_attempts or \
+                        not self.retry_policy.is_retryable_status(response.status):
+                    response.raise_for_status()
+                delay = self.retry_policy.backoff(attempt, parse_retry_after(response.headers.get("Retry-After")))
+
+            if delay >= deadline.remaining():
+                raise DeadlineExceeded(f"Deadline exceeded after {attempt} attempts")
+            await asyncio.sleep(delay)
+
+    async def _arest_reply(self, messages: list, deadline: Optional[Deadline] = None,
+                           tool_choice: Optional[str] = None) -> Dict[str, Any]:
+        """Call Mistral AI using the REST API without blocking the event loop; return the assistant message."""
+        if not self.rest_breaker.allow_request():
+            self.metrics.inc("llm_calls_total", backend="rest", outcome="short_circuited")
+            return {"role": "assistant", "content": f"{API_ERROR_PREFIX}: REST backend circuit is open"}
+
+        try:
+            with self.metrics.span("rest.request"):
+                response = await self._asend_rest_request(messages, deadline or Deadline(self.request_timeout),
+                                                          tool_choice=tool_choice)
+            async with response:
+                with self.metrics.span("rest.decode"):
+                    result = await response.json()
+                    reply = self._reply_from_result(result)
+        except Exception as e:
+            self._record_backend_error(self.rest_breaker, e)
+            self.metrics.inc("llm_calls_total", backend="rest", outcome="error")
+            return {"role": "assistant", "content": f"{API_ERROR_PREFIX}: {str(e)}"}
+        except BaseException:
+            self.rest_breaker.release()
+            raise
+
+        self.rest_breaker.record_success()
+        self.metrics.inc("llm_calls_total", backend="rest", outcome="success")
+        return reply
+
+    async def _acall_mistral_api_rest(self, messages: list, deadline: Optional[Deadline] = None) -> str:
+        """Call Mistral AI using the REST API without blocking the event loop."""
+        return (await self._arest_reply(messages, deadline))["content"]
+
+    async def _acomplete_reply(self, messages: list, tool_choice: Optional[str] = None) -> Dict[str, Any]:
+        """Get the assistant message, sharing the upstream call with identical requests in flight."""
+        with self.metrics.span("llm"):
+            if self.single_flight is None:
+                return await self._aupstream_reply(messages, tool_choice)
+            reply = await self.single_flight.ado(self._flight_key(messages, tool_choice),
+                                                 lambda: self._aupstream_reply(messages, tool_choice))
+        # Each caller records its own copy in its history
+        return dict(reply)
+
+    async def _aupstream_reply(self, messages: list, tool_choice: Optional[str] = None) -> Dict[str, Any]:
+        """Get the assistant message, trying the async SDK first and falling back to the REST API."""
+        deadline = Deadline(self.request_timeout)
+
+        if self.async_client is not None and self.sdk_breaker.allow_request():
+            try:
+                with self.metrics.span("sdk"):
+                    chat_messages = self._buffer.sdk_messages(messages, _chat_message)
+                    tool_options = {"tools": self.tool_runner.schemas, "tool_choice": tool_choice} if tool_choice else {}
+                    response = await asyncio.wait_for(
+                        self.async_client.chat(model=self.model, messages=chat_messages, **tool_options),
+                        timeout=deadline.remaining(),
+                    )
+                    reply = _assistant_message(response.choices[0].message)
+            except Exception as e:
+                self.sdk_breaker.record_failure()
+                self.metrics.inc("llm_calls_total", backend="sdk", outcome="error")
+                print(f"SDK call failed, using REST API: {e}")
+            except BaseException:
+                self.sdk_breaker.release()
+                raise
+            else:
+                self.sdk_breaker.record_success()
+                self.metrics.inc("llm_calls_total", backend="sdk", outcome="success")
+                return reply
+
+        return await self._arest_reply(messages, deadline, tool_choice)
+
+    async def _acomplete(self, messages: list) -> str:
+        """Get a completion, trying the async SDK first and falling back to the REST API."""
+        return (await self._acomplete_reply(messages))["content"]
+
+    async def _acomplete_with_tools(self, messages: list) -> Tuple[str, bool]:
+        """Async variant of _complete_with_tools; tool calls run in worker threads."""
+        round_trips = tool_calls = 0
+        while True:
+            reply = await self._acomplete_reply(messages, tool_choice=self._tool_choice(round_trips))
+            round_trips += 1
+            if not reply.get("tool_calls") or round_trips > self.tool_runner.max_iterations:
+                return self._finish_tool_loop(reply, round_trips, tool_calls)
+            with self.metrics.span("tools"):
+                results = await self.tool_runner.arun(self, reply["tool_calls"])
+            tool_calls += len(results)
+            messages = self._record_tool_calls(reply, results)
+
+    async def _astream_mistral_api_rest(self, messages: list, deadline: Optional[Deadline] = None) -> AsyncIterator[str]:
+        """Stream a chat completion from the REST API, yielding content deltas."""
+        if not self.rest_breaker.allow_request():
+            self.metrics.inc("llm_calls_total", backend="rest", outcome="short_circuited")
+            yield f"{API_ERROR_PREFIX}: REST backend circuit is open"
+            return
+
+        try:
+            response = await self._asend_rest_request(messages, deadline or Deadline(self.request_timeout), stream=True)
+            async with response:
+                async for raw_line in response.content:
+                    delta = self._parse_stream_line(raw_line.decode("utf-8").strip())
+                    if delta is None:
+                        break
+                    if delta:
+                        yield delta
+        except Exception as e:
+            self._record_backend_error(self.rest_breaker, e)
+            self.metrics.inc("llm_calls_total", backend="rest", outcome="error")
+            yield f"{API_ERROR_PREFIX}: {str(e)}"
+        except BaseException:
+            self.rest_breaker.release()
+            raise
+        else:
+            self.rest_breaker.record_success()
+            self.metrics.inc("llm_calls_total", backend="rest", outcome="success")
+
+    async def _astream_completion(self, messages: list) -> AsyncIterator[str]:
+        """Stream from the async SDK, falling back to REST if it fails before the first token."""
+        deadline = Deadline(self.request_timeout)
+
+        if self.async_client is not None and self.sdk_breaker.allow_request():
+            started = False
+            try:
+                chat_messages = self._buffer.sdk_messages(messages, _chat_message)
+                async for chunk in self.async_client.chat_stream(model=self.model, messages=chat_messages):
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        started = True
+                        yield delta
+            except Exception as e:
+                self.sdk_breaker.record_failure()
+                self.metrics.inc("llm_calls_total", backend="sdk", outcome="error")
+                if started:
+                    raise
+                print(f"SDK call failed, using REST API: {e}")
+            except BaseException:
+                self.sdk_breaker.release()
+                raise
+            else:
+                self.sdk_breaker.record_success()
+                self.metrics.inc("llm_calls_total", backend="sdk", outcome="success")
+                return
+
+        async for delta in self._astream_mistral_api_rest(messages, deadline):
+            yield delta
+
+    async def achat(self, user_message: str) -> str:
+        """
+        Send a message to the banking bot and await the response.
+
+        Args:
+            user_message: The user's input message
+
+        Returns:
+            The bot's response
+        """
+        with self.metrics.span("chat"):
+            with self.metrics.span("prepare"):
+                messages = self._prepare_messages(user_message)
+
+            cache_key = self._response_cache_key(messages)
+            if cache_key is not None:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    self.metrics.inc("chat_replies_total", source="cache")
+                    return self._record_response(cached)
+
+            try:
+                if self.tool_runner is not None:
+                    bot_response, used_tools = await self._acomplete_with_tools(messages)
+                else:
+                    bot_response, used_tools = await self._acomplete(messages), False
+                # Answers built from tool results depend on live account data
+                if not used_tools:
+                    self._store_cached_response(cache_key, bot_response)
+                self.metrics.inc("chat_replies_total", source="tools" if used_tools else "llm")
+                return self._record_response(bot_response)
+
+            except Exception as e:
+                self.metrics.inc("errors_total", stage="chat")
+                return self._record_response(f"{CHAT_ERROR_PREFIX}: {str(e)}")
+
+    async def achat_stream(self, user_message: str) -> AsyncIterator[str]:
+        """
+        Send a message and stream the response as it is generated.
+
+        Args:
+            user_message: The user's input message
+
+        Yields:
+            Pieces of the bot's response in order
+        """
+        with self.metrics.span("prepare"):
+            messages = self._prepare_messages(user_message)
+
+        cache_key = self._response_cache_key(messages)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self._record_response(cached)
+                yield cached
+                return
+
+        chunks = []
+        try:
+            async for delta in self._astream_completion(messages):
+                chunks.append(delta)
+                yield delta
+            self._store_cached_response(cache_key, "".join(chunks))
+        except Exception as e:
+            error_response = f"{CHAT_ERROR_PREFIX}: {str(e)}"
+            chunks.append(error_response)
+            yield error_response
+        finally:
+            self._record_response("".join(chunks))
+
+    async def aprocess_banking_command(self, command: str) -> str:
+        """
+        Process banking-specific commands, awaiting the LLM for anything else.
+
+        Args:
+            command: The banking command to process
+
+        Returns:
+            The result of the command
+        """
+        with self.metrics.span("command"):
+            if self.executor is not None:
+                result = await asyncio.get_running_loop().run_in_executor(self.executor, self._run_banking_command, command)
+            else:
+                result = self._run_banking_command(command)
+        if result is not None:
+            self.metrics.inc("commands_total", route="local")
+            return result
+
+        # If not a specific command, treat as a chat message
+        self.metrics.inc("commands_total", route="llm")
+        return await self.achat(command)
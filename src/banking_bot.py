@@ -4,9 +4,13 @@ Provides intelligent banking assistance with account management, transactions, a
 """
 
 import os
+import copy
 import json
-from typing import Optional, Dict, Any
-from datetime import datetime
+import time
+import shlex
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, Iterator, List, Callable, Tuple
 from dotenv import load_dotenv
 
 # Try importing mistralai, with fallback handling
@@ -19,31 +23,131 @@ except ImportError:
 
 import requests
 
+# Sibling modules: support both ``src.banking_bot`` and ``banking_bot`` imports
+try:
+    from .http_pool import get_session
+    from .context_window import ContextWindow
+    from .message_buffer import MessageBuffer
+    from .response_cache import ResponseCache, is_cacheable, normalize_prompt
+    from .resilience import CircuitBreaker, RetryPolicy, Deadline, DeadlineExceeded, parse_retry_after
+    from .intent_router import IntentRouter
+    from .account_store import AccountStore
+    from .analytics import AccountAnalytics
+    from .tool_calling import ToolRunner
+    from .single_flight import SingleFlight
+    from .metrics import Metrics, ExtraSample
+except ImportError:
+    from http_pool import get_session
+    from context_window import ContextWindow
+    from message_buffer import MessageBuffer
+    from response_cache import ResponseCache, is_cacheable, normalize_prompt
+    from resilience import CircuitBreaker, RetryPolicy, Deadline, DeadlineExceeded, parse_retry_after
+    from intent_router import IntentRouter
+    from account_store import AccountStore
+    from analytics import AccountAnalytics
+    from tool_calling import ToolRunner
+    from single_flight import SingleFlight
+    from metrics import Metrics, ExtraSample
+
 # Load environment variables
 load_dotenv()
 
+# Prefixes of the text returned in place of a completion when a call fails
+API_ERROR_PREFIX = "Error calling Mistral API"
+CHAT_ERROR_PREFIX = "Sorry, I encountered an error"
+
+# Text returned when the model keeps asking for tools after the iteration cap
+TOOL_LOOP_CAPPED_REPLY = "Sorry, I couldn't complete that request. Please try asking in smaller steps."
+
+
+def _chat_message(message: Dict[str, Any]) -> "ChatMessage":
+    """Build the SDK object for one message dict (tool_calls, name and tool_call_id included)."""
+    return ChatMessage(**message)
+
+
+def _assistant_message(message: Any) -> Dict[str, Any]:
+    """Convert an SDK reply message into the dict form kept in the conversation history."""
+    reply = {"role": "assistant", "content": message.content or ""}
+    if getattr(message, "tool_calls", None):
+        reply["tool_calls"] = [
+            {"id": call.id, "type": "function",
+             "function": {"name": call.function.name, "arguments": call.function.arguments}}
+            for call in message.tool_calls
+        ]
+    return reply
+
+
+# `history` command flags -> (query_transactions argument, value parser)
+HISTORY_FLAGS = {
+    "--from": ("start_date", str),
+    "--to": ("end_date", str),
+    "--type": ("types", str),
+    "--min": ("min_amount", float),
+    "--max": ("max_amount", float),
+    "--search": ("description", str),
+    "--cursor": ("cursor", str),
+}
+
+
 class BankingBot:
     """
     A banking assistance bot powered by Mistral AI.
     Handles customer inquiries about accounts, transactions, and banking services.
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        context_window: Optional[ContextWindow] = None,
+        response_cache: Optional[ResponseCache] = None,
+        base_url: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        request_timeout: float = 30.0,
+        intent_router: Optional[IntentRouter] = None,
+        account_store: Optional[AccountStore] = None,
+        tool_runner: Optional[ToolRunner] = None,
+        single_flight: Optional[SingleFlight] = None,
+        metrics: Optional[Metrics] = None,
+    ):
         """
         Initialize the Banking Bot with Mistral AI client.
         
         Args:
             api_key: Mistral AI API key (defaults to MISTRAL_API_KEY env var)
+            session: HTTP session for the REST API (defaults to the shared pooled session)
+            context_window: Token budget for messages sent per turn (defaults to a 4000-token sliding window)
+            response_cache: Optional cache for generic questions; may be shared between bots
+            base_url: Mistral API base URL (defaults to MISTRAL_API_BASE env var or the public API)
+            retry_policy: Backoff policy for 429/5xx and connection errors on the REST path
+            request_timeout: Deadline in seconds for one LLM call, including retries
+            intent_router: Local classifier for natural-language account requests (defaults to IntentRouter())
+            account_store: Account and ledger store, e.g. AccountStore or SQLiteAccountStore
+                (defaults to the mock accounts in memory)
+            tool_runner: Lets the LLM call the account APIs as tools during chat() (off if omitted);
+                may be shared between bots
+            single_flight: Coalesces identical concurrent LLM requests into one upstream call
+                (off if omitted; pass SingleFlight(), which may be shared between bots)
+            metrics: Stage timings and counters (defaults to a disabled Metrics; pass Metrics()
+                to record, and share one between bots to aggregate)
         """
         self.api_key = api_key or os.getenv("MISTRAL_API_KEY")
         
         if not self.api_key:
             raise ValueError("MISTRAL_API_KEY not found in environment variables or arguments")
         
+        self.base_url = (base_url or os.getenv("MISTRAL_API_BASE") or "https://api.mistral.ai").rstrip("/")
+        self.request_timeout = request_timeout
+        self.retry_policy = retry_policy or RetryPolicy()
+        
+        # One breaker per backend so a broken SDK stops costing a failed call every turn
+        self.sdk_breaker = CircuitBreaker("sdk")
+        self.rest_breaker = CircuitBreaker("rest")
+        
         # Initialize Mistral client
         try:
             if MistralClient is not None:
-                self.client = MistralClient(api_key=self.api_key)
+                self.client = MistralClient(api_key=self.api_key, endpoint=self.base_url, timeout=request_timeout)
             else:
                 self.client = None
                 self._use_rest_api = True
@@ -52,9 +156,31 @@ class BankingBot:
             self._use_rest_api = True
             self.client = None
         
+        # Injected session; without one, the shared pool is looked up per request (see session)
+        self._session = session
+        
         self.model = "mistral-small"
         self.conversation_history = []
-        self.user_accounts = self._initialize_mock_accounts()
+        # Encodings and SDK objects of conversation_history, kept between turns
+        self._buffer = MessageBuffer()
+        self.context_window = context_window or ContextWindow()
+        self.response_cache = response_cache
+        self.intent_router = intent_router or IntentRouter()
+        # Routing decision for the most recent non-command message
+        self.last_intent: Optional[Dict[str, Any]] = None
+        self.accounts = account_store if account_store is not None else \
+            AccountStore.from_dict(self._initialize_mock_accounts())
+        # Precomputed analytics summary included in the system prompt (see set_account_context)
+        self.account_context: Optional[str] = None
+        self.tool_runner = tool_runner
+        # Sessions and chat_many copies share it through the engine bot
+        self.single_flight = single_flight
+        self.metrics = metrics if metrics is not None else Metrics(enabled=False)
+        # Round trips and tool calls of the most recent tool-enabled chat turn
+        self.last_tool_loop: Optional[Dict[str, Any]] = None
+        # Built system prompt and the account context it was built with
+        self._system_prompt: Optional[str] = None
+        self._system_prompt_context: Optional[str] = None
         
     def _initialize_mock_accounts(self) -> Dict[str, Dict[str, Any]]:
         """Initialize mock user accounts for demonstration."""
@@ -78,83 +204,407 @@ class BankingBot:
             }
         }
     
+    @property
+    def session(self) -> requests.Session:
+        """
+        HTTP session for the REST API.
+        
+        The injected session, else the process-wide keep-alive pool, looked up on every
+        request so that configure_pool() and close_session() apply to existing bots too.
+        """
+        return self._session if self._session is not None else get_session()
+    
+    @session.setter
+    def session(self, session: Optional[requests.Session]):
+        self._session = session
+    
+    @property
+    def user_accounts(self) -> AccountStore:
+        """Read-only mapping view of the accounts (kept for backward compatibility)."""
+        return self.accounts
+    
     def get_account_info(self, account_id: str) -> Dict[str, Any]:
         """Get account information."""
-        if account_id in self.user_accounts:
-            return self.user_accounts[account_id]
-        return {"error": f"Account {account_id} not found"}
+        with self.metrics.span("account.info"):
+            return self.accounts.get_account_info(account_id)
     
     def get_account_balance(self, account_id: str) -> float:
         """Get the balance of an account."""
-        if account_id in self.user_accounts:
-            return self.user_accounts[account_id]["balance"]
-        return None
+        with self.metrics.span("account.balance"):
+            return self.accounts.get_account_balance(account_id)
+    
+    def get_balance_at(self, account_id: str, as_of: str) -> Dict[str, Any]:
+        """
+        Get the balance of an account at the end of a given day.
+        
+        Args:
+            account_id: Account to query
+            as_of: Date (YYYY-MM-DD)
+            
+        Returns:
+            {"account_id", "date", "balance"} or {"error": ...}
+        """
+        with self.metrics.span("account.balance_at"):
+            return self.accounts.get_balance_at(account_id, as_of)
     
     def transfer_funds(self, from_account: str, to_account: str, amount: float) -> Dict[str, Any]:
         """Transfer funds between accounts."""
-        if from_account not in self.user_accounts:
-            return {"success": False, "error": f"Source account {from_account} not found"}
-        
-        if to_account not in self.user_accounts:
-            return {"success": False, "error": f"Destination account {to_account} not found"}
-        
-        from_balance = self.user_accounts[from_account]["balance"]
-        if from_balance < amount:
-            return {"success": False, "error": "Insufficient funds"}
-        
-        self.user_accounts[from_account]["balance"] -= amount
-        self.user_accounts[to_account]["balance"] += amount
-        
-        transaction = {
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "type": "transfer",
-            "amount": amount,
-            "description": f"Transfer to {to_account}"
-        }
-        self.user_accounts[from_account]["transactions"].append(transaction)
+        with self.metrics.span("account.transfer"):
+            return self.accounts.transfer_funds(from_account, to_account, amount)
+    
+    def transfer_batch(self, transfers: List[Any], atomic: bool = True) -> Dict[str, Any]:
+        """
+        Apply many transfers at once (e.g. a payroll run).
         
-        return {
-            "success": True,
-            "message": f"Transferred ${amount:.2f} from {from_account} to {to_account}",
-            "new_balance": self.user_accounts[from_account]["balance"]
-        }
+        Args:
+            transfers: (from_account, to_account, amount) tuples or dicts with those keys
+            atomic: Apply all or none; if False, apply valid transfers and report the rest
+            
+        Returns:
+            {"success", "applied", "failures"}
+        """
+        with self.metrics.span("account.transfer_batch"):
+            return self.accounts.transfer_batch(transfers, atomic=atomic)
     
     def get_transaction_history(self, account_id: str, limit: int = 5) -> Dict[str, Any]:
         """Get transaction history for an account."""
-        if account_id not in self.user_accounts:
-            return {"error": f"Account {account_id} not found"}
+        with self.metrics.span("account.history"):
+            return self.accounts.get_transaction_history(account_id, limit=limit)
+    
+    def query_transactions(self, account_id: str, **filters: Any) -> Dict[str, Any]:
+        """
+        Query transaction history with filters and cursor pagination.
         
-        transactions = self.user_accounts[account_id]["transactions"][-limit:]
-        return {
-            "account_id": account_id,
-            "transactions": transactions
-        }
+        Args:
+            account_id: Account to query
+            **filters: start_date, end_date, types, min_amount, max_amount,
+                description, cursor, limit, newest_first (see AccountStore.query_transactions)
+            
+        Returns:
+            {"account_id", "transactions", "next_cursor"} or {"error": ...}
+        """
+        with self.metrics.span("account.query"):
+            return self.accounts.query_transactions(account_id, **filters)
     
-    def _call_mistral_api_rest(self, messages: list) -> str:
-        """Call Mistral AI using REST API directly."""
-        url = "https://api.mistral.ai/v1/chat/completions"
+    def _build_rest_request(self, messages: list, stream: bool = False, tool_choice: Optional[str] = None) -> tuple:
+        """
+        Build the URL, headers and JSON body for a chat completion request.
+        
+        The body is assembled from the message buffer's cached encodings rather than
+        serializing the whole conversation again.
+        
+        Args:
+            messages: Messages to send
+            stream: Request an SSE stream
+            tool_choice: "auto" or "none" to offer the tool runner's tools (no tools if omitted)
+            
+        Returns:
+            (url, headers, body bytes)
+        """
+        url = f"{self.base_url}/v1/chat/completions"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
-        data = {
-            "model": self.model,
-            "messages": messages,
-            "temperature": 0.7,
-            "max_tokens": 500
+        body = b"".join((
+            b'{"model":', json.dumps(self.model).encode(),
+            b',"messages":', self._buffer.encode(messages),
+            b',"temperature":0.7,"max_tokens":500',
+            b',"tools":' + self.tool_runner.schemas_json + b',"tool_choice":' + json.dumps(tool_choice).encode()
+            if tool_choice else b"",
+            b',"stream":true}' if stream else b"}",
+        ))
+        if stream:
+            headers["Accept"] = "text/event-stream"
+        return url, headers, body
+    
+    def _send_rest_request(self, messages: list, deadline: Deadline, stream: bool = False,
+                           tool_choice: Optional[str] = None) -> requests.Response:
+        """
+        POST a chat completion, retrying transient failures with backoff until the deadline.
+        
+        Args:
+            messages: Messages to send
+            deadline: Time budget shared by all attempts
+            stream: Request an SSE stream (the caller must close the response)
+            tool_choice: "auto" or "none" to offer the tool runner's tools
+            
+        Returns:
+            A successful response
+        """
+        url, headers, body = self._build_rest_request(messages, stream=stream, tool_choice=tool_choice)
+        
+        attempt = 0
+        while True:
+            attempt += 1
+            if deadline.expired():
+                raise DeadlineExceeded(f"Deadline exceeded after {attempt - 1} attempts")
+            try:
+                response = self.session.post(url, data=body, headers=headers, timeout=deadline.remaining(), stream=stream)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.retry_policy.max_attempts:
+                    raise
+                delay = self.retry_policy.backoff(attempt)
+            else:
+                if response.ok:
+                    return response
+                if attempt >= self.retry_policy.max_attempts or \
+                        not self.retry_policy.is_retryable_status(response.status_code):
+                    response.raise_for_status()
+                delay = self.retry_policy.backoff(attempt, parse_retry_after(response.headers.get("Retry-After")))
+                response.close()
+            
+            if delay >= deadline.remaining():
+                raise DeadlineExceeded(f"Deadline exceeded after {attempt} attempts")
+            time.sleep(delay)
+    
+    def _record_backend_error(self, breaker: CircuitBreaker, error: Exception):
+        """Count an error against a backend, unless it was our own bad request (4xx other than 429)."""
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None) or getattr(error, "status", None)
+        if status is not None and status < 500 and not self.retry_policy.is_retryable_status(status):
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+    
+    @staticmethod
+    def _reply_from_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the assistant message (content and any tool calls) from a REST completion."""
+        message = result["choices"][0]["message"]
+        reply = {"role": "assistant", "content": message["content"] or ""}
+        if message.get("tool_calls"):
+            reply["tool_calls"] = message["tool_calls"]
+        return reply
+    
+    def _rest_reply(self, messages: list, deadline: Optional[Deadline] = None,
+                    tool_choice: Optional[str] = None) -> Dict[str, Any]:
+        """Call Mistral AI using the REST API and return the assistant message."""
+        if not self.rest_breaker.allow_request():
+            self.metrics.inc("llm_calls_total", backend="rest", outcome="short_circuited")
+            return {"role": "assistant", "content": f"{API_ERROR_PREFIX}: REST backend circuit is open"}
+        
+        try:
+            with self.metrics.span("rest.request"):
+                response = self._send_rest_request(messages, deadline or Deadline(self.request_timeout),
+                                                   tool_choice=tool_choice)
+            with self.metrics.span("rest.decode"):
+                reply = self._reply_from_result(response.json())
+        except Exception as e:
+            self._record_backend_error(self.rest_breaker, e)
+            self.metrics.inc("llm_calls_total", backend="rest", outcome="error")
+            return {"role": "assistant", "content": f"{API_ERROR_PREFIX}: {str(e)}"}
+        except BaseException:
+            self.rest_breaker.release()
+            raise
+        
+        self.rest_breaker.record_success()
+        self.metrics.inc("llm_calls_total", backend="rest", outcome="success")
+        return reply
+    
+    def _call_mistral_api_rest(self, messages: list, deadline: Optional[Deadline] = None) -> str:
+        """Call Mistral AI using REST API directly."""
+        return self._rest_reply(messages, deadline)["content"]
+    
+    def _flight_key(self, messages: list, tool_choice: Optional[str]) -> str:
+        """
+        Identity of an LLM request for coalescing.
+        
+        Everything before the last message must match exactly (from the buffer's cached
+        encodings); a final user message is normalized like response cache keys.
+        """
+        last = messages[-1]
+        digest = hashlib.blake2b(f"{self.model}\x00{tool_choice or ''}\x00".encode(), digest_size=16)
+        digest.update(self._buffer.encode(messages[:-1]))
+        if last["role"] == "user":
+            digest.update(b"\x01" + normalize_prompt(last.get("content") or "").encode())
+        else:
+            digest.update(b"\x02" + self._buffer.encode([last]))
+        return digest.hexdigest()
+    
+    def _complete_reply(self, messages: list, tool_choice: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get the assistant message, sharing the upstream call with identical requests in flight.
+        
+        Args:
+            messages: Messages to send
+            tool_choice: "auto" or "none" to offer the tool runner's tools (no tools if omitted)
+        """
+        if self.single_flight is None:
+            with self.metrics.span("llm"):
+                return self._upstream_reply(messages, tool_choice)
+        try:
+            with self.metrics.span("llm"):
+                reply = self.single_flight.do(self._flight_key(messages, tool_choice),
+                                              lambda: self._upstream_reply(messages, tool_choice),
+                                              timeout=self.request_timeout)
+        except TimeoutError as e:
+            return {"role": "assistant", "content": f"{API_ERROR_PREFIX}: {str(e)}"}
+        # Each caller records its own copy in its history
+        return dict(reply)
+    
+    def _upstream_reply(self, messages: list, tool_choice: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get the assistant message, trying the SDK first and falling back to the REST API.
+        
+        Args:
+            messages: Messages to send
+            tool_choice: "auto" or "none" to offer the tool runner's tools (no tools if omitted)
+        """
+        deadline = Deadline(self.request_timeout)
+        
+        if self.client is not None and MistralClient is not None and self.sdk_breaker.allow_request():
+            try:
+                with self.metrics.span("sdk"):
+                    chat_messages = self._buffer.sdk_messages(messages, _chat_message)
+                    tool_options = {"tools": self.tool_runner.schemas, "tool_choice": tool_choice} if tool_choice else {}
+                    response = self.client.chat(model=self.model, messages=chat_messages, **tool_options)
+                    reply = _assistant_message(response.choices[0].message)
+            except Exception as e:
+                self.sdk_breaker.record_failure()
+                self.metrics.inc("llm_calls_total", backend="sdk", outcome="error")
+                print(f"SDK call failed, using REST API: {e}")
+            except BaseException:
+                self.sdk_breaker.release()
+                raise
+            else:
+                self.sdk_breaker.record_success()
+                self.metrics.inc("llm_calls_total", backend="sdk", outcome="success")
+                return reply
+        
+        return self._rest_reply(messages, deadline, tool_choice)
+    
+    def _complete(self, messages: list) -> str:
+        """Get a completion, trying the SDK first and falling back to the REST API."""
+        return self._complete_reply(messages)["content"]
+    
+    def get_backend_health(self) -> Dict[str, Dict[str, Any]]:
+        """Return circuit breaker state and counters for the SDK and REST backends."""
+        return {
+            "sdk": self.sdk_breaker.snapshot(),
+            "rest": self.rest_breaker.snapshot(),
         }
+    
+    def _metric_extras(self) -> List[ExtraSample]:
+        """Samples owned by other components (breakers, coalescing, cache), read at export time."""
+        breakers = [(name, breaker.snapshot()) for name, breaker in (("sdk", self.sdk_breaker), ("rest", self.rest_breaker))]
+        extra: List[ExtraSample] = []
+        for state in (CircuitBreaker.CLOSED, CircuitBreaker.HALF_OPEN, CircuitBreaker.OPEN):
+            extra += [("circuit_state", "gauge", {"backend": name, "state": state}, int(snap["state"] == state))
+                      for name, snap in breakers]
+        for field in ("total_successes", "total_failures", "short_circuited"):
+            extra += [(f"circuit_{field.replace('total_', '')}_total", "counter", {"backend": name}, snap[field])
+                      for name, snap in breakers]
+        if self.single_flight is not None:
+            stats = self.single_flight.stats()
+            extra += [("llm_upstream_calls_total", "counter", {}, stats["upstream_calls"]),
+                      ("llm_coalesced_total", "counter", {}, stats["coalesced"])]
+        if self.response_cache is not None:
+            stats = self.response_cache.stats()
+            extra += [("response_cache_hits_total", "counter", {}, stats["hits"]),
+                      ("response_cache_misses_total", "counter", {}, stats["misses"])]
+        return extra
+    
+    def export_metrics(self, fmt: str = "prometheus") -> str:
+        """
+        Export stage timings, counters, circuit breaker state and coalescing/cache counters.
+        
+        Args:
+            fmt: "prometheus" (text exposition format) or "json"
+            
+        Returns:
+            The metrics document
+        """
+        if fmt == "prometheus":
+            return self.metrics.to_prometheus(extra=self._metric_extras())
+        if fmt == "json":
+            return self.metrics.to_json(extra=self._metric_extras())
+        raise ValueError(f"Unknown metrics format: {fmt}")
+    
+    @staticmethod
+    def _parse_stream_line(line: str) -> Optional[str]:
+        """
+        Parse one server-sent-event line from a streamed chat completion.
+        
+        Args:
+            line: A raw SSE line, e.g. 'data: {"choices": [...]}'
+            
+        Returns:
+            The content delta ("" for keep-alives and empty deltas), or None at end of stream
+        """
+        if not line or not line.startswith("data:"):
+            return ""
+        payload = line[len("data:"):].strip()
+        if payload == "[DONE]":
+            return None
+        chunk = json.loads(payload)
+        choices = chunk.get("choices") or [{}]
+        return choices[0].get("delta", {}).get("content") or ""
+    
+    def _stream_mistral_api_rest(self, messages: list, deadline: Optional[Deadline] = None) -> Iterator[str]:
+        """Stream a chat completion from the REST API, yielding content deltas."""
+        if not self.rest_breaker.allow_request():
+            self.metrics.inc("llm_calls_total", backend="rest", outcome="short_circuited")
+            yield f"{API_ERROR_PREFIX}: REST backend circuit is open"
+            return
         
         try:
-            response = requests.post(url, json=data, headers=headers, timeout=30)
-            response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
+            with self._send_rest_request(messages, deadline or Deadline(self.request_timeout), stream=True) as response:
+                for line in response.iter_lines(decode_unicode=True):
+                    delta = self._parse_stream_line(line)
+                    if delta is None:
+                        break
+                    if delta:
+                        yield delta
         except Exception as e:
-            return f"Error calling Mistral API: {str(e)}"
+            self._record_backend_error(self.rest_breaker, e)
+            self.metrics.inc("llm_calls_total", backend="rest", outcome="error")
+            yield f"{API_ERROR_PREFIX}: {str(e)}"
+        except BaseException:
+            self.rest_breaker.release()
+            raise
+        else:
+            self.rest_breaker.record_success()
+            self.metrics.inc("llm_calls_total", backend="rest", outcome="success")
+    
+    def _stream_completion(self, messages: list) -> Iterator[str]:
+        """Stream from the SDK, falling back to REST if the SDK fails before the first token."""
+        deadline = Deadline(self.request_timeout)
+        
+        if self.client is not None and MistralClient is not None and self.sdk_breaker.allow_request():
+            started = False
+            try:
+                chat_messages = self._buffer.sdk_messages(messages, _chat_message)
+                for chunk in self.client.chat_stream(model=self.model, messages=chat_messages):
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        started = True
+                        yield delta
+            except Exception as e:
+                self.sdk_breaker.record_failure()
+                self.metrics.inc("llm_calls_total", backend="sdk", outcome="error")
+                if started:
+                    raise
+                print(f"SDK call failed, using REST API: {e}")
+            except BaseException:
+                self.sdk_breaker.release()
+                raise
+            else:
+                self.sdk_breaker.record_success()
+                self.metrics.inc("llm_calls_total", backend="sdk", outcome="success")
+                return
+        
+        yield from self._stream_mistral_api_rest(messages, deadline)
+    
+    def _current_system_prompt(self) -> str:
+        """The system prompt, built once and rebuilt only when the account context changes."""
+        if self._system_prompt is None or self._system_prompt_context is not self.account_context:
+            self._system_prompt = self._build_system_prompt()
+            self._system_prompt_context = self.account_context
+        return self._system_prompt
     
     def _build_system_prompt(self) -> str:
         """Build the system prompt for the banking bot."""
-        return """You are a helpful banking assistant powered by Mistral AI. You help customers with:
+        prompt = """You are a helpful banking assistant powered by Mistral AI. You help customers with:
 - Account information and balance inquiries
 - Transaction history
 - Fund transfers between accounts
@@ -164,108 +614,407 @@ class BankingBot:
 Be professional, secure (never ask for sensitive data), and helpful. 
 When users ask about specific accounts or transactions, acknowledge the information provided.
 Always encourage secure banking practices."""
+        if self.account_context:
+            prompt += ("\n\nPrecomputed summary of the customer's account activity "
+                       "(use these figures rather than estimating):\n" + self.account_context)
+        return prompt
     
-    def chat(self, user_message: str) -> str:
+    def set_account_context(self, account_id: Optional[str], months: int = 3) -> Optional[str]:
         """
-        Send a message to the banking bot and get a response.
+        Tell the LLM about an account's activity in later chat turns.
+        
+        Computes monthly flows, spending by category, average balance and top
+        counterparties with AccountAnalytics and adds them to the system prompt.
         
         Args:
-            user_message: The user's input message
+            account_id: Account to summarize, or None to remove the summary
+            months: Most recent months of flows to include
             
         Returns:
-            The bot's response
+            The summary text, or None if it was cleared or the account does not exist
         """
+        self.account_context = None
+        if account_id is None or account_id not in self.accounts:
+            return None
+        analytics = AccountAnalytics(self.accounts, account_ids=[account_id])
+        self.account_context = analytics.summary_text(account_id, months=months)
+        return self.account_context
+    
+    def _prepare_messages(self, user_message: str) -> list:
+        """Record the user turn and return the full message list for the API call."""
         # Add user message to history
         self.conversation_history.append({
             "role": "user",
             "content": user_message
         })
+        return self._window_messages()
+    
+    def _window_messages(self) -> list:
+        """The system message plus the history that fits in the token budget."""
+        # Prepare messages for API call, trimmed to the token budget; only the new
+        # messages are encoded and counted
+        self._buffer.sync(self.conversation_history)
+        system_message = self._buffer.system_message(self._current_system_prompt())
+        return self.context_window.build_messages(system_message, self.conversation_history,
+                                                  history_tokens=self._buffer.history_tokens)
+    
+    def _record_response(self, bot_response: str) -> str:
+        """Append the assistant turn to the conversation history."""
+        self.conversation_history.append({
+            "role": "assistant",
+            "content": bot_response
+        })
+        return bot_response
+    
+    def _response_cache_key(self, messages: list) -> Optional[str]:
+        """Return the cache key for this request, or None if it must not be cached."""
+        if self.response_cache is None or not is_cacheable(messages):
+            return None
+        return self.response_cache.make_key(messages, self.model)
+    
+    def _store_cached_response(self, cache_key: Optional[str], bot_response: str):
+        """Cache a completed response unless it is an error or mentions account data."""
+        if cache_key is None or API_ERROR_PREFIX in bot_response:
+            return
+        if is_cacheable([{"role": "assistant", "content": bot_response}]):
+            self.response_cache.put(cache_key, bot_response)
+    
+    def _tool_choice(self, round_trip: int) -> str:
+        """Offer tools until the iteration cap, then require a text answer."""
+        return "auto" if round_trip < self.tool_runner.max_iterations else "none"
+    
+    def _record_tool_calls(self, reply: Dict[str, Any], results: List[Dict[str, Any]]) -> list:
+        """Add a tool-calling assistant turn and its results to the history; return the next request."""
+        self.conversation_history.append({"role": "assistant", "content": reply["content"],
+                                          "tool_calls": reply["tool_calls"]})
+        self.conversation_history.extend(results)
+        return self._window_messages()
+    
+    def _finish_tool_loop(self, reply: Dict[str, Any], round_trips: int, tool_calls: int) -> Tuple[str, bool]:
+        """Record the loop's statistics and return (answer, whether tools were used)."""
+        capped = bool(reply.get("tool_calls"))
+        content = reply["content"] or (TOOL_LOOP_CAPPED_REPLY if capped else "")
+        resolved = not capped and not content.startswith(API_ERROR_PREFIX)
+        self.tool_runner.stats.record(round_trips, tool_calls, resolved, capped)
+        self.last_tool_loop = {"round_trips": round_trips, "tool_calls": tool_calls,
+                               "resolved": resolved, "capped": capped}
+        return content, tool_calls > 0
+    
+    def _complete_with_tools(self, messages: list) -> Tuple[str, bool]:
+        """
+        Let the model call account tools until it answers in text.
         
-        # Prepare messages for API call
-        system_message = self._build_system_prompt()
-        messages = [{"role": "system", "content": system_message}]
-        messages.extend(self.conversation_history)
+        Each model turn's tool calls run concurrently (see ToolRunner.run) and their
+        results are sent back in the next request, for at most max_iterations turns.
         
-        try:
-            # Try SDK first, fall back to REST API
-            if self.client is not None and MistralClient is not None:
-                try:
-                    chat_messages = [ChatMessage(role=msg["role"], content=msg["content"]) for msg in messages]
-                    response = self.client.chat(model=self.model, messages=chat_messages)
-                    bot_response = response.choices[0].message.content
-                except Exception as e:
-                    print(f"SDK call failed, using REST API: {e}")
-                    bot_response = self._call_mistral_api_rest(messages)
-            else:
-                bot_response = self._call_mistral_api_rest(messages)
+        Returns:
+            (answer, whether any tool was called)
+        """
+        round_trips = tool_calls = 0
+        while True:
+            reply = self._complete_reply(messages, tool_choice=self._tool_choice(round_trips))
+            round_trips += 1
+            if not reply.get("tool_calls") or round_trips > self.tool_runner.max_iterations:
+                return self._finish_tool_loop(reply, round_trips, tool_calls)
+            with self.metrics.span("tools"):
+                results = self.tool_runner.run(self, reply["tool_calls"])
+            tool_calls += len(results)
+            messages = self._record_tool_calls(reply, results)
+    
+    def chat(self, user_message: str) -> str:
+        """
+        Send a message to the banking bot and get a response.
+        
+        Args:
+            user_message: The user's input message
             
-            # Add bot response to history
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": bot_response
-            })
+        Returns:
+            The bot's response
+        """
+        with self.metrics.span("chat"):
+            with self.metrics.span("prepare"):
+                messages = self._prepare_messages(user_message)
             
-            return bot_response
+            cache_key = self._response_cache_key(messages)
+            if cache_key is not None:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    self.metrics.inc("chat_replies_total", source="cache")
+                    return self._record_response(cached)
             
+            try:
+                if self.tool_runner is not None:
+                    bot_response, used_tools = self._complete_with_tools(messages)
+                else:
+                    bot_response, used_tools = self._complete(messages), False
+                # Answers built from tool results depend on live account data
+                if not used_tools:
+                    self._store_cached_response(cache_key, bot_response)
+                self.metrics.inc("chat_replies_total", source="tools" if used_tools else "llm")
+                return self._record_response(bot_response)
+                
+            except Exception as e:
+                self.metrics.inc("errors_total", stage="chat")
+                return self._record_response(f"{CHAT_ERROR_PREFIX}: {str(e)}")
+    
+    def chat_stream(self, user_message: str) -> Iterator[str]:
+        """
+        Send a message to the banking bot and stream the response as it is generated.
+        
+        The full response is added to the conversation history once the stream ends.
+        Tools are not offered on the streaming path; use chat() for tool calling.
+        
+        Args:
+            user_message: The user's input message
+            
+        Yields:
+            Pieces of the bot's response in order
+        """
+        with self.metrics.span("prepare"):
+            messages = self._prepare_messages(user_message)
+        
+        cache_key = self._response_cache_key(messages)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self._record_response(cached)
+                yield cached
+                return
+        
+        chunks = []
+        try:
+            for delta in self._stream_completion(messages):
+                chunks.append(delta)
+                yield delta
+            self._store_cached_response(cache_key, "".join(chunks))
         except Exception as e:
-            error_response = f"Sorry, I encountered an error: {str(e)}"
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": error_response
-            })
-            return error_response
+            error_response = f"{CHAT_ERROR_PREFIX}: {str(e)}"
+            chunks.append(error_response)
+            yield error_response
+        finally:
+            self._record_response("".join(chunks))
     
-    def process_banking_command(self, command: str) -> str:
+    def _with_history(self, conversation_history: list, buffer: Optional[MessageBuffer] = None) -> "BankingBot":
         """
-        Process banking-specific commands.
+        Return a shallow copy sharing clients, caches and accounts but with its own history.
         
         Args:
-            command: The banking command to process
+            conversation_history: History the copy reads and appends to
+            buffer: Message buffer kept with that history between turns (a new one if omitted)
+        """
+        view = copy.copy(self)
+        view.conversation_history = conversation_history
+        view._buffer = buffer if buffer is not None else MessageBuffer()
+        return view
+    
+    def chat_many(
+        self,
+        prompts: List[str],
+        max_concurrency: int = 8,
+        progress: Optional[Callable[[int, int, Dict[str, Any]], None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Answer many independent prompts in parallel.
+        
+        Each prompt gets a fresh, isolated conversation; this bot's own history is untouched.
+        
+        Args:
+            prompts: The prompts to send
+            max_concurrency: Maximum number of LLM calls in flight at once
+            progress: Optional callback(completed, total, result) called as each prompt finishes
             
         Returns:
-            The result of the command
+            One result dict per prompt, in input order
+        """
+        def run(prompt: str) -> Dict[str, Any]:
+            try:
+                response = self._with_history([]).chat(prompt)
+            except Exception as e:
+                return {"success": False, "prompt": prompt, "error": str(e)}
+            if response.startswith((API_ERROR_PREFIX, CHAT_ERROR_PREFIX)):
+                return {"success": False, "prompt": prompt, "error": response}
+            return {"success": True, "prompt": prompt, "response": response}
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(prompts)
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+            futures = {pool.submit(run, prompt): index for index, prompt in enumerate(prompts)}
+            for completed, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                results[futures[future]] = result
+                if progress is not None:
+                    progress(completed, len(prompts), result)
+        return results
+    
+    def _format_balance(self, account_id: str) -> str:
+        balance = self.get_account_balance(account_id)
+        if balance is not None:
+            return f"Account {account_id} balance: ${balance:.2f}"
+        else:
+            return f"Account {account_id} not found"
+    
+    def _format_balance_at(self, account_id: str, as_of: str) -> str:
+        try:
+            result = self.get_balance_at(account_id, as_of)
+        except ValueError:
+            return f"Invalid date: {as_of} (use YYYY-MM-DD)"
+        if "error" in result:
+            return result["error"]
+        return f"Account {account_id} balance on {as_of}: ${result['balance']:.2f}"
+    
+    def _format_transfer(self, from_acc: str, to_acc: str, amount: float) -> str:
+        result = self.transfer_funds(from_acc, to_acc, amount)
+        if result.get("success"):
+            return result["message"]
+        else:
+            return result.get("error", "Transfer failed")
+    
+    def _format_history(self, account_id: str, limit: int = 5) -> str:
+        result = self.get_transaction_history(account_id, limit=limit)
+        if "error" not in result:
+            transactions = result["transactions"]
+            return f"Recent transactions for {account_id}:\n" + \
+                   "\n".join([f"  {t['date']}: {t['type']} ${t['amount']:.2f} - {t['description']}" 
+                             for t in transactions])
+        else:
+            return result["error"]
+    
+    def _format_history_query(self, args: List[str]) -> str:
+        """Run `history <account_id> [limit] [--from D] [--to D] [--type T] [--min X] [--max X] [--search S] [--cursor C] [--newest]`."""
+        account_id, rest = args[0], args[1:]
+        filters: Dict[str, Any] = {"limit": 5}
+        if rest and rest[0].isdigit():
+            filters["limit"] = int(rest.pop(0))
+        try:
+            while rest:
+                flag = rest.pop(0)
+                if flag == "--newest":
+                    filters["newest_first"] = True
+                elif flag in HISTORY_FLAGS and rest:
+                    name, parse = HISTORY_FLAGS[flag]
+                    filters[name] = parse(rest.pop(0))
+                else:
+                    return f"Unknown or incomplete history option: {flag}"
+            result = self.query_transactions(account_id, **filters)
+        except ValueError as e:
+            return f"Invalid history query: {e}"
+        
+        if "error" in result:
+            return result["error"]
+        transactions = result["transactions"]
+        if not transactions:
+            return f"No matching transactions for {account_id}"
+        lines = [f"Transactions for {account_id}:"]
+        lines += [f"  {t['date']}: {t['type']} ${t['amount']:.2f} - {t['description']}" for t in transactions]
+        if result["next_cursor"]:
+            lines.append(f"More results: add --cursor {result['next_cursor']}")
+        return "\n".join(lines)
+    
+    def _run_banking_command(self, command: str) -> Optional[str]:
+        """
+        Run a structured banking command against the account store.
+        
+        Exact commands are tried first, then the local intent router for
+        natural-language account requests.
+        
+        Args:
+            command: The raw command text
+            
+        Returns:
+            The command result, or None if the text should go to the LLM
         """
         if command.startswith("balance"):
             parts = command.split()
+            if len(parts) > 2:
+                return self._format_balance_at(parts[1], parts[2])
             if len(parts) > 1:
-                account_id = parts[1]
-                balance = self.get_account_balance(account_id)
-                if balance is not None:
-                    return f"Account {account_id} balance: ${balance:.2f}"
-                else:
-                    return f"Account {account_id} not found"
+                return self._format_balance(parts[1])
         
         elif command.startswith("transfer"):
             parts = command.split()
             if len(parts) >= 4:
-                from_acc = parts[1]
-                to_acc = parts[2]
                 try:
                     amount = float(parts[3])
-                    result = self.transfer_funds(from_acc, to_acc, amount)
-                    if result.get("success"):
-                        return result["message"]
-                    else:
-                        return result.get("error", "Transfer failed")
                 except ValueError:
                     return "Invalid transfer amount"
+                return self._format_transfer(parts[1], parts[2], amount)
         
         elif command.startswith("history"):
+            if "--" in command:
+                try:
+                    parts = shlex.split(command)
+                except ValueError as e:
+                    return f"Invalid history query: {e}"
+                if len(parts) > 1:
+                    return self._format_history_query(parts[1:])
             parts = command.split()
             if len(parts) > 1:
-                account_id = parts[1]
-                result = self.get_transaction_history(account_id)
-                if "error" not in result:
-                    transactions = result["transactions"]
-                    return f"Recent transactions for {account_id}:\n" + \
-                           "\n".join([f"  {t['date']}: {t['type']} ${t['amount']:.2f} - {t['description']}" 
-                                     for t in transactions])
-                else:
-                    return result["error"]
+                limit = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 5
+                return self._format_history(parts[1], limit)
+        
+        return self._run_routed_intent(command)
+    
+    def _run_routed_intent(self, message: str) -> Optional[str]:
+        """Answer a natural-language account request locally if the router is confident."""
+        if self.intent_router is None:
+            return None
+        
+        with self.metrics.span("intent"):
+            decision = self.intent_router.classify(message)
+        self.last_intent = decision
+        if decision["route"] != "local":
+            return None
+        
+        slots = decision["slots"]
+        if decision["intent"] == "balance":
+            if "as_of" in slots:
+                return self._format_balance_at(slots["account_id"], slots["as_of"])
+            return self._format_balance(slots["account_id"])
+        if decision["intent"] == "history":
+            return self._format_history(slots["account_id"], slots.get("limit", 5))
+        # Transfers are never run from free text; the router sends them to the LLM
+        return None
+    
+    def process_banking_command(self, command: str) -> str:
+        """
+        Process banking-specific commands.
+        
+        Args:
+            command: The banking command to process
+            
+        Returns:
+            The result of the command
+        """
+        with self.metrics.span("command"):
+            result = self._run_banking_command(command)
+        if result is not None:
+            self.metrics.inc("commands_total", route="local")
+            return result
         
         # If not a specific command, treat as a chat message
+        self.metrics.inc("commands_total", route="llm")
         return self.chat(command)
     
+    def process_banking_command_stream(self, command: str) -> Iterator[str]:
+        """
+        Streaming variant of process_banking_command.
+        
+        Args:
+            command: The banking command to process
+            
+        Yields:
+            The command result in one piece, or the streamed chat response
+        """
+        with self.metrics.span("command"):
+            result = self._run_banking_command(command)
+        if result is not None:
+            self.metrics.inc("commands_total", route="local")
+            yield result
+            return
+        
+        # If not a specific command, stream it as a chat message
+        self.metrics.inc("commands_total", route="llm")
+        yield from self.chat_stream(command)
+    
     def reset_conversation(self):
         """Reset the conversation history."""
         self.conversation_history = []
@@ -277,8 +1026,9 @@ def main():
     print("Welcome to Banking Bot powered by Mistral AI")
     print("=" * 60)
     print("\nAvailable commands:")
-    print("  balance <account_id>      - Check account balance")
-    print("  history <account_id>      - View transaction history")
+    print("  balance <account_id> [date] - Check account balance (now, or at the end of YYYY-MM-DD)")
+    print("  history <account_id> [limit] [--from D] [--to D] [--type T] [--min X] [--max X] [--search S]")
+    print("                            - View or search transaction history")
     print("  transfer <from> <to> <amount> - Transfer funds")
     print("  Or just type any banking question!")
     print("\nExample accounts: ACC001, ACC002")
@@ -309,9 +1059,9 @@ def main():
                 continue
             
             print("\nBot: ", end="", flush=True)
-            response = bot.process_banking_command(user_input)
-            print(response)
-            print()
+            for chunk in bot.process_banking_command_stream(user_input):
+                print(chunk, end="", flush=True)
+            print("\n")
             
         except KeyboardInterrupt:
             print("\n\nThank you for using Banking Bot. Goodbye!")
@@ -0,0 +1,159 @@
+"""
+Token-budgeted conversation window
+Keeps the messages sent to Mistral AI within a configurable token budget
+"""
+
+from typing import Optional, Dict, Any, List, Tuple, Union
+
+
+# Rough per-message framing cost (role markers, separators) in Mistral chat templates
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate the token count of a piece of text without a tokenizer.
+
+    Uses the common ~4 characters per token rule for English text.
+
+    Args:
+        text: The text to measure
+
+    Returns:
+        Estimated number of tokens
+    """
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    """Estimate the tokens one chat message costs, including framing."""
+    return estimate_tokens(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS
+
+
+class SlidingWindowStrategy:
+    """Keep the most recent turns that fit in the budget."""
+
+    def select(self, history: List[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+        """
+        Choose which history messages to send.
+
+        Args:
+            history: Full conversation history, oldest first
+            budget: Tokens available for history messages
+
+        Returns:
+            The messages to send, oldest first
+        """
+        start, _ = self._recent_start(history, budget)
+        return history[start:]
+
+    @staticmethod
+    def _recent_start(history: List[Dict[str, Any]], budget: int, first: int = 0) -> Tuple[int, int]:
+        """
+        Walk back from the newest turn and find where the kept tail of history[first:] starts.
+
+        Only the kept turns (plus the one that did not fit) are visited, so the cost
+        follows the window size rather than the history length.
+
+        Returns:
+            (start index, tokens used by history[start:])
+        """
+        start = end = len(history)
+        used = 0
+        while end > first:
+            # A turn starts at a user message (or at the first message considered)
+            position = end - 1
+            cost = message_tokens(history[position])
+            while position > first and history[position]["role"] != "user":
+                position -= 1
+                cost += message_tokens(history[position])
+            # The newest turn is always sent, even if it alone exceeds the budget
+            if start < len(history) and used + cost > budget:
+                break
+            start, end = position, position
+            used += cost
+        return start, used
+
+
+class PinnedFirstTurnStrategy(SlidingWindowStrategy):
+    """Always keep the first turn (it usually states the customer's goal), then recent turns."""
+
+    def select(self, history: List[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+        # The first turn runs up to the next user message
+        first_end = 1
+        while first_end < len(history) and history[first_end]["role"] != "user":
+            first_end += 1
+        if first_end >= len(history):
+            return list(history)
+
+        first = history[:first_end]
+        first_cost = sum(message_tokens(m) for m in first)
+        start, used = self._recent_start(history, budget - first_cost, first=first_end)
+        recent = history[start:]
+        if used + first_cost > budget:
+            # Not enough room for both: the latest turn wins
+            return recent
+        return first + recent
+
+
+class ContextWindow:
+    """
+    Builds the message list for each request within a token budget.
+    The stored conversation history is left untouched; only what is sent is trimmed.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = 4000, strategy: Optional[SlidingWindowStrategy] = None):
+        """
+        Initialize the context window.
+
+        Args:
+            max_tokens: Token budget for system prompt plus history (None disables trimming)
+            strategy: Trimming strategy (defaults to SlidingWindowStrategy)
+        """
+        self.max_tokens = max_tokens
+        self.strategy = strategy or SlidingWindowStrategy()
+        self.last_report: Dict[str, int] = {}
+        self.total_saved_tokens = 0
+
+    def build_messages(
+        self,
+        system_prompt: Union[str, Dict[str, Any]],
+        history: List[Dict[str, Any]],
+        history_tokens: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Build the messages for one API call.
+
+        Args:
+            system_prompt: The system prompt, or a prebuilt system message, always sent first
+            history: Full conversation history, oldest first
+            history_tokens: Estimated tokens of the whole history, if already known
+                (e.g. kept as a running total by MessageBuffer)
+
+        Returns:
+            System message followed by the selected history messages
+        """
+        if isinstance(system_prompt, dict):
+            system_message = system_prompt
+        else:
+            system_message = {"role": "system", "content": system_prompt}
+        system_cost = message_tokens(system_message)
+        if history_tokens is None:
+            history_tokens = sum(message_tokens(m) for m in history)
+        full_tokens = system_cost + history_tokens
+
+        if self.max_tokens is None or full_tokens <= self.max_tokens:
+            selected = list(history)
+            sent_tokens = full_tokens
+        else:
+            selected = self.strategy.select(history, self.max_tokens - system_cost)
+            sent_tokens = system_cost + sum(message_tokens(m) for m in selected)
+
+        self.last_report = {
+            "full_tokens": full_tokens,
+            "sent_tokens": sent_tokens,
+            "saved_tokens": full_tokens - sent_tokens,
+            "dropped_messages": len(history) - len(selected),
+        }
+        self.total_saved_tokens += full_tokens - sent_tokens
+        return [system_message] + selected
@@ -0,0 +1,99 @@
+"""
+Shared HTTP connection pool for the Mistral REST API
+Keeps TCP/TLS connections alive across chat turns and across BankingBot instances
+"""
+
+import os
+import threading
+from typing import Optional, Dict, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_POOL_CONFIG: Dict[str, Any] = {
+    "pool_connections": int(os.getenv("MISTRAL_HTTP_POOL_CONNECTIONS", "4")),
+    "pool_maxsize": int(os.getenv("MISTRAL_HTTP_POOL_MAXSIZE", "32")),
+    "pool_block": False,
+    "keep_alive": True,
+}
+
+_session_lock = threading.Lock()
+_shared_session: Optional[requests.Session] = None
+_shared_config: Dict[str, Any] = dict(DEFAULT_POOL_CONFIG)
+
+
+def build_session(
+    pool_connections: int = DEFAULT_POOL_CONFIG["pool_connections"],
+    pool_maxsize: int = DEFAULT_POOL_CONFIG["pool_maxsize"],
+    pool_block: bool = DEFAULT_POOL_CONFIG["pool_block"],
+    keep_alive: bool = DEFAULT_POOL_CONFIG["keep_alive"],
+) -> requests.Session:
+    """
+    Build a new pooled requests session.
+
+    Args:
+        pool_connections: Number of per-host pools to cache
+        pool_maxsize: Maximum keep-alive connections kept per host
+        pool_block: Block when the per-host pool is exhausted instead of opening extra connections
+        keep_alive: Reuse connections between requests (False sends "Connection: close")
+
+    Returns:
+        A session with the pooled adapter mounted for http and https
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use."""
+    global _shared_session
+    if _shared_session is None:
+        with _session_lock:
+            if _shared_session is None:
+                _shared_session = build_session(**_shared_config)
+    return _shared_session
+
+
+def configure_pool(**config: Any) -> requests.Session:
+    """
+    Reconfigure the shared pool. The previous session is closed and replaced.
+
+    Args:
+        **config: Any of pool_connections, pool_maxsize, pool_block, keep_alive
+
+    Returns:
+        The new shared session
+    """
+    global _shared_session
+    unknown = set(config) - set(DEFAULT_POOL_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown pool options: {', '.join(sorted(unknown))}")
+
+    with _session_lock:
+        _shared_config.update(config)
+        old_session = _shared_session
+        _shared_session = build_session(**_shared_config)
+
+    if old_session is not None:
+        old_session.close()
+    return _shared_session
+
+
+def close_session():
+    """Close the shared session and release its pooled connections."""
+    global _shared_session
+    with _session_lock:
+        old_session = _shared_session
+        _shared_session = None
+    if old_session is not None:
+        old_session.close()
@@ -0,0 +1,392 @@
+"""
+HTTP service for the Banking Bot
+aiohttp front-end with chat, command and account endpoints, per-session routing and graceful shutdown
+
+Run standalone:
+    python src/http_server.py --port 8080 --workers 8 --request-timeout 30
+"""
+
+import os
+import time
+import uuid
+import signal
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
+try:
+    from .async_banking_bot import AsyncBankingBot
+    from .session_manager import SessionManager
+    from .banking_bot import HISTORY_FLAGS
+    from .tool_calling import ToolRunner
+    from .sqlite_store import SQLiteAccountStore
+    from .metrics import Metrics
+    from .account_store import transfer_cents
+    from .single_flight import SingleFlight
+except ImportError:
+    from async_banking_bot import AsyncBankingBot
+    from session_manager import SessionManager
+    from banking_bot import HISTORY_FLAGS
+    from tool_calling import ToolRunner
+    from sqlite_store import SQLiteAccountStore
+    from metrics import Metrics
+    from account_store import transfer_cents
+    from single_flight import SingleFlight
+
+
+SESSION_HEADER = "X-Session-Id"
+
+# Transaction query parameters: the `history` command flags without their dashes
+QUERY_PARAMS = {flag[2:]: spec for flag, spec in HISTORY_FLAGS.items()}
+
+Handler = Callable[["web.Request"], Awaitable["web.StreamResponse"]]
+
+
+def _error(status: int, message: str, headers: Optional[Dict[str, str]] = None) -> "web.Response":
+    return web.json_response({"error": message}, status=status, headers=headers)
+
+
+async def _json_body(request: "web.Request") -> Dict[str, Any]:
+    """The request's JSON object body; raises a 400 response if it is not one."""
+    try:
+        body = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text='{"error": "Body must be JSON"}', content_type="application/json")
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(text='{"error": "Body must be a JSON object"}', content_type="application/json")
+    return body
+
+
+class BankingHTTPServer:
+    """
+    Serves a SessionManager over HTTP.
+
+    The event loop handles connections and awaits the LLM through an AsyncBankingBot;
+    account store calls, which may block on disk or locks, run on a thread pool.
+    Each session's turns are serialized, so one conversation never interleaves.
+
+    Endpoints:
+        POST   /v1/chat                             {"message", "session_id"?} -> {"session_id", "response"}
+        POST   /v1/command                          {"command", "session_id"?} -> {"session_id", "response"}
+        DELETE /v1/sessions/{session_id}
+        GET    /v1/accounts/{account_id}            holder, type and balance
+        GET    /v1/accounts/{account_id}/balance    ?as_of=YYYY-MM-DD
+        GET    /v1/accounts/{account_id}/transactions  ?limit, from, to, type, min, max, search, cursor, newest
+        POST   /v1/transfers                        {"from_account", "to_account", "amount"}
+        GET    /health
+        GET    /metrics                             Prometheus text, or ?format=json
+
+    The session id may also be sent in the X-Session-Id header; a new one is issued
+    when neither is given.
+    """
+
+    def __init__(
+        self,
+        bot: Optional[AsyncBankingBot] = None,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        workers: int = 8,
+        request_timeout: float = 30.0,
+        shutdown_timeout: float = 30.0,
+        max_sessions: int = 100_000,
+        idle_ttl_seconds: Optional[float] = 1800,
+        **bot_kwargs: Any,
+    ):
+        """
+        Initialize the server (call start() or serve_forever() to begin serving).
+
+        Args:
+            bot: Engine bot shared by all sessions (built from bot_kwargs if omitted)
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            workers: Threads for blocking account store work
+            request_timeout: Seconds before a request is answered with 504
+            shutdown_timeout: Seconds stop() waits for in-flight requests
+            max_sessions: Least recently active sessions are evicted beyond this count
+            idle_ttl_seconds: Sessions idle longer than this are evicted (None disables)
+            **bot_kwargs: Arguments for AsyncBankingBot when no engine is given
+        """
+        if web is None:
+            raise ImportError("aiohttp is required for the HTTP server: pip install aiohttp")
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="http-worker")
+        if bot is None:
+            bot = AsyncBankingBot(timeout=request_timeout, executor=self.pool, **bot_kwargs)
+        elif bot.executor is None:
+            bot.executor = self.pool
+        self.bot = bot
+        self.sessions = SessionManager(bot=bot, max_sessions=max_sessions, idle_ttl_seconds=idle_ttl_seconds)
+        self.host = host
+        self.port = port
+        self.request_timeout = request_timeout
+        self.shutdown_timeout = shutdown_timeout
+
+        self.in_flight = 0
+        self.requests = 0
+        self.timeouts = 0
+        self.draining = False
+        self._idle = asyncio.Event()
+        self._runner: Optional["web.AppRunner"] = None
+        self._site: Optional["web.TCPSite"] = None
+        self._evictor: Optional[asyncio.Task] = None
+        self._started_at = time.monotonic()
+
+    @property
+    def base_url(self) -> str:
+        """URL of the running server."""
+        return f"http://{self.host}:{self.port}"
+
+    def build_app(self) -> "web.Application":
+        """The aiohttp application with all routes and middleware."""
+        app = web.Application(middlewares=[self._middleware])
+        app.add_routes([
+            web.post("/v1/chat", self.handle_chat),
+            web.post("/v1/command", self.handle_command),
+            web.delete("/v1/sessions/{session_id}", self.handle_end_session),
+            web.get("/v1/accounts/{account_id}", self.handle_account),
+            web.get("/v1/accounts/{account_id}/balance", self.handle_balance),
+            web.get("/v1/accounts/{account_id}/transactions", self.handle_transactions),
+            web.post("/v1/transfers", self.handle_transfer),
+            web.get("/health", self.handle_health),
+            web.get("/metrics", self.handle_metrics),
+        ])
+        return app
+
+    @web.middleware
+    async def _middleware(self, request: "web.Request", handler: Handler) -> "web.StreamResponse":
+        """Refuse work while draining, count in-flight requests and apply the request timeout."""
+        if request.path in ("/health", "/metrics"):
+            return await handler(request)
+        if self.draining:
+            return _error(503, "Server is shutting down", headers={"Connection": "close"})
+        self.in_flight += 1
+        self.requests += 1
+        self._idle.clear()
+        resource = request.match_info.route.resource
+        try:
+            with self.bot.metrics.span(f"http {resource.canonical if resource is not None else 'unmatched'}"):
+                return await asyncio.wait_for(handler(request), self.request_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return _error(504, f"Request timed out after {self.request_timeout:g}s")
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._idle.set()
+
+    async def _blocking(self, function: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking call on the worker pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, lambda: function(*args, **kwargs))
+
+    @staticmethod
+    def _session_id(request: "web.Request", body: Dict[str, Any]) -> str:
+        session_id = body.get("session_id") or request.headers.get(SESSION_HEADER)
+        return str(session_id) if session_id else uuid.uuid4().hex
+
+    async def _turn(self, request: "web.Request", field: str, run) -> "web.Response":
+        body = await _json_body(request)
+        text = body.get(field)
+        if not isinstance(text, str) or not text.strip():
+            return _error(400, f"'{field}' must be a non-empty string")
+        session_id = self._session_id(request, body)
+        response = await run(session_id, text.strip())
+        return web.json_response({"session_id": session_id, "response": response},
+                                 headers={SESSION_HEADER: session_id})
+
+    async def handle_chat(self, request: "web.Request") -> "web.Response":
+        return await self._turn(request, "message", self.sessions.achat)
+
+    async def handle_command(self, request: "web.Request") -> "web.Response":
+        return await self._turn(request, "command", self.sessions.aprocess_banking_command)
+
+    async def handle_end_session(self, request: "web.Request") -> "web.Response":
+        session_id = request.match_info["session_id"]
+        if not self.sessions.end_session(session_id):
+            return _error(404, f"Session {session_id} not found")
+        return web.json_response({"session_id": session_id, "ended": True})
+
+    async def handle_account(self, request: "web.Request") -> "web.Response":
+        account_id = request.match_info["account_id"]
+        info = await self._blocking(self.bot.get_account_info, account_id)
+        if "error" in info:
+            return _error(404, info["error"])
+        return web.json_response({
+            "account_id": account_id,
+            "account_holder": info["account_holder"],
+            "account_type": info["account_type"],
+            "balance": info["balance"],
+        })
+
+    async def handle_balance(self, request: "web.Request") -> "web.Response":
+        account_id = request.match_info["account_id"]
+        as_of = request.query.get("as_of")
+        if as_of:
+            try:
+                result = await self._blocking(self.bot.get_balance_at, account_id, as_of)
+            except ValueError:
+                return _error(400, f"Invalid date: {as_of} (use YYYY-MM-DD)")
+            if "error" in result:
+                return _error(404, result["error"])
+            return web.json_response(result)
+        balance = await self._blocking(self.bot.get_account_balance, account_id)
+        if balance is None:
+            return _error(404, f"Account {account_id} not found")
+        return web.json_response({"account_id": account_id, "balance": balance})
+
+    async def handle_transactions(self, request: "web.Request") -> "web.Response":
+        account_id = request.match_info["account_id"]
+        filters: Dict[str, Any] = {}
+        try:
+            for name, value in request.query.items():
+                if name == "limit":
+                    filters["limit"] = int(value)
+                elif name == "newest":
+                    filters["newest_first"] = value.lower() in ("1", "true", "yes")
+                elif name in QUERY_PARAMS:
+                    argument, parse = QUERY_PARAMS[name]
+                    filters[argument] = parse(value)
+                else:
+                    return _error(400, f"Unknown query parameter: {name}")
+            result = await self._blocking(self.bot.query_transactions, account_id, **filters)
+        except ValueError as e:
+            return _error(400, f"Invalid history query: {e}")
+        if "error" in result:
+            return _error(404, result["error"])
+        return web.json_response(result)
+
+    async def handle_transfer(self, request: "web.Request") -> "web.Response":
+        body = await _json_body(request)
+        try:
+            from_account, to_account = str(body["from_account"]), str(body["to_account"])
+            # The store validates again; checked here too so a bad amount is a 400, not a 422
+            transfer_cents(body["amount"])
+        except KeyError as e:
+            return _error(400, f"Missing field {e.args[0]!r}")
+        except ValueError as e:
+            return _error(400, str(e))
+        result = await self._blocking(self.bot.transfer_funds, from_account, to_account, body["amount"])
+        return web.json_response(result, status=200 if result.get("success") else 422)
+
+    async def handle_health(self, request: "web.Request") -> "web.Response":
+        """Liveness and readiness: 503 while draining so load balancers stop routing here."""
+        return web.json_response({
+            "status": "draining" if self.draining else "ok",
+            "uptime_seconds": round(time.monotonic() - self._started_at, 1),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "timeouts": self.timeouts,
+            "sessions": len(self.sessions),
+            "backends": self.bot.get_backend_health(),
+            "coalescing": self.bot.single_flight.stats() if self.bot.single_flight is not None else None,
+        }, status=503 if self.draining else 200)
+
+    async def handle_metrics(self, request: "web.Request") -> "web.Response":
+        """Stage latencies and counters in the Prometheus text format, or JSON with ?format=json."""
+        if request.query.get("format") == "json":
+            return web.Response(text=self.bot.export_metrics("json"), content_type="application/json")
+        return web.Response(text=self.bot.export_metrics("prometheus"), content_type="text/plain")
+
+    async def _evict_idle_sessions(self, interval: float = 60.0):
+        while True:
+            await asyncio.sleep(interval)
+            self.sessions.evict_idle()
+
+    async def start(self):
+        """Start serving on the running event loop."""
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        self._site = web.TCPSite(self._runner, self.host, self.port)
+        await self._site.start()
+        if self.port == 0:
+            self.port = self._runner.addresses[0][1]
+        self._idle.set()
+        self._evictor = asyncio.create_task(self._evict_idle_sessions())
+
+    async def stop(self):
+        """
+        Shut down gracefully.
+
+        Stops accepting connections, answers new requests on open connections with 503,
+        waits up to shutdown_timeout for in-flight requests, then closes the HTTP client,
+        the worker pool and the server.
+        """
+        self.draining = True
+        if self._evictor is not None:
+            self._evictor.cancel()
+        if self._site is not None:
+            await self._site.stop()
+        try:
+            await asyncio.wait_for(self._idle.wait(), self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            print(f"Shutdown timeout: abandoning {self.in_flight} in-flight requests")
+        if self._runner is not None:
+            await self._runner.cleanup()
+        await self.bot.aclose()
+        self.pool.shutdown(wait=True)
+        if self.bot.tool_runner is not None:
+            self.bot.tool_runner.close()
+
+    async def serve_forever(self):
+        """Serve until SIGINT or SIGTERM, then shut down gracefully."""
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, stop.set)
+            except NotImplementedError:  # Windows
+                pass
+        await self.start()
+        print(f"Banking Bot HTTP service listening on {self.base_url}")
+        try:
+            await stop.wait()
+        finally:
+            print("Shutting down...")
+            await self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP service for the Banking Bot")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=8, help="threads for blocking account work")
+    parser.add_argument("--request-timeout", type=float, default=30.0)
+    parser.add_argument("--shutdown-timeout", type=float, default=30.0)
+    parser.add_argument("--database", help="SQLite account database (default: in-memory mock accounts)")
+    parser.add_argument("--tools", action="store_true", help="let the LLM call the read-only account APIs as tools")
+    parser.add_argument("--tool-transfers", action="store_true",
+                        help="with --tools, also let the LLM move money (no confirmation step)")
+    parser.add_argument("--coalesce", action="store_true", help="share one LLM call between identical concurrent requests")
+    parser.add_argument("--no-metrics", action="store_true", help="disable stage timings and counters on /metrics")
+    args = parser.parse_args()
+
+    async def run():
+        bot_kwargs: Dict[str, Any] = {"metrics": Metrics(enabled=not args.no_metrics)}
+        if args.coalesce:
+            bot_kwargs["single_flight"] = SingleFlight()
+        if args.database:
+            bot_kwargs["account_store"] = SQLiteAccountStore(args.database)
+        if args.tools:
+            bot_kwargs["tool_runner"] = ToolRunner(allow_transfers=args.tool_transfers)
+        try:
+            server = BankingHTTPServer(host=args.host, port=args.port, workers=args.workers,
+                                       request_timeout=args.request_timeout, shutdown_timeout=args.shutdown_timeout,
+                                       api_key=os.getenv("MISTRAL_API_KEY"), **bot_kwargs)
+            await server.serve_forever()
+        finally:
+            if args.database:
+                bot_kwargs["account_store"].close()
+
+    try:
+        asyncio.run(run())
+    except ValueError as e:
+        print(f"✗ Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
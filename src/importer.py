@@ -0,0 +1,275 @@
+"""
+Streaming transaction importer
+Chunked CSV/JSONL reader, validation and bulk insert into an account store, in bounded memory
+"""
+
+import os
+import csv
+import math
+import argparse
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import islice
+from typing import Optional, Dict, Any, List, Tuple, Callable, BinaryIO, Iterator
+
+try:
+    from .account_store import to_cents, MAX_CENTS
+    from .sqlite_store import SQLiteAccountStore
+except ImportError:
+    from account_store import to_cents, MAX_CENTS
+    from sqlite_store import SQLiteAccountStore
+
+
+REQUIRED_COLUMNS = ("account_id", "date", "type", "amount")
+VALID_TYPES = ("deposit", "withdrawal", "transfer")
+FORMATS = ("csv", "jsonl")
+
+# (account_id, date_ordinal, type, amount_cents, description): the store's bulk-insert row
+Row = Tuple[str, int, str, int, str]
+
+
+def _normalize(record: Dict[str, Any]) -> Tuple[Row, Tuple[str, str]]:
+    """Validate one parsed record; raises ValueError with a readable reason."""
+    account_id = str(record.get("account_id") or "").strip()
+    if not account_id:
+        raise ValueError("missing account_id")
+    raw_date = str(record.get("date") or "").strip()
+    try:
+        ordinal = date.fromisoformat(raw_date).toordinal()
+    except ValueError:
+        raise ValueError(f"invalid date {raw_date!r}")
+    txn_type = str(record.get("type") or "").strip().lower()
+    if txn_type not in VALID_TYPES:
+        raise ValueError(f"invalid type {txn_type!r}")
+    raw_amount = record.get("amount")
+    try:
+        amount = float(raw_amount)
+        if not math.isfinite(amount):
+            raise ValueError
+        cents = to_cents(amount)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"invalid amount {raw_amount!r}")
+    if cents <= 0:
+        raise ValueError("amount must be positive")
+    if cents > MAX_CENTS:
+        raise ValueError(f"amount {raw_amount!r} is too large")
+    description = str(record.get("description") or "").strip()
+    owner = (str(record.get("account_holder") or "").strip(), str(record.get("account_type") or "").strip())
+    return (account_id, ordinal, txn_type, cents, description), owner
+
+
+def parse_chunk(
+    fmt: str,
+    header: Optional[List[str]],
+    lines: List[bytes],
+    first_line: int,
+) -> Tuple[List[Row], List[int], Dict[str, Tuple[str, str]], List[Tuple[int, str]]]:
+    """
+    Parse and validate one chunk of raw lines.
+
+    Module-level so it can run in a worker process.
+
+    Args:
+        fmt: "csv" or "jsonl"
+        header: CSV column names (None for JSONL)
+        lines: Raw lines, newline included
+        first_line: 1-based file line number of lines[0]
+
+    Returns:
+        (rows, their line numbers, {account_id: (holder, type)} seen in the chunk,
+        rejected (line number, error) pairs)
+    """
+    rows, line_numbers, owners, rejected = [], [], {}, []
+    for offset, raw in enumerate(lines):
+        line_number = first_line + offset
+        try:
+            text = raw.decode("utf-8").rstrip("\r\n")
+            if not text.strip():
+                continue
+            if fmt == "jsonl":
+                record = json.loads(text)
+                if not isinstance(record, dict):
+                    raise ValueError("not a JSON object")
+            else:
+                # Only quoted fields need the csv module
+                fields = next(csv.reader([text])) if '"' in text else text.split(",")
+                if len(fields) != len(header):
+                    raise ValueError(f"expected {len(header)} fields, got {len(fields)}")
+                record = dict(zip(header, fields))
+            row, owner = _normalize(record)
+        except ValueError as e:  # includes JSON and UTF-8 decode errors
+            rejected.append((line_number, str(e)))
+            continue
+        rows.append(row)
+        line_numbers.append(line_number)
+        if row[0] not in owners:
+            owners[row[0]] = owner
+    return rows, line_numbers, owners, rejected
+
+
+def _detect_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == ".csv":
+        return "csv"
+    raise ValueError(f"Cannot tell the format of {path}; pass fmt='csv' or fmt='jsonl'")
+
+
+def _read_header(f: BinaryIO) -> List[str]:
+    line = f.readline().decode("utf-8-sig").rstrip("\r\n")
+    header = [name.strip().lower() for name in next(csv.reader([line]), [])]
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise ValueError(f"CSV header is missing column(s): {', '.join(missing)}")
+    return header
+
+
+def _chunks(f: BinaryIO, chunk_size: int, first_line: int) -> Iterator[Tuple[int, List[bytes]]]:
+    while True:
+        lines = list(islice(f, chunk_size))
+        if not lines:
+            return
+        yield first_line, lines
+        first_line += len(lines)
+
+
+def import_file(
+    store,
+    path: str,
+    fmt: Optional[str] = None,
+    chunk_size: int = 10_000,
+    workers: int = 0,
+    dead_letter_path: Optional[str] = None,
+    create_accounts: bool = True,
+    update_balances: bool = False,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Stream a CSV or JSONL transaction export into an account store.
+
+    The file is read in chunks of raw lines, each chunk is parsed and validated
+    (in worker processes if `workers` > 0, with at most two chunks in flight per
+    worker), and the valid rows are bulk-inserted with store.import_transactions.
+    Memory use depends on the chunk size, not the file size. Every record needs
+    account_id, date (YYYY-MM-DD), type and a positive amount; description,
+    account_holder and account_type are optional. CSV records must each fit on one
+    line (no quoted newlines).
+
+    Args:
+        store: AccountStore or SQLiteAccountStore
+        path: Input file (.csv, or .jsonl/.ndjson)
+        fmt: "csv" or "jsonl", to override detection by extension
+        chunk_size: Lines per chunk
+        workers: Parser processes (0 parses in this process)
+        dead_letter_path: JSONL file receiving rejected lines as {"line", "error", "raw"}
+        create_accounts: Create unknown accounts (balance 0) instead of rejecting their rows
+        update_balances: Apply imported transactions to balances (see import_transactions)
+        progress: Called after each chunk with the running stats
+
+    Returns:
+        Stats: {"rows", "imported", "rejected", "accounts_created", "bytes", "total_bytes",
+        "elapsed", "rows_per_sec"}
+    """
+    fmt = fmt or _detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown import format: {fmt}")
+    total_bytes = os.path.getsize(path)
+    stats = {"rows": 0, "imported": 0, "rejected": 0, "accounts_created": 0,
+             "bytes": 0, "total_bytes": total_bytes, "elapsed": 0.0, "rows_per_sec": 0.0}
+    start = time.perf_counter()
+    dead_letter = open(dead_letter_path, "w", encoding="utf-8") if dead_letter_path else None
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+
+    def reject(line_number: int, error: str, raw: bytes):
+        stats["rejected"] += 1
+        if dead_letter is not None:
+            dead_letter.write(json.dumps({"line": line_number, "error": error,
+                                          "raw": raw.decode("utf-8", "replace").rstrip("\r\n")}) + "\n")
+
+    def insert(first_line: int, lines: List[bytes], parsed):
+        rows, line_numbers, owners, rejected = parsed
+        for line_number, error in rejected:
+            reject(line_number, error, lines[line_number - first_line])
+        if create_accounts:
+            for acc_id, (holder, acc_type) in owners.items():
+                if acc_id not in store:
+                    try:
+                        store.add_account(acc_id, holder or acc_id, acc_type or "Checking", 0.0)
+                        stats["accounts_created"] += 1
+                    except ValueError:
+                        pass  # created concurrently
+        if rows:
+            result = store.import_transactions(rows, update_balances=update_balances)
+            stats["imported"] += result["applied"]
+            for failure in result["failures"]:
+                line_number = line_numbers[failure["index"]]
+                reject(line_number, failure["error"], lines[line_number - first_line])
+        stats["rows"] += len(rows) + len(rejected)
+        stats["bytes"] += sum(map(len, lines))
+        stats["elapsed"] = time.perf_counter() - start
+        stats["rows_per_sec"] = stats["rows"] / stats["elapsed"] if stats["elapsed"] else 0.0
+        if progress is not None:
+            progress(dict(stats))
+
+    try:
+        with open(path, "rb") as f:
+            header = _read_header(f) if fmt == "csv" else None
+            chunks = _chunks(f, chunk_size, 2 if fmt == "csv" else 1)
+            if pool is None:
+                for first_line, lines in chunks:
+                    insert(first_line, lines, parse_chunk(fmt, header, lines, first_line))
+            else:
+                # Insert in file order while the next chunks are parsed
+                in_flight = deque()
+                for first_line, lines in chunks:
+                    in_flight.append((first_line, lines, pool.submit(parse_chunk, fmt, header, lines, first_line)))
+                    if len(in_flight) >= 2 * workers:
+                        first, pending, future = in_flight.popleft()
+                        insert(first, pending, future.result())
+                while in_flight:
+                    first, pending, future = in_flight.popleft()
+                    insert(first, pending, future.result())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if dead_letter is not None:
+            dead_letter.close()
+    stats["elapsed"] = time.perf_counter() - start
+    stats["rows_per_sec"] = stats["rows"] / stats["elapsed"] if stats["elapsed"] else 0.0
+    return stats
+
+
+def main():
+    """Import a file into a SQLite account store from the command line."""
+    parser = argparse.ArgumentParser(description="Import a CSV/JSONL transaction export")
+    parser.add_argument("input", help="CSV or JSONL file")
+    parser.add_argument("database", help="SQLite account database (created if missing)")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=0, help="parser processes")
+    parser.add_argument("--dead-letter", help="file for rejected lines")
+    parser.add_argument("--update-balances", action="store_true")
+    args = parser.parse_args()
+
+    def report(stats: Dict[str, Any]):
+        percent = 100 * stats["bytes"] / stats["total_bytes"] if stats["total_bytes"] else 100
+        print(f"\r{percent:5.1f}%  {stats['rows']:,} rows  {stats['rejected']:,} rejected  "
+              f"{stats['rows_per_sec']:,.0f} rows/s", end="", flush=True)
+
+    store = SQLiteAccountStore(args.database)
+    try:
+        stats = import_file(store, args.input, fmt=args.format, chunk_size=args.chunk_size, workers=args.workers,
+                            dead_letter_path=args.dead_letter, update_balances=args.update_balances,
+                            progress=report)
+    finally:
+        store.close()
+    print(f"\nImported {stats['imported']:,} transactions ({stats['accounts_created']:,} new accounts), "
+          f"rejected {stats['rejected']:,} in {stats['elapsed']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
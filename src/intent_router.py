@@ -0,0 +1,167 @@
+"""
+Local intent router for account queries
+Classifies free-text messages and extracts slots with compiled patterns, no network calls
+"""
+
+import re
+from typing import Dict, Any, List
+
+
+_ACCOUNT_ID = re.compile(r"\b([A-Za-z]{3}\d{3,})\b")
+_FROM = re.compile(r"\bfrom\s+([A-Za-z]{3}\d{3,})\b", re.IGNORECASE)
+_TO = re.compile(r"\b(?:to|into)\s+([A-Za-z]{3}\d{3,})\b", re.IGNORECASE)
+_AMOUNT = re.compile(r"(?<![A-Za-z\d.])([-+\u2212]\s?)?(\$\s?)?([-+\u2212]\s?)?(\d{1,3}(?:,\d{3})+|\d+)(\.\d{1,2})?(?![\d])")
+_LIMIT = re.compile(r"\b(?:last|latest|recent|past|previous)\s+(\d{1,3})\b", re.IGNORECASE)
+_DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+# A balance asked about the past, with no ISO date we can answer it from
+_PAST = re.compile(
+    r"\b(?:was|were|as\s+of|yesterday|last\s+(?:week|month|year)|"
+    r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|jun(?:e)?|jul(?:y)?|aug(?:ust)?|"
+    r"sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b",
+    re.IGNORECASE,
+)
+# Advice-seeking phrasing ("should I transfer...") must never move money
+_ADVISORY = re.compile(r"^\s*(?:how|should|why|what\s+if|is\s+it|would)\b", re.IGNORECASE)
+# Negated or cancelling requests ("don't transfer...", "cancel the transfer...") go to the LLM
+_NEGATION = re.compile(
+    r"\b(?:don'?t|do\s+not|doesn'?t|never|not|cancel(?:l?ed|l?ing)?|stop|undo|reverse|revert|dispute|refund)\b",
+    re.IGNORECASE,
+)
+
+INTENT_PATTERNS = {
+    "balance": [
+        (r"\bbalances?\b", 2.0),
+        (r"\bhow\s+much\b", 1.0),
+        (r"\bavailable\b", 0.5),
+        (r"\bfunds\b", 0.5),
+        (r"\bmoney\b", 0.5),
+    ],
+    "history": [
+        (r"\btransactions?\b", 2.0),
+        (r"\bhistory\b", 2.0),
+        (r"\bstatements?\b", 1.5),
+        (r"\bactivity\b", 1.5),
+        (r"\b(?:deposits|withdrawals|payments)\b", 1.0),
+        (r"\bspent\b", 1.0),
+        (r"\b(?:show|list|recent|last)\b", 0.5),
+    ],
+    "transfer": [
+        (r"\btransfer\b", 2.0),
+        (r"\b(?:send|move|wire)\b", 1.5),
+        (r"\bpay\b", 1.0),
+    ],
+}
+
+# Intents answered from the account APIs without the LLM. Transfers move money, so free
+# text never executes one; they go to the LLM (the explicit "transfer" command runs them)
+LOCAL_INTENTS = ("balance", "history")
+
+REQUIRED_SLOTS = {
+    "balance": ("account_id",),
+    "history": ("account_id",),
+    "transfer": ("from_account", "to_account", "amount"),
+}
+
+
+class IntentRouter:
+    """
+    Keyword-scoring intent classifier with slot extraction.
+
+    Read-only messages (see LOCAL_INTENTS) whose best intent has all required slots and
+    a confidence at or above the threshold are routed locally; transfers, negated or
+    cancelling requests and everything else go to the LLM. Transfer slots are still
+    extracted for the caller's information.
+    """
+
+    def __init__(self, threshold: float = 0.6):
+        """
+        Initialize the router.
+
+        Args:
+            threshold: Minimum confidence (0-1) to answer without the LLM
+        """
+        self.threshold = threshold
+        self._patterns = {
+            intent: [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in patterns]
+            for intent, patterns in INTENT_PATTERNS.items()
+        }
+
+    def _score(self, text: str) -> Dict[str, float]:
+        return {
+            intent: sum(weight for pattern, weight in patterns if pattern.search(text))
+            for intent, patterns in self._patterns.items()
+        }
+
+    @staticmethod
+    def _extract_slots(intent: str, text: str) -> Dict[str, Any]:
+        accounts: List[str] = [acc.upper() for acc in _ACCOUNT_ID.findall(text)]
+        slots: Dict[str, Any] = {}
+
+        if intent in ("balance", "history"):
+            if accounts:
+                slots["account_id"] = accounts[0]
+            if intent == "balance":
+                as_of = _DATE.search(text)
+                if as_of:
+                    slots["as_of"] = as_of.group(1)
+            if intent == "history":
+                limit = _LIMIT.search(text)
+                if limit:
+                    slots["limit"] = int(limit.group(1))
+
+        elif intent == "transfer":
+            from_match, to_match = _FROM.search(text), _TO.search(text)
+            source = from_match.group(1).upper() if from_match else None
+            destination = to_match.group(1).upper() if to_match else None
+            # Fill a missing side from the remaining account ids, in order of appearance
+            others = [acc for acc in accounts if acc not in (source, destination)]
+            if source is None and others:
+                source = others.pop(0)
+            if destination is None and others:
+                destination = others.pop(0)
+            if source and destination:
+                slots["from_account"], slots["to_account"] = source, destination
+
+            amounts = [m for m in _AMOUNT.finditer(text)]
+            # Prefer an explicit currency amount over any other bare number
+            amounts.sort(key=lambda m: m.group(2) is None)
+            # A signed amount ("-50") is never read as its magnitude; the slot stays empty
+            if amounts and not (amounts[0].group(1) or amounts[0].group(3)):
+                match = amounts[0]
+                slots["amount"] = float(match.group(4).replace(",", "") + (match.group(5) or ""))
+
+        return slots
+
+    def classify(self, message: str) -> Dict[str, Any]:
+        """
+        Classify a message.
+
+        Args:
+            message: Free-text customer message
+
+        Returns:
+            {"intent", "confidence", "slots", "route"} where route is "local" or "llm"
+        """
+        scores = self._score(message)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        intent, best = ranked[0]
+        second = ranked[1][1]
+
+        if best <= 0:
+            return {"intent": None, "confidence": 0.0, "slots": {}, "route": "llm"}
+
+        slots = self._extract_slots(intent, message)
+        complete = all(slot in slots for slot in REQUIRED_SLOTS[intent])
+
+        confidence = min(1.0, best / 2.0) * (best / (best + second))
+        if not complete:
+            confidence *= 0.25
+        if intent == "transfer" and _ADVISORY.search(message):
+            confidence *= 0.5
+        if intent == "balance" and "as_of" not in slots and _PAST.search(message):
+            confidence *= 0.5
+        confidence = round(confidence, 3)
+
+        local = intent in LOCAL_INTENTS and not _NEGATION.search(message)
+        route = "local" if local and complete and confidence >= self.threshold else "llm"
+        return {"intent": intent, "confidence": confidence, "slots": slots, "route": route}
@@ -0,0 +1,280 @@
+"""
+Write-ahead journal
+Checksummed, append-only log of balance changes, with configurable fsync and crash recovery
+"""
+
+import os
+import json
+import zlib
+import struct
+import threading
+from typing import Any, Dict, Iterator, Optional, Tuple, BinaryIO
+
+try:
+    from .account_store import AccountStore
+    from .snapshot import load_snapshot, save_snapshot
+except ImportError:
+    from account_store import AccountStore
+    from snapshot import load_snapshot, save_snapshot
+
+
+# Record framing: payload length, CRC-32 of the payload, then the JSON payload
+RECORD = struct.Struct("<II")
+
+# fsync: every change is fsynced before the call returns
+# batch: a background thread fsyncs every flush_interval seconds; callers wait for it
+# async: the same background fsync, but callers do not wait (a crash can lose the last interval)
+DURABILITY_MODES = ("fsync", "batch", "async")
+
+
+def _encode(record: Dict[str, Any]) -> bytes:
+    payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _scan(f: BinaryIO) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (end offset, record) for each intact record, stopping at the first torn or corrupt one."""
+    offset = 0
+    while True:
+        header = f.read(RECORD.size)
+        if len(header) < RECORD.size:
+            return
+        length, checksum = RECORD.unpack(header)
+        payload = f.read(length)
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            return
+        try:
+            record = json.loads(payload)
+        except ValueError:
+            return
+        offset += RECORD.size + length
+        yield offset, record
+
+
+def read_journal(path: str) -> Iterator[Dict[str, Any]]:
+    """Iterate over the intact records of a journal file (nothing if it does not exist)."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        for _, record in _scan(f):
+            yield record
+
+
+class Journal:
+    """
+    Append-only journal of balance-mutating operations.
+
+    The store appends a record while it holds the affected accounts' locks, after
+    validating the operation and before changing any balance, so replaying the
+    journal in order reproduces the same state. Opening an existing file drops a
+    torn or corrupt tail left by a crash.
+    """
+
+    def __init__(self, path: str, durability: str = "batch", flush_interval: float = 0.002, start_seq: int = 0):
+        """
+        Open (or create) a journal file.
+
+        Args:
+            path: Journal file
+            durability: "fsync", "batch" or "async" (see DURABILITY_MODES)
+            flush_interval: Seconds between background fsyncs in batch and async modes
+            start_seq: Lowest sequence number to continue from (the last snapshot's), for
+                journals that were compacted down to nothing
+        """
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.path = path
+        self.durability = durability
+        self.flush_interval = flush_interval
+
+        self.seq = start_seq
+        valid_end = 0
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                for valid_end, record in _scan(f):
+                    self.seq = max(self.seq, record["seq"])
+        self._file = open(path, "ab")
+        self._file.truncate(valid_end)
+
+        self.durable_seq = self.seq
+        self.syncs = 0
+        self._pending = []
+        self._closed = False
+        self._lock = threading.Lock()              # seq and the pending buffer
+        self._io_lock = threading.Lock()           # the file itself
+        self._durable = threading.Condition(threading.Lock())
+        self._stop = threading.Event()
+        self._flusher = None
+        if durability != "fsync":
+            self._flusher = threading.Thread(target=self._flush_loop, name="journal-flusher", daemon=True)
+            self._flusher.start()
+
+    def append(self, op: str, fields: Dict[str, Any]) -> int:
+        """
+        Add a record.
+
+        Args:
+            op: Operation name ("transfer", "batch", "import", "add_account")
+            fields: JSON-serializable operation arguments
+
+        Returns:
+            The record's sequence number, for wait()
+        """
+        if self.durability != "fsync":
+            with self._lock:
+                seq, data = self._next(op, fields)
+                self._pending.append(data)
+            return seq
+        # Lock order is always _io_lock, then _lock (as in flush)
+        with self._io_lock:
+            with self._lock:
+                seq, data = self._next(op, fields)
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.syncs += 1
+            self.durable_seq = seq
+        return seq
+
+    def _next(self, op: str, fields: Dict[str, Any]) -> Tuple[int, bytes]:
+        if self._closed:
+            raise ValueError("Journal is closed")
+        self.seq += 1
+        return self.seq, _encode({"seq": self.seq, "op": op, **fields})
+
+    def wait(self, seq: int):
+        """Block until record `seq` is on disk (returns at once in fsync and async modes)."""
+        if self.durability != "batch":
+            return
+        with self._durable:
+            while self.durable_seq < seq:
+                if self._closed:
+                    raise ValueError("Journal is closed")
+                self._durable.wait()
+
+    def flush(self):
+        """Write and fsync everything appended so far."""
+        with self._io_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                target = self.seq
+            if pending:
+                self._file.write(b"".join(pending))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self.syncs += 1
+        with self._durable:
+            if target > self.durable_seq:
+                self.durable_seq = target
+            self._durable.notify_all()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            if self._pending:
+                self.flush()
+
+    def compact(self, upto_seq: int):
+        """
+        Drop records already included in a snapshot.
+
+        Args:
+            upto_seq: Sequence number saved in the snapshot (see save_snapshot)
+        """
+        self.flush()
+        tmp_path = f"{self.path}.tmp"
+        with self._io_lock:
+            with open(tmp_path, "wb") as out:
+                for record in read_journal(self.path):
+                    if record["seq"] > upto_seq:
+                        out.write(_encode(record))
+                out.flush()
+                os.fsync(out.fileno())
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "ab")
+
+    def close(self):
+        """Flush outstanding records and stop the background flusher."""
+        if self._flusher is not None:
+            self._stop.set()
+            self._flusher.join()
+        with self._lock:
+            self._closed = True
+        self.flush()
+        self._file.close()
+
+
+def apply_record(store: AccountStore, record: Dict[str, Any]):
+    """Re-apply one journaled operation, without validating or journaling it again."""
+    op = record["op"]
+    if op == "transfer":
+        store._apply_transfer(store.get_account(record["src"]), store.get_account(record["dst"]),
+                              record["cents"], record["date"])
+    elif op == "batch":
+        ids = {acc_id for source, destination, _ in record["transfers"] for acc_id in (source, destination)}
+        store._apply_batch({acc_id: store.get_account(acc_id) for acc_id in ids}, record["transfers"], record["date"])
+    elif op == "import":
+        ids = {row[0] for row in record["rows"]}
+        store._apply_import({acc_id: store.get_account(acc_id) for acc_id in ids}, record["rows"],
+                            record["update_balances"])
+    elif op == "add_account":
+        with store._create_lock:
+            store._create_account(record["account_id"], record["holder"], record["type"],
+                                  record["cents"], record["transactions"])
+    else:
+        raise ValueError(f"Unknown journal operation: {op}")
+
+
+def recover(
+    journal_path: str,
+    snapshot_path: Optional[str] = None,
+    durability: str = "batch",
+    flush_interval: float = 0.002,
+    lock_stripes: int = 256,
+) -> AccountStore:
+    """
+    Rebuild a store from the last snapshot plus the journal, and keep journaling to it.
+
+    Records already included in the snapshot are skipped; a torn record at the end of
+    the journal (a change that was never acknowledged) is discarded.
+
+    Args:
+        journal_path: Journal file (created if missing)
+        snapshot_path: Snapshot written by checkpoint(), if any
+        durability: Durability mode for new records
+        flush_interval: Background fsync interval in batch and async modes
+        lock_stripes: Number of account lock stripes
+
+    Returns:
+        The recovered store, with the journal attached
+    """
+    if snapshot_path and os.path.exists(snapshot_path):
+        store = load_snapshot(snapshot_path, lock_stripes=lock_stripes)
+        start_seq = store._snapshot.journal_seq
+    else:
+        store = AccountStore(lock_stripes=lock_stripes)
+        start_seq = 0
+
+    # Opening the journal first truncates any torn tail before it is replayed
+    journal = Journal(journal_path, durability, flush_interval, start_seq=start_seq)
+    for record in read_journal(journal_path):
+        if record["seq"] > start_seq:
+            apply_record(store, record)
+    store.journal = journal
+    return store
+
+
+def checkpoint(store: AccountStore, snapshot_path: str) -> int:
+    """
+    Save a snapshot and drop the journal records it includes.
+
+    Args:
+        store: Store with a journal attached
+        snapshot_path: Snapshot file to write
+
+    Returns:
+        Sequence number of the last record included in the snapshot
+    """
+    seq = save_snapshot(store, snapshot_path)
+    store.journal.compact(seq)
+    return seq
@@ -0,0 +1,151 @@
+"""
+Incremental request buffer
+Per-conversation cache of token estimates, JSON encodings and SDK objects for chat messages
+"""
+
+import sys
+import json
+from array import array
+from typing import Optional, Dict, Any, List, Callable
+
+try:
+    from .context_window import message_tokens
+except ImportError:
+    from context_window import message_tokens
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """JSON-encode one message exactly as it appears in a request body."""
+    return json.dumps(message).encode("utf-8")
+
+
+class MessageBuffer:
+    """
+    Request state kept between the turns of one conversation.
+
+    Mirrors an append-only conversation history. Each message is token-counted and
+    JSON-encoded once, when it first appears, and its SDK object is created once,
+    when first needed; later turns reuse them. Encodings are appended to one byte
+    buffer, so a window that is a contiguous tail of the history becomes a single
+    slice of it. Clearing or replacing the history list is detected and the mirror
+    rebuilt; editing a message that is already in it is not.
+    """
+
+    def __init__(self):
+        self._history: Optional[List[Dict[str, Any]]] = None
+        self._messages: List[Dict[str, Any]] = []
+        self._sdk: List[Any] = []
+        self._index: Dict[int, int] = {}
+        # "enc0,enc1,..." with the start offset of each encoding
+        self._encoded = bytearray()
+        self._offsets = array("q")
+        self.history_tokens = 0
+        self.rebuilds = 0
+
+        self._system: Optional[Dict[str, Any]] = None
+        self._system_encoded = b""
+        self._system_sdk = None
+
+    def sync(self, history: List[Dict[str, Any]]):
+        """Bring the mirror up to date with `history`; only new messages are processed."""
+        count = len(self._messages)
+        if history is not self._history or len(history) < count or \
+                (count and history[count - 1] is not self._messages[-1]):
+            if count:
+                self.rebuilds += 1
+            self._history = history
+            self._messages, self._sdk, self._index = [], [], {}
+            self._encoded, self._offsets = bytearray(), array("q")
+            self.history_tokens = 0
+            count = 0
+        for i in range(count, len(history)):
+            message = history[i]
+            self._index[id(message)] = len(self._messages)
+            self._messages.append(message)
+            self._sdk.append(None)
+            self.history_tokens += message_tokens(message)
+            if self._encoded:
+                self._encoded += b","
+            self._offsets.append(len(self._encoded))
+            self._encoded += encode_message(message)
+
+    def system_message(self, prompt: str) -> Dict[str, Any]:
+        """The system message for `prompt`, reused for as long as the prompt is unchanged."""
+        if self._system is None or self._system["content"] != prompt:
+            self._system = {"role": "system", "content": prompt}
+            self._system_encoded = encode_message(self._system)
+            self._system_sdk = None
+        return self._system
+
+    def _position(self, message: Dict[str, Any]) -> Optional[int]:
+        position = self._index.get(id(message))
+        if position is not None and self._messages[position] is message:
+            return position
+        return None
+
+    def _encoding(self, message: Dict[str, Any], view: memoryview):
+        if message is self._system:
+            return self._system_encoded
+        position = self._position(message)
+        if position is None:
+            return encode_message(message)
+        end = self._offsets[position + 1] - 1 if position + 1 < len(self._offsets) else len(view)
+        return view[self._offsets[position]:end]
+
+    def encode(self, messages: List[Dict[str, Any]]) -> bytes:
+        """
+        The JSON array for a request's messages, from cached encodings.
+
+        Args:
+            messages: Messages to send (typically the system message plus a window of the history)
+
+        Returns:
+            UTF-8 JSON bytes
+        """
+        if not messages:
+            return b"[]"
+        head, tail = ([messages[0]], messages[1:]) if messages[0] is self._system else ([], messages)
+        start = self._position(tail[0]) if tail else None
+        with memoryview(self._encoded) as view:
+            if start is not None and len(tail) == len(self._messages) - start and tail[-1] is self._messages[-1]:
+                # Contiguous tail of the history: one slice of the buffer
+                parts = [self._encoding(message, view) for message in head]
+                parts.append(view[self._offsets[start]:])
+            else:
+                parts = [self._encoding(message, view) for message in messages]
+            body = b"[" + b",".join(parts) + b"]"
+            parts.clear()
+        return body
+
+    def sdk_messages(self, messages: List[Dict[str, Any]], factory: Callable[[Dict[str, Any]], Any]) -> list:
+        """
+        SDK message objects for `messages`, creating each one only once.
+
+        Args:
+            messages: Messages to send
+            factory: Builds the SDK object for one message dict
+
+        Returns:
+            SDK objects in the same order
+        """
+        objects = []
+        for message in messages:
+            if message is self._system:
+                if self._system_sdk is None:
+                    self._system_sdk = factory(message)
+                objects.append(self._system_sdk)
+                continue
+            position = self._position(message)
+            if position is None:
+                objects.append(factory(message))
+                continue
+            sdk = self._sdk[position]
+            if sdk is None:
+                sdk = self._sdk[position] = factory(message)
+            objects.append(sdk)
+        return objects
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the buffer (not counting the history itself)."""
+        return (sys.getsizeof(self._encoded) + sys.getsizeof(self._offsets) + sys.getsizeof(self._index)
+                + sys.getsizeof(self._messages) + sys.getsizeof(self._sdk) + len(self._system_encoded))
@@ -0,0 +1,224 @@
+"""
+In-process metrics for the Banking Bot
+Stage timing spans, counters and latency histograms with Prometheus-text and JSON export
+"""
+
+import json
+import time
+import threading
+from bisect import bisect_left
+from typing import Dict, Any, List, Tuple, Iterable
+
+# Upper bounds in seconds; one more bucket collects everything slower
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Histogram that every span records into, labelled by stage
+STAGE_SECONDS = "stage_seconds"
+
+# (name, kind, labels, value) for values read from elsewhere at export time
+ExtraSample = Tuple[str, str, Dict[str, str], float]
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Histogram:
+    """Fixed-bucket histogram (not thread-safe on its own; Metrics holds the lock)."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (the largest bound if it is beyond them)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.bounds[-1]
+
+
+class _Span:
+    """Times one stage and records it on exit; an exception also counts as an error of the stage."""
+
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics: "Metrics", stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.metrics.observe(STAGE_SECONDS, time.perf_counter() - self.start, stage=self.stage)
+        if exc_type is not None and not issubclass(exc_type, GeneratorExit):
+            self.metrics.inc("errors_total", stage=self.stage)
+        return False
+
+
+class _NullSpan:
+    """Shared do-nothing span handed out while metrics are disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _sample(name: str, labels: Iterable[Tuple[str, Any]], value: float) -> str:
+    """One line of Prometheus text: name{label="value",...} value."""
+    label_text = ",".join(f'{label}="{text}"' for label, text in labels)
+    number = repr(float(value)) if isinstance(value, float) else str(value)
+    return f"{name}{{{label_text}}} {number}" if label_text else f"{name} {number}"
+
+
+class Metrics:
+    """
+    Thread-safe counters and latency histograms.
+
+    While disabled, span() returns a shared no-op context manager and inc()/observe()
+    return at once, so instrumented code pays about one attribute check per call.
+    A Metrics object can be shared by many bots and sessions.
+    """
+
+    def __init__(self, enabled: bool = True, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initialize the registry.
+
+        Args:
+            enabled: Record anything at all (can be switched at runtime)
+            buckets: Histogram upper bounds in seconds
+        """
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._counters: Dict[LabelKey, float] = {}
+        self._histograms: Dict[LabelKey, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def span(self, stage: str):
+        """Context manager timing one stage into the stage_seconds histogram."""
+        return _Span(self, stage) if self.enabled else _NULL_SPAN
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        """Add to a counter."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, **labels: str):
+        """Record one duration in a histogram."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def reset(self):
+        """Drop everything recorded so far."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Return every counter and histogram.
+
+        Returns:
+            {"counters": [{"name", "labels", "value"}],
+             "histograms": [{"name", "labels", "count", "sum", "mean", "p50", "p95", "p99", "buckets"}]}
+            where percentiles are bucket upper bounds and buckets are cumulative counts by bound
+        """
+        with self._lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            histograms = []
+            for (name, labels), h in sorted(self._histograms.items()):
+                cumulative, buckets = 0, {}
+                for bound, count in zip(h.bounds + (float("inf"),), h.counts):
+                    cumulative += count
+                    buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+                histograms.append({
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": h.count,
+                    "sum": h.sum,
+                    "mean": h.sum / h.count if h.count else 0.0,
+                    "p50": h.quantile(0.5),
+                    "p95": h.quantile(0.95),
+                    "p99": h.quantile(0.99),
+                    "buckets": buckets,
+                })
+        return {"counters": counters, "histograms": histograms}
+
+    def to_json(self, extra: Iterable[ExtraSample] = ()) -> str:
+        """
+        Export as JSON.
+
+        Args:
+            extra: Samples read from elsewhere at export time, e.g. circuit breaker state
+        """
+        snapshot = self.snapshot()
+        snapshot["gauges"] = [{"name": name, "kind": kind, "labels": labels, "value": value}
+                              for name, kind, labels, value in extra]
+        return json.dumps(snapshot)
+
+    def to_prometheus(self, prefix: str = "bankingbot", extra: Iterable[ExtraSample] = ()) -> str:
+        """
+        Export in the Prometheus text exposition format.
+
+        Args:
+            prefix: Prepended to every metric name
+            extra: Samples read from elsewhere at export time, as (name, "gauge" or "counter", labels, value)
+        """
+        snapshot = self.snapshot()
+        lines: List[str] = []
+        typed = set()
+
+        def declare(name: str, kind: str):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for counter in snapshot["counters"]:
+            name = f"{prefix}_{counter['name']}"
+            declare(name, "counter")
+            lines.append(_sample(name, counter["labels"].items(), counter["value"]))
+        for h in snapshot["histograms"]:
+            name = f"{prefix}_{h['name']}"
+            declare(name, "histogram")
+            labels = list(h["labels"].items())
+            for bound, count in h["buckets"].items():
+                lines.append(_sample(f"{name}_bucket", labels + [("le", bound)], count))
+            lines.append(_sample(f"{name}_sum", labels, h["sum"]))
+            lines.append(_sample(f"{name}_count", labels, h["count"]))
+        for short_name, kind, labels, value in extra:
+            name = f"{prefix}_{short_name}"
+            declare(name, kind)
+            lines.append(_sample(name, labels.items(), value))
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,285 @@
+"""
+Local mock of the Mistral chat completions API
+Stand-in for /v1/chat/completions with configurable latency, streaming and failures
+
+Run standalone:
+    python src/mock_mistral_server.py --port 8089 --latency lognormal:0.3,0.4 --rate-limit-rate 0.05
+"""
+
+import re
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Callable, List
+
+
+_ACCOUNT_ID = re.compile(r"\b[A-Z]{3}\d{3,}\b")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Load tests open many connections at once; the default backlog of 5 drops them
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients that hit their own deadline hang up mid-response; that is expected here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """
+    Parse a latency distribution spec into a sampler returning seconds.
+
+    Supported specs:
+        fixed:0.2              always 0.2s
+        uniform:0.1,0.5        uniform between 0.1s and 0.5s
+        normal:0.3,0.05        normal with mean 0.3s and std dev 0.05s (clamped at 0)
+        lognormal:0.3,0.5      lognormal with median 0.3s and shape (sigma) 0.5
+
+    Args:
+        spec: Distribution name and comma-separated parameters
+
+    Returns:
+        A function that samples one latency
+    """
+    name, _, params = spec.partition(":")
+    values = [float(p) for p in params.split(",")] if params else []
+
+    if name == "fixed":
+        return lambda: values[0]
+    if name == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if name == "normal":
+        return lambda: max(0.0, random.gauss(values[0], values[1]))
+    if name == "lognormal":
+        mu = math.log(values[0])
+        return lambda: random.lognormvariate(mu, values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class MockMistralServer:
+    """
+    Threaded HTTP server mimicking Mistral's chat completions endpoint.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: str = "fixed:0",
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        token_delay: float = 0.01,
+        reply: str = "Thank you for contacting the bank. How else can I help you today?",
+        tool_calls: bool = False,
+    ):
+        """
+        Initialize the mock server (call start() to begin serving).
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Time-to-first-byte distribution, see parse_latency()
+            error_rate: Fraction of requests answered with HTTP 500
+            rate_limit_rate: Fraction of requests answered with HTTP 429
+            token_delay: Seconds between streamed chunks
+            reply: Completion text returned for every request
+            tool_calls: When a request offers tools, ask for the balance and recent history of
+                every account id in the last user message, then answer from the tool results
+        """
+        self.sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.token_delay = token_delay
+        self.reply = reply
+        self.tool_calls = tool_calls
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+
+        self._httpd = _Server((host, port), self._make_handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to pass to BankingBot(base_url=...)."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockMistralServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def serve_forever(self):
+        """Serve in the current thread."""
+        self._httpd.serve_forever()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _tool_calls_for(self, request: dict) -> Optional[List[dict]]:
+        """Tool calls to answer a tool-enabled request with, or None to answer in text."""
+        messages = request.get("messages") or [{}]
+        if not self.tool_calls or not request.get("tools") or request.get("tool_choice") == "none" \
+                or messages[-1].get("role") != "user":
+            return None
+        calls = []
+        for account_id in dict.fromkeys(_ACCOUNT_ID.findall(messages[-1].get("content") or "")):
+            for name, arguments in (("get_account_balance", {"account_id": account_id}),
+                                    ("get_transaction_history", {"account_id": account_id, "limit": 3})):
+                calls.append({"id": f"call{len(calls)}", "type": "function",
+                              "function": {"name": name, "arguments": json.dumps(arguments)}})
+        return calls or None
+
+    def _completion(self, model: str, content: str, prompt_tokens: int,
+                    tool_calls: Optional[List[dict]] = None) -> dict:
+        message = {"role": "assistant", "content": content}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        return {
+            "id": f"mock-{self.request_count}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(content.split()),
+                "total_tokens": prompt_tokens + len(content.split()),
+            },
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, body: dict, extra_headers: Optional[dict] = None):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (extra_headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/v1/chat/completions":
+                    self._send_json(404, {"message": "Not found"})
+                    return
+
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with server._count_lock:
+                    server.request_count += 1
+
+                time.sleep(server.sample_latency())
+
+                roll = random.random()
+                if roll < server.rate_limit_rate:
+                    self._send_json(429, {"message": "Requests rate limit exceeded"}, {"Retry-After": "1"})
+                    return
+                if roll < server.rate_limit_rate + server.error_rate:
+                    self._send_json(500, {"message": "Internal server error"})
+                    return
+
+                model = request.get("model", "mistral-small")
+                prompt_tokens = sum(len((m.get("content") or "").split()) for m in request.get("messages", []))
+                tool_calls = server._tool_calls_for(request)
+                if request.get("stream"):
+                    self._stream(model)
+                elif tool_calls:
+                    self._send_json(200, server._completion(model, "", prompt_tokens, tool_calls))
+                else:
+                    messages = request.get("messages") or [{}]
+                    if server.tool_calls and messages[-1].get("role") == "tool":
+                        # Answer from the tool results that were just sent back
+                        results = 0
+                        while results < len(messages) and messages[-1 - results].get("role") == "tool":
+                            results += 1
+                        content = f"{server.reply} (based on {results} tool results)"
+                    else:
+                        content = server.reply
+                    self._send_json(200, server._completion(model, content, prompt_tokens))
+
+            def _stream(self, model: str):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                words = server.reply.split(" ")
+                for i, word in enumerate(words):
+                    delta = word if i == 0 else " " + word
+                    chunk = {
+                        "id": f"mock-{server.request_count}",
+                        "object": "chat.completion.chunk",
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}],
+                    }
+                    self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+                    if server.token_delay:
+                        time.sleep(server.token_delay)
+                self._write_chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, text: str):
+                data = text.encode()
+                self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Mistral chat completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="fixed:0.2", help="e.g. fixed:0.2, uniform:0.1,0.5, lognormal:0.3,0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of HTTP 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of HTTP 429 responses")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="seconds between streamed chunks")
+    parser.add_argument("--tool-calls", action="store_true", help="request account tools when they are offered")
+    args = parser.parse_args()
+
+    server = MockMistralServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        token_delay=args.token_delay,
+        tool_calls=args.tool_calls,
+    )
+    print(f"Mock Mistral API listening on {server.base_url} (set MISTRAL_API_BASE={server.base_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Backend health tracking for the Mistral API calls
+Circuit breakers, retry with exponential backoff and jitter, and per-call deadlines
+"""
+
+import time
+import random
+import threading
+from typing import Optional, Dict, Any, Tuple
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call runs out of time before it could complete or retry."""
+
+
+class CircuitBreaker:
+    """
+    Per-backend circuit breaker.
+
+    closed     calls flow normally; consecutive failures are counted
+    open       calls are rejected until reset_timeout has passed
+    half_open  a limited number of probe calls are let through; one success closes
+               the circuit, one failure opens it again
+
+    Every allow_request() that returns True must end in record_success(),
+    record_failure() or, for a call cancelled or abandoned before a verdict,
+    release(). Probe slots still taken after reset_timeout are reclaimed anyway,
+    so a lost probe cannot hold the circuit half-open for good.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_max_calls: int = 1):
+        """
+        Initialize the breaker.
+
+        Args:
+            name: Backend name used in metrics (e.g. "sdk", "rest")
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds to stay open before probing again
+            half_open_max_calls: Concurrent probe calls allowed while half-open
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probes_expire_at = 0.0
+        self._lock = threading.Lock()
+        self.total_successes = 0
+        self.total_failures = 0
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probes_in_flight = 0
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be attempted now."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN:
+                now = time.monotonic()
+                if self._probes_in_flight and now >= self._probes_expire_at:
+                    self._probes_in_flight = 0
+                if self._probes_in_flight < self.half_open_max_calls:
+                    self._probes_in_flight += 1
+                    self._probes_expire_at = now + self.reset_timeout
+                    return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.total_successes += 1
+            self._consecutive_failures = 0
+            self._probes_in_flight = 0
+            self._state = self.CLOSED
+
+    def release(self):
+        """Give back a half-open probe slot for a call that ended without a verdict."""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes_in_flight:
+                self._probes_in_flight -= 1
+
+    def record_failure(self):
+        with self._lock:
+            self.total_failures += 1
+            self._consecutive_failures += 1
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probes_in_flight = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the breaker state and counters for metrics."""
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._consecutive_failures,
+                "total_successes": self.total_successes,
+                "total_failures": self.total_failures,
+                "short_circuited": self.short_circuited,
+            }
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter for transient HTTP failures.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+        retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504),
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            max_attempts: Total attempts including the first
+            base_delay: Backoff before the first retry, doubled on each attempt
+            max_delay: Upper bound for a single backoff
+            retry_statuses: HTTP statuses worth retrying
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = retry_statuses
+
+    def is_retryable_status(self, status: int) -> bool:
+        return status in self.retry_statuses
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds to wait before the next attempt.
+
+        Args:
+            attempt: Number of attempts made so far (1 after the first failure)
+            retry_after: Server-provided Retry-After, used as a floor when present
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class Deadline:
+    """Absolute time budget for one logical call, shared across its retries."""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds; HTTP dates are ignored."""
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
@@ -0,0 +1,142 @@
+"""
+Response cache for repeated, generic chat questions
+LRU + TTL eviction with a memory cap; never caches account-specific turns
+"""
+
+import re
+import sys
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List
+
+
+# Anything that ties a turn to a particular customer or account
+_ACCOUNT_SPECIFIC = re.compile(
+    r"\b[A-Z]{3}\d{3,}\b"                   # account ids such as ACC001
+    r"|\d{4,}"                              # account/card/reference numbers
+    r"|[$€£]\s?\d"                          # concrete amounts
+    r"|\bmy\s+(?:balance|transactions?|statement|last\s+\w+|recent\s+\w+)\b",
+    re.IGNORECASE,
+)
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.]+$")
+
+
+def normalize_prompt(text: str) -> str:
+    """Normalize a prompt so trivially different phrasings share a cache entry."""
+    text = _WHITESPACE.sub(" ", text.strip().lower())
+    return _TRAILING_PUNCTUATION.sub("", text)
+
+
+def is_cacheable(messages: List[Dict[str, Any]]) -> bool:
+    """
+    Check whether a request is generic enough to be answered from cache.
+
+    Args:
+        messages: The messages that would be sent, including prior context
+
+    Returns:
+        False if any user or assistant message mentions account-specific data
+    """
+    return not any(
+        msg["role"] != "system" and _ACCOUNT_SPECIFIC.search(msg.get("content") or "")
+        for msg in messages
+    )
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of chat responses with TTL expiry and a memory cap.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 3600, max_bytes: int = 8 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+            ttl_seconds: Seconds an entry stays valid (None means no expiry)
+            max_bytes: Approximate memory cap for keys and responses
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(messages: List[Dict[str, Any]], model: str) -> str:
+        """
+        Build the cache key for a request.
+
+        The last user message is normalized; everything before it (system prompt and
+        prior turns) is included verbatim so a cached answer is only reused in the
+        same context.
+        """
+        digest = hashlib.blake2b(model.encode(), digest_size=16)
+        for msg in messages[:-1]:
+            digest.update(b"\x00" + msg["role"].encode() + b"\x01" + (msg.get("content") or "").encode())
+        digest.update(b"\x02" + normalize_prompt(messages[-1].get("content") or "").encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            response, expires_at, size = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, key: str, response: str):
+        """Store a response, evicting least recently used entries as needed."""
+        size = sys.getsizeof(key) + sys.getsizeof(response)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (response, expires_at, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        """Drop all cached responses (statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss statistics and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,197 @@
+"""
+Multi-session manager for the Banking Bot
+Serves many customer conversations from one LLM client and one account store
+"""
+
+import sys
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Iterator
+
+try:
+    from .banking_bot import BankingBot
+    from .message_buffer import MessageBuffer
+except ImportError:
+    from banking_bot import BankingBot
+    from message_buffer import MessageBuffer
+
+
+class Session:
+    """Per-customer conversation state. Everything else is shared through the manager."""
+
+    __slots__ = ("session_id", "conversation_history", "buffer", "created_at", "last_active", "lock", "_async_lock")
+
+    def __init__(self, session_id: str):
+        now = time.monotonic()
+        self.session_id = session_id
+        self.conversation_history = []
+        # Request encodings of the history, reused on the session's next turn
+        self.buffer = MessageBuffer()
+        self.created_at = now
+        self.last_active = now
+        # Serializes turns within one session; different sessions run in parallel
+        self.lock = threading.Lock()
+        self._async_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def async_lock(self) -> asyncio.Lock:
+        """Serializes async turns within the session (created on first use, inside the event loop)."""
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        return self._async_lock
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by this session's own state."""
+        size = sys.getsizeof(self) + sys.getsizeof(self.session_id) + sys.getsizeof(self.conversation_history)
+        for message in self.conversation_history:
+            size += sys.getsizeof(message) + sum(sys.getsizeof(v) for v in message.values())
+        return size + self.buffer.nbytes()
+
+
+class SessionManager:
+    """
+    Holds many lightweight sessions on top of a single BankingBot engine.
+
+    The engine owns the Mistral client, HTTP pool, account store, context window and
+    response cache. Each turn runs on a throwaway shallow copy of the engine bound to
+    the session's history, so nothing per-session lives on the engine itself.
+
+    With an AsyncBankingBot engine, the achat/aprocess_banking_command methods serve
+    sessions from one event loop. Use either the sync or the async methods for a
+    given manager: the two kinds of turn lock do not exclude each other.
+    """
+
+    def __init__(
+        self,
+        bot: Optional[BankingBot] = None,
+        max_sessions: int = 100_000,
+        idle_ttl_seconds: Optional[float] = 1800,
+        **bot_kwargs: Any,
+    ):
+        """
+        Initialize the session manager.
+
+        Args:
+            bot: Engine bot shared by all sessions (built from bot_kwargs if omitted)
+            max_sessions: Least recently active sessions are evicted beyond this count
+            idle_ttl_seconds: Sessions idle longer than this are evicted (None disables)
+            **bot_kwargs: Arguments for BankingBot when no engine is given
+        """
+        self.bot = bot or BankingBot(**bot_kwargs)
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        # Ordered by last activity, least recent first
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted_sessions = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def get_session(self, session_id: str) -> Session:
+        """Return the session for session_id, creating it if needed, and mark it active."""
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = Session(session_id)
+                self._sessions[session_id] = session
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_active = now
+            self._evict(now)
+        return session
+
+    def end_session(self, session_id: str) -> bool:
+        """Drop a session. Returns True if it existed."""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def evict_idle(self) -> int:
+        """Evict sessions past the idle TTL. Returns the number evicted."""
+        with self._lock:
+            return self._evict(time.monotonic())
+
+    def _evict(self, now: float) -> int:
+        evicted = 0
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            over_capacity = len(self._sessions) > self.max_sessions
+            idle = self.idle_ttl_seconds is not None and now - oldest.last_active > self.idle_ttl_seconds
+            if not (over_capacity or idle):
+                break
+            del self._sessions[oldest.session_id]
+            evicted += 1
+        self.evicted_sessions += evicted
+        return evicted
+
+    def bot_for(self, session: Session) -> BankingBot:
+        """Return a view of the engine bot bound to one session's conversation history."""
+        return self.bot._with_history(session.conversation_history, session.buffer)
+
+    def chat(self, session_id: str, user_message: str) -> str:
+        """Send a chat message within a session."""
+        session = self.get_session(session_id)
+        with session.lock:
+            return self.bot_for(session).chat(user_message)
+
+    def chat_stream(self, session_id: str, user_message: str) -> Iterator[str]:
+        """Stream a chat response within a session."""
+        session = self.get_session(session_id)
+        with session.lock:
+            yield from self.bot_for(session).chat_stream(user_message)
+
+    def process_banking_command(self, session_id: str, command: str) -> str:
+        """Process a banking command or chat message within a session."""
+        session = self.get_session(session_id)
+        with session.lock:
+            return self.bot_for(session).process_banking_command(command)
+
+    async def achat(self, session_id: str, user_message: str) -> str:
+        """Send a chat message within a session (requires an AsyncBankingBot engine)."""
+        session = self.get_session(session_id)
+        async with session.async_lock:
+            return await self.bot_for(session).achat(user_message)
+
+    async def aprocess_banking_command(self, session_id: str, command: str) -> str:
+        """Process a banking command or chat message within a session (requires an AsyncBankingBot engine)."""
+        session = self.get_session(session_id)
+        async with session.async_lock:
+            return await self.bot_for(session).aprocess_banking_command(command)
+
+    def reset_conversation(self, session_id: str):
+        """Clear one session's conversation history."""
+        session = self.get_session(session_id)
+        with session.lock:
+            session.conversation_history.clear()
+
+    def memory_usage(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Report memory used by session state.
+
+        Args:
+            session_id: Report a single session instead of all sessions
+
+        Returns:
+            Byte counts; shared engine state is not included
+        """
+        with self._lock:
+            if session_id is not None:
+                session = self._sessions.get(session_id)
+                if session is None:
+                    return {"error": f"Session {session_id} not found"}
+                return {"session_id": session_id, "bytes": session.memory_bytes()}
+            sessions = list(self._sessions.values())
+
+        total = sum(s.memory_bytes() for s in sessions)
+        return {
+            "sessions": len(sessions),
+            "total_bytes": total,
+            "avg_bytes_per_session": total / len(sessions) if sessions else 0,
+            "evicted_sessions": self.evicted_sessions,
+        }
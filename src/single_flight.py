@@ -0,0 +1,165 @@
+"""
+Single-flight request coalescing
+Concurrent identical LLM requests share one upstream call; the result is fanned out to every caller
+"""
+
+import asyncio
+import threading
+from typing import Optional, Dict, Any, Callable, Awaitable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """One upstream call in progress and the callers waiting for it."""
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that have the same key.
+
+    The first caller for a key (the leader) makes the upstream call; callers that
+    arrive while it is in flight wait for it and receive the same result, or the
+    same exception. Nothing is kept once the call completes, so this is not a
+    cache: a request arriving after the result is returned makes a new call.
+
+    Threads use do(); coroutines use ado(). The two do not share calls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Any, _Flight] = {}
+        # (event loop id, key) -> upstream task
+        self._tasks: Dict[Tuple[int, Any], "asyncio.Task"] = {}
+        self._task_waiters: Dict[Tuple[int, Any], int] = {}
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.abandoned = 0
+
+    def do(self, key: Any, fn: Callable[[], T], timeout: Optional[float] = None) -> T:
+        """
+        Call fn, or join the identical call already in flight.
+
+        Args:
+            key: Identity of the request; equal keys share a call
+            fn: The upstream call
+            timeout: Seconds a joining caller waits for the leader (None waits indefinitely);
+                giving up does not affect the leader or the other callers
+
+        Returns:
+            fn's result
+
+        Raises:
+            TimeoutError: If a joining caller's timeout expires first
+            Exception: Whatever fn raised, in the leader and in every caller that joined it
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self.upstream_calls += 1
+                leader = True
+            else:
+                flight.waiters += 1
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            if not flight.done.wait(timeout):
+                with self._lock:
+                    self.abandoned += 1
+                raise TimeoutError(f"Timed out after {timeout:g}s waiting for an identical request in flight")
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    async def ado(self, key: Any, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await fn(), or join the identical call already in flight on this event loop.
+
+        The upstream call runs as its own task, so cancelling one caller (a client
+        disconnect or a request timeout) cancels only that caller's wait. The
+        upstream call is cancelled only when every caller waiting for it has been
+        cancelled.
+
+        Args:
+            key: Identity of the request; equal keys share a call
+            fn: Returns the upstream coroutine
+
+        Returns:
+            The coroutine's result
+
+        Raises:
+            Exception: Whatever the upstream call raised, in every caller
+        """
+        flight_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(flight_key)
+            if task is None:
+                task = self._tasks[flight_key] = asyncio.ensure_future(fn())
+                self._task_waiters[flight_key] = 0
+                self.upstream_calls += 1
+                task.add_done_callback(lambda done: self._task_done(flight_key, done))
+            else:
+                self.coalesced += 1
+            self._task_waiters[flight_key] += 1
+
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done():
+                with self._lock:
+                    self.abandoned += 1
+                    self._task_waiters[flight_key] -= 1
+                    last = self._task_waiters[flight_key] == 0 and self._tasks.get(flight_key) is task
+                    if last:
+                        # Nobody is waiting any more; a new caller starts a fresh call
+                        del self._tasks[flight_key]
+                        del self._task_waiters[flight_key]
+                if last:
+                    task.cancel()
+            raise
+
+    def _task_done(self, flight_key: Tuple[int, Any], task: "asyncio.Task"):
+        with self._lock:
+            if self._tasks.get(flight_key) is task:
+                del self._tasks[flight_key]
+                del self._task_waiters[flight_key]
+            if not task.cancelled() and task.exception() is not None:
+                self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return upstream and coalesced call counts (coalesced = upstream calls saved)."""
+        with self._lock:
+            requests = self.upstream_calls + self.coalesced
+            return {
+                "requests": requests,
+                "upstream_calls": self.upstream_calls,
+                "coalesced": self.coalesced,
+                "saved_ratio": self.coalesced / requests if requests else 0.0,
+                "errors": self.errors,
+                "abandoned": self.abandoned,
+                "in_flight": len(self._flights) + len(self._tasks),
+            }
@@ -0,0 +1,386 @@
+"""
+Binary account snapshots
+Versioned, memory-mapped file format for balances and the transaction log, for fast startup
+"""
+
+import os
+import sys
+import mmap
+import struct
+from array import array
+from typing import Optional, List, Iterable, Tuple
+
+try:
+    from .account_store import Account, AccountStore, Ledger, _InternTable
+except ImportError:
+    from account_store import Account, AccountStore, Ledger, _InternTable
+
+
+MAGIC = b"BBSNAP\x00\x01"
+VERSION = 2
+
+# Fixed header: magic, version, byte order (0 little, 1 big), section count, accounts, ledger rows
+HEADER = struct.Struct("<8sIIIQQ")
+SECTION = struct.Struct("<QQ")  # byte offset, byte length
+
+# Section order is part of the format; append new sections at the end and bump VERSION
+SECTIONS = (
+    ("balances", "q"),          # per account: balance in cents
+    ("id_offsets", "q"),        # per account + 1: offsets into id_blob
+    ("id_blob", "B"),
+    ("holder_offsets", "q"),
+    ("holder_blob", "B"),
+    ("acctype_offsets", "q"),
+    ("acctype_blob", "B"),
+    ("sorted_ids", "q"),        # account indexes ordered by id, for binary search
+    ("index_start", "q"),       # per account + 1: offsets into index_rows / index_dates
+    ("index_rows", "q"),        # each account's ledger rows, sorted by (date, row)
+    ("index_dates", "i"),
+    ("ledger_account", "i"),
+    ("ledger_date", "i"),
+    ("ledger_type", "b"),
+    ("ledger_amount", "q"),
+    ("ledger_description", "i"),
+    ("type_offsets", "q"),
+    ("type_blob", "B"),
+    ("description_offsets", "q"),
+    ("description_blob", "B"),
+    ("meta", "q"),              # v2: [last journal sequence number included]
+)
+
+# Sections present in each readable version
+_SECTION_COUNTS = {1: len(SECTIONS) - 1, 2: len(SECTIONS)}
+
+_BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+
+
+class MappedColumn:
+    """
+    Ledger column whose saved rows are read in place from the snapshot.
+
+    Rows appended after loading go to an in-memory array behind the mapped ones.
+    """
+
+    __slots__ = ("base", "tail", "base_len", "itemsize")
+
+    def __init__(self, base: memoryview, typecode: str):
+        self.base = base
+        self.base_len = len(base)
+        self.tail = array(typecode)
+        self.itemsize = self.tail.itemsize
+
+    def __len__(self) -> int:
+        return self.base_len + len(self.tail)
+
+    def __getitem__(self, row: int):
+        if row < 0:
+            row += len(self)
+        return self.base[row] if row < self.base_len else self.tail[row - self.base_len]
+
+    def append(self, value):
+        self.tail.append(value)
+
+    def extend(self, values: Iterable):
+        self.tail.extend(values)
+
+    def segments(self) -> Tuple[memoryview, array]:
+        return self.base, self.tail
+
+    def tobytes(self) -> bytes:
+        return self.base.tobytes() + self.tail.tobytes()
+
+
+class MappedStrings:
+    """Read-only string table in the snapshot, decoded on access."""
+
+    __slots__ = ("offsets", "blob")
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return max(len(self.offsets) - 1, 0)
+
+    def raw(self, index: int) -> bytes:
+        return self.blob[self.offsets[index]:self.offsets[index + 1]].tobytes()
+
+    def __getitem__(self, index: int) -> str:
+        return self.raw(index).decode("utf-8")
+
+
+class _ChainedStrings:
+    """Snapshot strings followed by strings added after loading."""
+
+    __slots__ = ("base", "extra", "base_len")
+
+    def __init__(self, base: MappedStrings, extra: List[str]):
+        self.base = base
+        self.extra = extra
+        self.base_len = len(base)
+
+    def __len__(self) -> int:
+        return self.base_len + len(self.extra)
+
+    def __getitem__(self, index: int) -> str:
+        return self.base[index] if index < self.base_len else self.extra[index - self.base_len]
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class MappedInternTable:
+    """
+    Intern table over a snapshot string table.
+
+    New strings are interned in memory; they are not matched against the mapped
+    strings (that would need every saved string decoded), so a string may end up
+    with two codes. Both decode to the same text.
+    """
+
+    __slots__ = ("codes", "values", "_extra")
+
+    def __init__(self, base: MappedStrings):
+        self.codes = {}
+        self._extra: List[str] = []
+        self.values = _ChainedStrings(base, self._extra)
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self._extra.append(value)
+        return code
+
+
+def _string_table(values: Iterable[str]) -> Tuple[array, bytes]:
+    offsets, blob = array("q", [0]), bytearray()
+    for value in values:
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+def save_snapshot(store: AccountStore, path: str) -> int:
+    """
+    Write a store to a binary snapshot file.
+
+    The file is written next to `path` and renamed into place, so readers never see
+    a partial snapshot. Writes are paused for the duration of the save.
+
+    Args:
+        store: Store to save (may itself be snapshot-backed)
+        path: Destination file
+
+    Returns:
+        Sequence number of the last journal record the snapshot includes
+    """
+    ledger = store.ledger
+    with store._create_lock, store.locks.hold_all(), ledger._lock:
+        snapshot = store._snapshot
+        # Journal records are appended under the same locks, so everything up to here is applied
+        if store.journal is not None:
+            journal_seq = store.journal.seq
+        else:
+            journal_seq = snapshot.journal_seq if snapshot is not None else 0
+        ids, holders, types, balances = [], [], [], array("q")
+        index_start, index_rows, index_dates = array("q", [0]), array("q"), array("i")
+        for i, account in enumerate(store._by_index):
+            if account is None:
+                # Untouched since loading: copy the record straight from the old snapshot
+                ids.append(snapshot.account_id(i))
+                holders.append(snapshot.holders[i])
+                types.append(snapshot.acctypes[i])
+                balances.append(snapshot.balance_cents(i))
+                rows, dates = snapshot.account_rows(i)
+                index_rows.frombytes(rows.cast("B"))
+                index_dates.frombytes(dates.cast("B"))
+            else:
+                ids.append(account.account_id)
+                holders.append(account.account_holder)
+                types.append(account.account_type)
+                balances.append(account.balance_cents)
+                index_rows.extend(account.rows)
+                index_dates.extend(account.dates)
+            index_start.append(len(index_rows))
+
+        id_offsets, id_blob = _string_table(ids)
+        encoded = [acc_id.encode("utf-8") for acc_id in ids]
+        sections = {
+            "balances": balances,
+            "id_offsets": id_offsets,
+            "id_blob": id_blob,
+            "sorted_ids": array("q", sorted(range(len(ids)), key=encoded.__getitem__)),
+            "index_start": index_start,
+            "index_rows": index_rows,
+            "index_dates": index_dates,
+            "ledger_account": ledger.account,
+            "ledger_date": ledger.date,
+            "ledger_type": ledger.type,
+            "ledger_amount": ledger.amount,
+            "ledger_description": ledger.description,
+            "meta": array("q", [journal_seq]),
+        }
+        for name, values in (("holder", holders), ("acctype", types), ("type", ledger.types.values),
+                             ("description", ledger.descriptions.values)):
+            sections[f"{name}_offsets"], sections[f"{name}_blob"] = _string_table(values)
+        payloads = [sections[name] if isinstance(sections[name], bytes) else sections[name].tobytes()
+                    for name, _ in SECTIONS]
+        account_count, row_count = len(ids), len(ledger)
+
+    table_size = HEADER.size + SECTION.size * len(SECTIONS)
+    offset, entries = table_size, []
+    for payload in payloads:
+        offset += -offset % 8  # keep every section 8-byte aligned
+        entries.append((offset, len(payload)))
+        offset += len(payload)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, _BYTE_ORDER, len(SECTIONS), account_count, row_count))
+        for entry in entries:
+            f.write(SECTION.pack(*entry))
+        for (start, _), payload in zip(entries, payloads):
+            f.write(b"\x00" * (start - f.tell()))
+            f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return journal_seq
+
+
+class SnapshotReader:
+    """
+    Memory-mapped view of a snapshot file.
+
+    Every section is exposed as a typed memoryview over the mapping, so nothing is
+    parsed at open time; account records are only built when load_account is called.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Not a Banking Bot snapshot: {path}")
+        try:
+            self._parse_header()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse_header(self):
+        if len(self._mmap) < HEADER.size:
+            raise ValueError(f"Not a Banking Bot snapshot: {self.path}")
+        magic, version, byte_order, count, self.account_count, self.row_count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a Banking Bot snapshot: {self.path}")
+        if _SECTION_COUNTS.get(version) != count:
+            raise ValueError(f"Unsupported snapshot version {version} in {self.path}")
+        if byte_order != _BYTE_ORDER:
+            raise ValueError(f"Snapshot {self.path} was written on a machine with a different byte order")
+
+        view = memoryview(self._mmap)
+        self._views = []
+        sections = {}
+        for i, (name, typecode) in enumerate(SECTIONS[:count]):
+            start, length = SECTION.unpack_from(self._mmap, HEADER.size + i * SECTION.size)
+            if start + length > len(self._mmap):
+                raise ValueError(f"Truncated snapshot: {self.path}")
+            section = view[start:start + length].cast(typecode)
+            self._views.append(section)
+            sections[name] = section
+        self._views.append(view)
+
+        self.balances = sections["balances"]
+        self.ids = MappedStrings(sections["id_offsets"], sections["id_blob"])
+        self.holders = MappedStrings(sections["holder_offsets"], sections["holder_blob"])
+        self.acctypes = MappedStrings(sections["acctype_offsets"], sections["acctype_blob"])
+        self.sorted_ids = sections["sorted_ids"]
+        self.index_start = sections["index_start"]
+        self.index_rows = sections["index_rows"]
+        self.index_dates = sections["index_dates"]
+        self.types = MappedStrings(sections["type_offsets"], sections["type_blob"])
+        self.descriptions = MappedStrings(sections["description_offsets"], sections["description_blob"])
+        self.columns = {name: sections[f"ledger_{name}"] for name in ("account", "date", "type", "amount", "description")}
+        self.journal_seq = sections["meta"][0] if "meta" in sections else 0
+
+    def find(self, account_id: str) -> Optional[int]:
+        """Index of an account, by binary search over the sorted id table."""
+        key = account_id.encode("utf-8")
+        lo, hi = 0, self.account_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ids.raw(self.sorted_ids[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.account_count and self.ids.raw(self.sorted_ids[lo]) == key:
+            return self.sorted_ids[lo]
+        return None
+
+    def account_id(self, index: int) -> str:
+        return self.ids[index]
+
+    def balance_cents(self, index: int) -> int:
+        return self.balances[index]
+
+    def account_rows(self, index: int) -> Tuple[memoryview, memoryview]:
+        """Zero-copy views of one account's row numbers and dates."""
+        start, end = self.index_start[index], self.index_start[index + 1]
+        return self.index_rows[start:end], self.index_dates[start:end]
+
+    def load_account(self, index: int) -> Account:
+        """Build the in-memory record for one account."""
+        account = Account(self.ids[index], index, self.holders[index], self.acctypes[index], self.balances[index])
+        rows, dates = self.account_rows(index)
+        account.rows.frombytes(rows.cast("B"))
+        account.dates.frombytes(dates.cast("B"))
+        # Running-balance checkpoints are not stored; they are rebuilt on first use
+        account.net_cents = None
+        return account
+
+    def ledger(self) -> Ledger:
+        """A Ledger whose existing rows are read from the mapping."""
+        ledger = Ledger()
+        for name, column in self.columns.items():
+            setattr(ledger, name, MappedColumn(column, column.format))
+        types = _InternTable()
+        for i in range(len(self.types)):
+            types.code(self.types[i])
+        ledger.types = types
+        ledger.descriptions = MappedInternTable(self.descriptions)
+        return ledger
+
+    def close(self):
+        """Unmap the file. Stores loaded from it must not be used afterwards."""
+        for section in getattr(self, "_views", ()):
+            section.release()
+        self._mmap.close()
+        self._file.close()
+
+
+def load_snapshot(path: str, lock_stripes: int = 256) -> AccountStore:
+    """
+    Open a snapshot as an AccountStore without reading it into memory.
+
+    The ledger columns stay in the mapped file; account records are created the
+    first time each account is used. New transactions are kept in memory until the
+    next save_snapshot.
+
+    Args:
+        path: Snapshot file written by save_snapshot
+        lock_stripes: Number of account lock stripes
+
+    Returns:
+        The snapshot-backed store
+    """
+    reader = SnapshotReader(path)
+    store = AccountStore(lock_stripes=lock_stripes)
+    store.ledger = reader.ledger()
+    store._snapshot = reader
+    store._by_index = [None] * reader.account_count
+    return store
@@ -0,0 +1,499 @@
+"""
+Durable SQLite account store
+WAL-mode persistence with group-committed transfers and lazy, indexed reads
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Optional, Dict, Any, Iterator, Iterable, List, Tuple, Union
+
+try:
+    from .account_store import (
+        INFLOW_TYPES, to_cents, from_cents, make_cursor, parse_cursor, normalize_types,
+        normalize_transfers, transfer_cents, plan_transfer_batch, batch_result,
+    )
+except ImportError:
+    from account_store import (
+        INFLOW_TYPES, to_cents, from_cents, make_cursor, parse_cursor, normalize_types,
+        normalize_transfers, transfer_cents, plan_transfer_batch, batch_result,
+    )
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    account_id     TEXT PRIMARY KEY,
+    account_holder TEXT NOT NULL,
+    account_type   TEXT NOT NULL,
+    balance_cents  INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id           INTEGER PRIMARY KEY,
+    account_id   TEXT NOT NULL,
+    date         TEXT NOT NULL,
+    type         TEXT NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    description  TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_account_date ON transactions (account_id, date);
+"""
+
+# Fixed SQL text so sqlite3's statement cache reuses the prepared statements
+SQL_GET_ACCOUNT = "SELECT account_holder, account_type, balance_cents FROM accounts WHERE account_id = ?"
+SQL_GET_BALANCE = "SELECT balance_cents FROM accounts WHERE account_id = ?"
+SQL_ACCOUNT_EXISTS = "SELECT 1 FROM accounts WHERE account_id = ?"
+SQL_INSERT_ACCOUNT = "INSERT INTO accounts (account_id, account_holder, account_type, balance_cents) VALUES (?, ?, ?, ?)"
+SQL_ADJUST_BALANCE = "UPDATE accounts SET balance_cents = balance_cents + ? WHERE account_id = ?"
+SQL_INSERT_TRANSACTION = (
+    "INSERT INTO transactions (account_id, date, type, amount_cents, description) VALUES (?, ?, ?, ?, ?)"
+)
+SQL_ALL_TRANSACTIONS = (
+    "SELECT date, type, amount_cents, description FROM transactions WHERE account_id = ? ORDER BY date, id"
+)
+SQL_RECENT_TRANSACTIONS = (
+    "SELECT date, type, amount_cents, description FROM transactions "
+    "WHERE account_id = ? ORDER BY date DESC, id DESC LIMIT ?"
+)
+
+# Signed sum of an account's transactions after a date (inflows positive)
+SQL_NET_AFTER = (
+    "SELECT COALESCE(SUM(CASE WHEN type IN ({}) THEN amount_cents ELSE -amount_cents END), 0) "
+    "FROM transactions WHERE account_id = ? AND date > ?"
+).format(", ".join(f"'{txn_type}'" for txn_type in INFLOW_TYPES))
+
+
+def _row_to_transaction(row: tuple) -> Dict[str, Any]:
+    return {"date": row[0], "type": row[1], "amount": from_cents(row[2]), "description": row[3]}
+
+
+class SQLiteAccountStore:
+    """
+    Account store persisted in SQLite (WAL mode), interchangeable with AccountStore.
+
+    Reads use one connection per thread and run concurrently with writes. All writes
+    go through a single writer thread that commits queued transfers in groups, so
+    many concurrent transfers share one transaction and one fsync. Nothing is loaded
+    at startup; accounts and history are queried on demand.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 256,
+        batch_delay: float = 0.0,
+        synchronous: str = "FULL",
+    ):
+        """
+        Open (or create) a store.
+
+        Args:
+            path: Database file path
+            batch_size: Maximum writes committed together
+            batch_delay: Extra seconds to wait for more writes before committing a group
+                (0 commits whatever queued up during the previous commit)
+            synchronous: SQLite synchronous level (FULL, NORMAL or OFF)
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.synchronous = synchronous
+        self._local = threading.local()
+        self._writes: "queue.Queue" = queue.Queue()
+        self._closed = False
+        self.commits = 0
+        self.committed_writes = 0
+
+        setup = self._connect()
+        setup.executescript(SCHEMA)
+        setup.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="sqlite-group-commit", daemon=True)
+        self._writer.start()
+
+    @classmethod
+    def from_dict(cls, path: str, accounts: Dict[str, Dict[str, Any]], **options: Any) -> "SQLiteAccountStore":
+        """Open a store and seed any accounts from the legacy dict format that are not already present."""
+        store = cls(path, **options)
+        for account_id, info in accounts.items():
+            if account_id not in store:
+                store.add_account(
+                    account_id,
+                    info["account_holder"],
+                    info["account_type"],
+                    info["balance"],
+                    info.get("transactions", ()),
+                )
+        return store
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, cached_statements=128)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @property
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    @contextmanager
+    def _snapshot(self):
+        """Run several reads against one consistent database snapshot."""
+        conn = self._reader
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.execute("COMMIT")
+
+    # Writer thread: group commit
+
+    def _submit(self, operation, *args) -> Any:
+        if self._closed:
+            raise RuntimeError("Store is closed")
+        future: Future = Future()
+        self._writes.put((operation, args, future))
+        return future.result()
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            first = self._writes.get()
+            if first is None:
+                break
+            # Writes that queued up during the previous commit form the next group
+            batch = [first]
+            flush_at = time.monotonic() + self.batch_delay
+            while len(batch) < self.batch_size:
+                try:
+                    timeout = flush_at - time.monotonic()
+                    item = self._writes.get(timeout=timeout) if timeout > 0 else self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._writes.put(None)
+                    break
+                batch.append(item)
+            self._commit_group(conn, batch)
+        conn.close()
+
+    def _commit_group(self, conn: sqlite3.Connection, batch: list):
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for operation, args, future in batch:
+                # Each write runs in a savepoint so one failure does not undo the group
+                conn.execute("SAVEPOINT op")
+                try:
+                    results.append((future, operation(conn, *args), None))
+                    conn.execute("RELEASE op")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO op")
+                    conn.execute("RELEASE op")
+                    results.append((future, None, e))
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.commits += 1
+        self.committed_writes += len(batch)
+        # Results are released only after the group is durable
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def close(self):
+        """Flush pending writes and close the store."""
+        if self._closed:
+            return
+        self._closed = True
+        self._writes.put(None)
+        self._writer.join()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # Write operations (run on the writer thread)
+
+    @staticmethod
+    def _op_add_account(conn, account_id, account_holder, account_type, balance_cents, transactions):
+        conn.execute(SQL_INSERT_ACCOUNT, (account_id, account_holder, account_type, balance_cents))
+        conn.executemany(SQL_INSERT_TRANSACTION, [
+            (account_id, txn["date"], txn["type"], to_cents(txn["amount"]), txn["description"])
+            for txn in transactions
+        ])
+
+    @staticmethod
+    def _op_transfer(conn, from_account, to_account, amount_cents, today):
+        row = conn.execute(SQL_GET_BALANCE, (from_account,)).fetchone()
+        if row is None:
+            return {"success": False, "error": f"Source account {from_account} not found"}
+        if conn.execute(SQL_ACCOUNT_EXISTS, (to_account,)).fetchone() is None:
+            return {"success": False, "error": f"Destination account {to_account} not found"}
+        if row[0] < amount_cents:
+            return {"success": False, "error": "Insufficient funds"}
+
+        conn.execute(SQL_ADJUST_BALANCE, (-amount_cents, from_account))
+        conn.execute(SQL_ADJUST_BALANCE, (amount_cents, to_account))
+        conn.execute(SQL_INSERT_TRANSACTION, (from_account, today, "transfer", amount_cents, f"Transfer to {to_account}"))
+        conn.execute(SQL_INSERT_TRANSACTION, (to_account, today, "deposit", amount_cents, f"Transfer from {from_account}"))
+        return {"success": True, "new_balance_cents": row[0] - amount_cents}
+
+    @staticmethod
+    def _op_transfer_batch(conn, rows, invalid, atomic, today):
+        balances = {}
+        for acc_id in {acc_id for row in rows if row is not None for acc_id in row[:2]}:
+            row = conn.execute(SQL_GET_BALANCE, (acc_id,)).fetchone()
+            if row is not None:
+                balances[acc_id] = row[0]
+
+        accepted, failures = plan_transfer_batch(rows, balances, atomic, invalid)
+        if accepted:
+            net = dict.fromkeys(balances, 0)
+            for i in accepted:
+                source, destination, cents = rows[i]
+                net[source] -= cents
+                net[destination] += cents
+            conn.executemany(SQL_ADJUST_BALANCE, [(change, acc_id) for acc_id, change in net.items() if change])
+            conn.executemany(SQL_INSERT_TRANSACTION, [
+                (rows[i][0], today, "transfer", rows[i][2], f"Transfer to {rows[i][1]}") for i in accepted
+            ])
+            conn.executemany(SQL_INSERT_TRANSACTION, [
+                (rows[i][1], today, "deposit", rows[i][2], f"Transfer from {rows[i][0]}") for i in accepted
+            ])
+        return len(accepted), failures
+
+    @staticmethod
+    def _op_import(conn, rows, update_balances):
+        known = {acc_id for acc_id in {row[0] for row in rows}
+                 if conn.execute(SQL_ACCOUNT_EXISTS, (acc_id,)).fetchone() is not None}
+        failures = [{"index": i, "error": f"Account {row[0]} not found"}
+                    for i, row in enumerate(rows) if row[0] not in known]
+        accepted = [row for row in rows if row[0] in known] if failures else rows
+        dates = {}
+        conn.executemany(SQL_INSERT_TRANSACTION, [
+            (acc_id, dates.get(ordinal) or dates.setdefault(ordinal, date.fromordinal(ordinal).isoformat()),
+             txn_type, cents, description)
+            for acc_id, ordinal, txn_type, cents, description in accepted
+        ])
+        if update_balances:
+            net = dict.fromkeys(known, 0)
+            for acc_id, _, txn_type, cents, _ in accepted:
+                net[acc_id] += cents if txn_type in INFLOW_TYPES else -cents
+            conn.executemany(SQL_ADJUST_BALANCE, [(change, acc_id) for acc_id, change in net.items() if change])
+        return len(accepted), failures
+
+    # Public API, matching AccountStore
+
+    def add_account(
+        self,
+        account_id: str,
+        account_holder: str,
+        account_type: str,
+        balance: float,
+        transactions: Iterable[Dict[str, Any]] = (),
+    ):
+        """Create an account, optionally with existing transactions (dicts in the public format)."""
+        try:
+            self._submit(self._op_add_account, account_id, account_holder, account_type,
+                         to_cents(balance), list(transactions))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Account {account_id} already exists")
+
+    def __contains__(self, account_id: str) -> bool:
+        return self._reader.execute(SQL_ACCOUNT_EXISTS, (account_id,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (row[0] for row in self._reader.execute("SELECT account_id FROM accounts ORDER BY account_id").fetchall())
+
+    def __len__(self) -> int:
+        return self._reader.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+
+    def __getitem__(self, account_id: str) -> Dict[str, Any]:
+        info = self.get_account_info(account_id)
+        if "error" in info:
+            raise KeyError(account_id)
+        return info
+
+    def get_account_info(self, account_id: str) -> Dict[str, Any]:
+        """Get account information, including all transactions."""
+        with self._snapshot() as conn:
+            row = conn.execute(SQL_GET_ACCOUNT, (account_id,)).fetchone()
+            if row is None:
+                return {"error": f"Account {account_id} not found"}
+            transactions = conn.execute(SQL_ALL_TRANSACTIONS, (account_id,)).fetchall()
+        return {
+            "account_holder": row[0],
+            "balance": from_cents(row[2]),
+            "account_type": row[1],
+            "transactions": [_row_to_transaction(txn) for txn in transactions],
+        }
+
+    def get_account_balance(self, account_id: str) -> Optional[float]:
+        """Get the balance of an account, or None if it does not exist."""
+        row = self._reader.execute(SQL_GET_BALANCE, (account_id,)).fetchone()
+        return from_cents(row[0]) if row is not None else None
+
+    def get_balance_at(self, account_id: str, as_of: str) -> Dict[str, Any]:
+        """
+        Get an account's balance at the end of a given day.
+
+        The current balance minus the transactions after that day, summed over the
+        (account_id, date) index in the same read snapshot.
+        """
+        date.fromisoformat(as_of)
+        with self._snapshot() as conn:
+            row = conn.execute(SQL_GET_BALANCE, (account_id,)).fetchone()
+            if row is None:
+                return {"error": f"Account {account_id} not found"}
+            later_cents = conn.execute(SQL_NET_AFTER, (account_id, as_of)).fetchone()[0]
+        return {"account_id": account_id, "date": as_of, "balance": from_cents(row[0] - later_cents)}
+
+    def get_balances(self, account_ids: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """Read several balances from one consistent database snapshot."""
+        with self._snapshot() as conn:
+            if account_ids is None:
+                rows = conn.execute("SELECT account_id, balance_cents FROM accounts").fetchall()
+            else:
+                rows = []
+                for acc_id in account_ids:
+                    row = conn.execute(SQL_GET_BALANCE, (acc_id,)).fetchone()
+                    if row is not None:
+                        rows.append((acc_id, row[0]))
+        return {acc_id: from_cents(cents) for acc_id, cents in rows}
+
+    def transfer_funds(self, from_account: str, to_account: str, amount: float) -> Dict[str, Any]:
+        """Transfer funds between accounts; returns once the transfer is committed."""
+        try:
+            amount_cents = transfer_cents(amount)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        today = datetime.now().strftime("%Y-%m-%d")
+        result = self._submit(self._op_transfer, from_account, to_account, amount_cents, today)
+        if not result["success"]:
+            return result
+        return {
+            "success": True,
+            "message": f"Transferred ${from_cents(amount_cents):.2f} from {from_account} to {to_account}",
+            "new_balance": from_cents(result["new_balance_cents"]),
+        }
+
+    def transfer_batch(self, transfers: Iterable[Any], atomic: bool = True) -> Dict[str, Any]:
+        """
+        Apply many transfers in one transaction, with balances adjusted once per account.
+
+        Same arguments and result as AccountStore.transfer_batch.
+        """
+        rows, invalid = normalize_transfers(transfers)
+        today = datetime.now().strftime("%Y-%m-%d")
+        applied, failures = self._submit(self._op_transfer_batch, rows, invalid, atomic, today)
+        return batch_result(applied, failures, atomic)
+
+    def import_transactions(self, rows: List[Tuple[str, int, str, int, str]],
+                            update_balances: bool = False) -> Dict[str, Any]:
+        """
+        Bulk-insert transactions in one transaction.
+
+        Same arguments and result as AccountStore.import_transactions.
+        """
+        applied, failures = self._submit(self._op_import, rows, update_balances)
+        return batch_result(applied, failures, atomic=False)
+
+    def get_transaction_history(self, account_id: str, limit: int = 5) -> Dict[str, Any]:
+        """
+        Get the most recent transactions for an account.
+
+        Recency is by transaction date (then insertion order), served from the
+        (account_id, date) index without touching other accounts' rows.
+        """
+        with self._snapshot() as conn:
+            if conn.execute(SQL_ACCOUNT_EXISTS, (account_id,)).fetchone() is None:
+                return {"error": f"Account {account_id} not found"}
+            if limit <= 0:
+                rows = conn.execute(SQL_ALL_TRANSACTIONS, (account_id,)).fetchall()
+            else:
+                rows = conn.execute(SQL_RECENT_TRANSACTIONS, (account_id, limit)).fetchall()[::-1]
+        return {
+            "account_id": account_id,
+            "transactions": [_row_to_transaction(row) for row in rows],
+        }
+
+    def query_transactions(
+        self,
+        account_id: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        types: Union[str, Iterable[str], None] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        description: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        newest_first: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Query an account's transactions with filters and cursor pagination.
+
+        Same arguments and result as AccountStore.query_transactions; the date range
+        and cursor are range scans on the (account_id, date) index.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        clauses, params = ["account_id = ?"], [account_id]
+        if start_date:
+            clauses.append("date >= ?")
+            params.append(date.fromisoformat(start_date).isoformat())
+        if end_date:
+            clauses.append("date <= ?")
+            params.append(date.fromisoformat(end_date).isoformat())
+        wanted_types = normalize_types(types)
+        if wanted_types is not None:
+            clauses.append(f"type IN ({', '.join('?' * len(wanted_types)) or 'NULL'})")
+            params.extend(wanted_types)
+        if min_amount is not None:
+            clauses.append("amount_cents >= ?")
+            params.append(to_cents(min_amount))
+        if max_amount is not None:
+            clauses.append("amount_cents <= ?")
+            params.append(to_cents(max_amount))
+        if description:
+            clauses.append("instr(lower(description), ?) > 0")
+            params.append(description.lower())
+        if cursor:
+            clauses.append("(date, id) < (?, ?)" if newest_first else "(date, id) > (?, ?)")
+            params.extend(parse_cursor(cursor))
+        order = "DESC" if newest_first else "ASC"
+        sql = (
+            "SELECT date, type, amount_cents, description, id FROM transactions "
+            f"WHERE {' AND '.join(clauses)} ORDER BY date {order}, id {order} LIMIT ?"
+        )
+        params.append(limit + 1)
+
+        with self._snapshot() as conn:
+            if conn.execute(SQL_ACCOUNT_EXISTS, (account_id,)).fetchone() is None:
+                return {"error": f"Account {account_id} not found"}
+            rows = conn.execute(sql, params).fetchall()
+
+        page = rows[:limit]
+        next_cursor = make_cursor(page[-1][0], page[-1][4]) if len(rows) > limit else None
+        return {
+            "account_id": account_id,
+            "transactions": [_row_to_transaction(row) for row in page],
+            "next_cursor": next_cursor,
+        }
@@ -0,0 +1,308 @@
+"""
+LLM tool calling for the account APIs
+Tool schemas, a parallel tool dispatcher and round-trip statistics for the tool loop
+"""
+
+import json
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple, Iterable
+
+
+# Mistral function-calling schemas for the account APIs
+TOOL_SCHEMAS: List[Dict[str, Any]] = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_account_balance",
+            "description": "Get the current balance of a bank account.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "account_id": {"type": "string", "description": "Account id, e.g. ACC001"},
+                },
+                "required": ["account_id"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_transaction_history",
+            "description": "Get the most recent transactions of a bank account, oldest first.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "account_id": {"type": "string", "description": "Account id, e.g. ACC001"},
+                    "limit": {"type": "integer", "description": "Number of transactions (1-50, default 5)"},
+                },
+                "required": ["account_id"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_account_info",
+            "description": "Get the holder, type and balance of a bank account.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "account_id": {"type": "string", "description": "Account id, e.g. ACC001"},
+                },
+                "required": ["account_id"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "transfer_funds",
+            "description": "Transfer money between two bank accounts. Only call this when the customer "
+                           "has explicitly asked for the transfer.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "from_account": {"type": "string", "description": "Account to debit"},
+                    "to_account": {"type": "string", "description": "Account to credit"},
+                    "amount": {"type": "number", "description": "Amount in dollars"},
+                },
+                "required": ["from_account", "to_account", "amount"],
+            },
+        },
+    },
+]
+
+# Tools that only read; consecutive read-only calls run concurrently
+READ_ONLY_TOOLS = frozenset({"get_account_balance", "get_transaction_history", "get_account_info"})
+
+MAX_HISTORY_LIMIT = 50
+
+
+def parse_tool_call(call: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
+    """
+    Split one tool call from a model reply into its parts.
+
+    Args:
+        call: {"id", "function": {"name", "arguments"}}; arguments may be a JSON string or an object
+
+    Returns:
+        (call id, tool name, arguments)
+
+    Raises:
+        ValueError: If the arguments are not a JSON object
+    """
+    function = call.get("function") or {}
+    arguments = function.get("arguments") or {}
+    if isinstance(arguments, str):
+        try:
+            arguments = json.loads(arguments) if arguments.strip() else {}
+        except json.JSONDecodeError as e:
+            raise ValueError(f"arguments are not valid JSON: {e}")
+    if not isinstance(arguments, dict):
+        raise ValueError("arguments must be a JSON object")
+    return call.get("id") or "", function.get("name") or "", arguments
+
+
+class ToolLoopStats:
+    """Thread-safe counters for the tool loop: round trips per question and tool calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.questions = 0
+        self.unresolved = 0
+        self.round_trips = 0
+        self.tool_calls = 0
+        self.capped = 0
+        self.histogram: Dict[int, int] = {}
+
+    def record(self, round_trips: int, tool_calls: int, resolved: bool, capped: bool):
+        """
+        Count one question answered through the tool loop.
+
+        Args:
+            round_trips: LLM requests the question needed
+            tool_calls: Tool calls executed for it
+            resolved: False if it ended in an API error
+            capped: True if the iteration cap cut the loop short
+        """
+        with self._lock:
+            self.tool_calls += tool_calls
+            self.capped += capped
+            if not resolved:
+                self.unresolved += 1
+                return
+            self.questions += 1
+            self.round_trips += round_trips
+            self.histogram[round_trips] = self.histogram.get(round_trips, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the counters and the round-trips-per-question histogram."""
+        with self._lock:
+            return {
+                "questions": self.questions,
+                "unresolved": self.unresolved,
+                "mean_round_trips": self.round_trips / self.questions if self.questions else 0.0,
+                "round_trip_histogram": dict(sorted(self.histogram.items())),
+                "tool_calls": self.tool_calls,
+                "capped": self.capped,
+            }
+
+
+class ToolRunner:
+    """
+    Executes the tool calls a model asks for against a bot's account APIs.
+
+    Only the read-only tools are offered unless transfers are opted into. One runner can be shared by many bots and sessions. Calls from one model turn
+    run concurrently, except that a transfer waits for the calls before it and
+    the calls after it wait for the transfer, so the model's order is kept
+    wherever it matters.
+    """
+
+    def __init__(
+        self,
+        tools: Optional[Iterable[str]] = None,
+        max_iterations: int = 4,
+        max_workers: int = 8,
+        allow_transfers: bool = False,
+    ):
+        """
+        Initialize the tool runner.
+
+        Args:
+            tools: Names of the tools offered to the model (defaults to READ_ONLY_TOOLS)
+            max_iterations: Model turns that may request tools per question; the turn after
+                the last one must answer in text
+            max_workers: Threads running tool calls concurrently
+            allow_transfers: Also offer "transfer_funds". The model can then move money
+                between any accounts from free text with no confirmation step, so this
+                is off unless the caller opts in
+        """
+        names = set(tools) if tools is not None else set(READ_ONLY_TOOLS)
+        if allow_transfers:
+            names.add("transfer_funds")
+        self.schemas = [s for s in TOOL_SCHEMAS if s["function"]["name"] in names]
+        self.names = frozenset(s["function"]["name"] for s in self.schemas)
+        unknown = names - self.names
+        if unknown:
+            raise ValueError(f"Unknown tool(s): {', '.join(sorted(unknown))}")
+        # Encoded once for every REST request body
+        self.schemas_json = json.dumps(self.schemas).encode()
+        self.max_iterations = max_iterations
+        self.max_workers = max_workers
+        self.stats = ToolLoopStats()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def call(self, bot, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run one tool against the bot's account APIs.
+
+        Returns:
+            The tool result; problems with the call are reported as {"error": ...}
+            so the model can correct itself
+        """
+        if name not in self.names:
+            return {"error": f"Unknown tool: {name}"}
+        try:
+            if name == "get_account_balance":
+                account_id = str(arguments["account_id"])
+                balance = bot.get_account_balance(account_id)
+                if balance is None:
+                    return {"error": f"Account {account_id} not found"}
+                return {"account_id": account_id, "balance": balance}
+            if name == "get_transaction_history":
+                limit = min(max(int(arguments.get("limit", 5)), 1), MAX_HISTORY_LIMIT)
+                return bot.get_transaction_history(str(arguments["account_id"]), limit=limit)
+            if name == "get_account_info":
+                info = bot.get_account_info(str(arguments["account_id"]))
+                if "error" in info:
+                    return info
+                # The full history can be large; get_transaction_history pages it
+                return {
+                    "account_id": str(arguments["account_id"]),
+                    "account_holder": info["account_holder"],
+                    "account_type": info["account_type"],
+                    "balance": info["balance"],
+                    "transaction_count": len(info["transactions"]),
+                }
+            # The account store validates the amount and reports problems as {"error": ...}
+            return bot.transfer_funds(str(arguments["from_account"]), str(arguments["to_account"]),
+                                      arguments["amount"])
+        except KeyError as e:
+            return {"error": f"Missing argument {e.args[0]!r} for {name}"}
+        except (TypeError, ValueError) as e:
+            return {"error": f"Invalid arguments for {name}: {e}"}
+
+    def _execute(self, bot, call: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one tool call and build the tool message that answers it."""
+        try:
+            call_id, name, arguments = parse_tool_call(call)
+        except ValueError as e:
+            call_id, name = call.get("id") or "", (call.get("function") or {}).get("name") or ""
+            result = {"error": f"Invalid arguments for {name}: {e}"}
+        else:
+            try:
+                result = self.call(bot, name, arguments)
+            except Exception as e:
+                result = {"error": f"{name} failed: {e}"}
+        return {"role": "tool", "name": name, "content": json.dumps(result), "tool_call_id": call_id}
+
+    @staticmethod
+    def _batches(tool_calls: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Group calls into batches that may run concurrently: runs of reads, each write alone."""
+        batches: List[List[Dict[str, Any]]] = []
+        previous_read_only = False
+        for call in tool_calls:
+            read_only = (call.get("function") or {}).get("name") in READ_ONLY_TOOLS
+            if read_only and previous_read_only:
+                batches[-1].append(call)
+            else:
+                batches.append([call])
+            previous_read_only = read_only
+        return batches
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=max(1, self.max_workers),
+                                                    thread_name_prefix="tool")
+        return self._pool
+
+    def run(self, bot, tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Execute the tool calls of one model turn.
+
+        Args:
+            bot: BankingBot whose account APIs the tools call
+            tool_calls: The calls from the assistant message
+
+        Returns:
+            One tool message per call, in the same order
+        """
+        messages: List[Dict[str, Any]] = []
+        for batch in self._batches(tool_calls):
+            if len(batch) == 1 or self.max_workers <= 1:
+                messages.extend(self._execute(bot, call) for call in batch)
+            else:
+                messages.extend(self._get_pool().map(lambda call: self._execute(bot, call), batch))
+        return messages
+
+    async def arun(self, bot, tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Async variant of run(): each batch runs in worker threads while the event loop stays free."""
+        loop = asyncio.get_running_loop()
+        messages: List[Dict[str, Any]] = []
+        for batch in self._batches(tool_calls):
+            messages.extend(await asyncio.gather(*(
+                loop.run_in_executor(self._get_pool(), self._execute, bot, call) for call in batch
+            )))
+        return messages
+
+    def close(self):
+        """Shut down the worker threads."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None